@@ -1,19 +1,44 @@
 """
 Main Streamlit application for Legal AI Platform
 """
+import importlib
 import os
 import streamlit as st
 import sys
+import threading
+import uuid
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Import pages
-from pages.home import show_home_page
-from pages.document_analysis import show_document_analysis_page
-from pages.insights import show_insights_page
-from pages.chatbot import show_chatbot_page
-from pages.legal_guides import show_legal_guides_page
+# Profiling hooks must be installed before the profiled modules are imported
+from services.profiling import install_profiling, time_rerun
+install_profiling()
+
+from config.config import ENABLE_ADMIN_PAGES, ensure_directories
+from services.document_store import get_document_store
+from services.session_tokens import issue_session_token, verify_session_token
+from services.shared_resources import warm_up
+
+ensure_directories()
+
+# Pages are imported the first time they are shown, so a cold start only loads
+# the libraries (pandas, plotly, ...) of the page being opened
+PAGES = {
+    'Home': ("pages.home", "show_home_page"),
+    'Document Analysis': ("pages.document_analysis", "show_document_analysis_page"),
+    'Insights': ("pages.insights", "show_insights_page"),
+    'Chatbot': ("pages.chatbot", "show_chatbot_page"),
+    'Legal Guides': ("pages.legal_guides", "show_legal_guides_page"),
+    'LLM Usage': ("pages.llm_usage", "show_llm_usage_page"),
+    'Performance': ("pages.performance", "show_performance_page")
+}
+ADMIN_PAGES = {'LLM Usage', 'Performance'}
+
+def show_page(page: str):
+    """Import a page module and render the page"""
+    module_name, function_name = PAGES[page]
+    getattr(importlib.import_module(module_name), function_name)()
 
 # Page configuration
 st.set_page_config(
@@ -23,6 +48,14 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource
+def start_warm_up() -> threading.Thread:
+    """Build the shared resources (HTTP pool, matchers, tokenizer, ...) once per server process"""
+    # Runs in the background so the first page renders without waiting for it
+    thread = threading.Thread(target=warm_up, name="resource-warm-up", daemon=True)
+    thread.start()
+    return thread
+
 # Custom CSS
 def load_css():
     st.markdown("""
@@ -78,12 +111,18 @@ def load_css():
 def init_session_state():
     if 'page' not in st.session_state:
         st.session_state.page = 'Home'
-    if 'uploaded_docs' not in st.session_state:
-        st.session_state.uploaded_docs = {}
-    if 'analyzed_docs' not in st.session_state:
-        st.session_state.analyzed_docs = {}
     if 'chat_history' not in st.session_state:
         st.session_state.chat_history = []
+    if 'session_id' not in st.session_state:
+        # The URL carries a signed, expiring token so documents can be reopened after a reload
+        # or server restart; a bare session ID in the URL is never accepted
+        st.session_state.session_id = verify_session_token(st.query_params.get("session")) or str(uuid.uuid4())
+        st.query_params["session"] = issue_session_token(st.session_state.session_id)
+    if 'document_ids' not in st.session_state:
+        # Documents live in the document store; session state only keeps their IDs
+        st.session_state.document_ids = get_document_store().list_ids(st.session_state.session_id)
+    if 'document_jobs' not in st.session_state:
+        st.session_state.document_jobs = []
 
 # Sidebar navigation
 def sidebar():
@@ -107,6 +146,16 @@ def sidebar():
         if st.button("📚 Legal Guides", use_container_width=True):
             st.session_state.page = 'Legal Guides'
             st.rerun()
+        
+        # Admin pages
+        if ENABLE_ADMIN_PAGES:
+            st.subheader("Admin")
+            if st.button("📈 LLM Usage", use_container_width=True):
+                st.session_state.page = 'LLM Usage'
+                st.rerun()
+            if st.button("⏱️ Performance", use_container_width=True):
+                st.session_state.page = 'Performance'
+                st.rerun()
             
         # App info
         st.sidebar.markdown("---")
@@ -121,28 +170,27 @@ def sidebar():
 
 def main():
     # Initialize app
+    start_warm_up()
     load_css()
     init_session_state()
-    sidebar()
-    
-    # Debug information
-    st.write(f"Current page: {st.session_state.page}")
     
-    # Show selected page
-    if st.session_state.page == 'Home':
-        show_home_page()
-    elif st.session_state.page == 'Document Analysis':
-        show_document_analysis_page()
-    elif st.session_state.page == 'Insights':
-        show_insights_page()
-    elif st.session_state.page == 'Chatbot':
-        show_chatbot_page()
-    elif st.session_state.page == 'Legal Guides':
-        show_legal_guides_page()
-    else:
-        # Fallback to home page if unknown page is selected
-        st.warning(f"Unknown page: {st.session_state.page}. Showing home page instead.")
-        show_home_page()
+    with time_rerun(st.session_state.page):
+        if st.session_state.document_jobs:
+            from pages.document_analysis import collect_document_jobs
+            collect_document_jobs()
+        sidebar()
+        
+        # Debug information
+        st.write(f"Current page: {st.session_state.page}")
+        
+        # Show selected page
+        page = st.session_state.page
+        if page in PAGES and (page not in ADMIN_PAGES or ENABLE_ADMIN_PAGES):
+            show_page(page)
+        else:
+            # Fallback to home page if unknown page is selected
+            st.warning(f"Unknown page: {st.session_state.page}. Showing home page instead.")
+            show_page('Home')
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
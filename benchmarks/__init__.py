@@ -0,0 +1,3 @@
+"""
+Benchmarking and load-testing tools for the Legal AI Platform
+"""
@@ -0,0 +1,201 @@
+"""
+Load-test harness for GroupQService.
+
+Drives the service with N concurrent simulated users and reports throughput
+and p50/p95/p99 latency. By default an in-process mock server is started
+(see benchmarks/mock_groq_server.py), so no API key or network is needed.
+
+Usage:
+    python -m benchmarks.load_test --users 20 --requests-per-user 10 --feature chat
+    python -m benchmarks.load_test --url http://127.0.0.1:8787/openai/v1/chat/completions --json
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_groq_server import add_server_arguments, config_from_args, start_mock_server
+from services.groupq_service import GroupQService
+
+FEATURES = ["chat", "summarize", "simplify", "guide"]
+
+SAMPLE_DOCUMENT = (
+    "This Agreement shall automatically renew for successive one (1) year periods unless either party "
+    "provides written notice of non-renewal at least ninety (90) days prior to the end of the then-current term. "
+    "The Company may modify these terms at its sole discretion without notice. "
+    "The Contractor shall indemnify and hold harmless the Company against all claims arising hereunder. "
+) * 20
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of a list of values
+
+    Args:
+        values: Sample values
+        pct: Percentile between 0 and 100
+
+    Returns:
+        The percentile value (0.0 for an empty list)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def call_feature(service: GroupQService, feature: str, user_id: int, request_id: int) -> str:
+    """Issue one request for the given feature"""
+    if feature == "chat":
+        return service.chat_query(f"User {user_id} question {request_id}: what is an indemnity clause?")
+    if feature == "summarize":
+        return service.summarize_text(SAMPLE_DOCUMENT)
+    if feature == "simplify":
+        return service.simplify_text(SAMPLE_DOCUMENT)
+    return service.generate_legal_guide("Filing a Consumer Complaint")
+
+def run_load_test(
+    api_url: str,
+    users: int = 10,
+    requests_per_user: int = 5,
+    feature: str = "chat",
+    think_time: float = 0.0,
+    api_key: str = "mock-key",
+    max_retries: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run the load test and collect latency statistics
+
+    Args:
+        api_url: Chat completions endpoint to drive
+        users: Number of concurrent simulated users
+        requests_per_user: Requests issued sequentially by each user
+        feature: Which GroupQService method to call (see FEATURES)
+        think_time: Pause between a user's requests in seconds
+        api_key: API key passed to the service
+        max_retries: Override the service's retry count on 429/5xx responses
+
+    Returns:
+        Dict with throughput, latency percentiles and error counts
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def simulate_user(user_id: int):
+        # Each user gets its own service, like a Streamlit session does
+        service = GroupQService(api_key=api_key, api_url=api_url)
+        if max_retries is not None:
+            service.max_retries = max_retries
+        for request_id in range(requests_per_user):
+            start = time.perf_counter()
+            response = call_feature(service, feature, user_id, request_id)
+            elapsed = time.perf_counter() - start
+
+            with lock:
+                if response.startswith("⚠️"):
+                    errors.append(response)
+                else:
+                    latencies.append(elapsed)
+
+            if think_time:
+                time.sleep(think_time)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        list(executor.map(simulate_user, range(users)))
+    wall_time = time.perf_counter() - wall_start
+
+    # Group error messages so the report stays readable
+    error_counts = {}
+    for message in errors:
+        error_counts[message] = error_counts.get(message, 0) + 1
+
+    total = len(latencies) + len(errors)
+    return {
+        "feature": feature,
+        "users": users,
+        "requests": total,
+        "successful": len(latencies),
+        "failed": len(errors),
+        "wall_time_s": wall_time,
+        "throughput_rps": len(latencies) / wall_time if wall_time > 0 else 0.0,
+        "latency_s": {
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies) if latencies else 0.0
+        },
+        "errors": error_counts
+    }
+
+def format_report(result: Dict[str, Any], server_stats: Optional[Dict[str, Any]] = None) -> str:
+    """Render a load-test result as a short text report"""
+    latency = result["latency_s"]
+    lines = [
+        f"Feature:     {result['feature']}",
+        f"Users:       {result['users']}",
+        f"Requests:    {result['requests']} ({result['successful']} ok, {result['failed']} failed)",
+        f"Wall time:   {result['wall_time_s']:.2f} s",
+        f"Throughput:  {result['throughput_rps']:.2f} req/s",
+        f"Latency:     mean {latency['mean']:.3f} s | p50 {latency['p50']:.3f} s | "
+        f"p95 {latency['p95']:.3f} s | p99 {latency['p99']:.3f} s | max {latency['max']:.3f} s"
+    ]
+    for message, count in result["errors"].items():
+        lines.append(f"  {count} x {message}")
+    if server_stats:
+        lines.append(
+            f"Server:      {server_stats['requests']} requests, {server_stats['prompt_tokens']} prompt + "
+            f"{server_stats['completion_tokens']} completion tokens, status {server_stats['status_counts']}"
+        )
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load-test GroupQService against a (mock) chat completions API")
+    parser.add_argument("--url", default=None,
+                        help="Chat completions endpoint; starts an in-process mock server when omitted")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent simulated users")
+    parser.add_argument("--requests-per-user", type=int, default=5, help="Requests issued by each user")
+    parser.add_argument("--feature", choices=FEATURES, default="chat", help="Service method to exercise")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pause between a user's requests (s)")
+    parser.add_argument("--max-retries", type=int, default=None, help="Override the client retry count")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = None
+    api_url = args.url
+    if not api_url:
+        server = start_mock_server(config_from_args(args))
+        api_url = server.chat_url
+
+    try:
+        result = run_load_test(
+            api_url,
+            users=args.users,
+            requests_per_user=args.requests_per_user,
+            feature=args.feature,
+            think_time=args.think_time,
+            max_retries=args.max_retries
+        )
+        server_stats = server.mock_stats.snapshot() if server else None
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+
+    if args.json:
+        print(json.dumps({**result, "server": server_stats}, indent=2))
+    else:
+        print(format_report(result, server_stats))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+"""
+Local OpenAI-compatible stand-in for the Groq chat completions API.
+
+Serves ``POST .../chat/completions`` (plain and streamed), ``GET .../models``
+and a ``/stats`` endpoint with token accounting, so the LLM code paths can be
+benchmarked and exercised offline.
+
+Usage:
+    python -m benchmarks.mock_groq_server --port 8787 --latency lognormal --latency-mean 0.8 --error-429 0.05
+
+Then point the app at it:
+    GROUPQ_CHAT_COMPLETIONS_URL=http://127.0.0.1:8787/openai/v1/chat/completions
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple
+
+LATENCY_DISTRIBUTIONS = ["fixed", "uniform", "normal", "lognormal", "exponential"]
+
+# Filler used to build completions of the requested length
+MOCK_WORDS = (
+    "The parties agree that this clause shall remain in force subject to the "
+    "terms of the agreement and the applicable provisions of Indian law"
+).split()
+
+def count_tokens(text: str) -> int:
+    """Rough token count used for the mock's usage accounting (words and punctuation)"""
+    return len(re.findall(r"\w+|[^\w\s]", text or ""))
+
+class MockServerConfig:
+    """Behaviour of the mock server: latency, output size and error injection"""
+
+    def __init__(
+        self,
+        latency: str = "lognormal",
+        latency_mean: float = 0.5,
+        latency_stddev: float = 0.2,
+        token_latency: float = 0.002,
+        completion_tokens: int = 200,
+        error_429_rate: float = 0.0,
+        error_5xx_rate: float = 0.0,
+        json_content: Optional[str] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the mock server configuration
+
+        Args:
+            latency: Distribution of the time to first token (see LATENCY_DISTRIBUTIONS)
+            latency_mean: Mean time to first token in seconds
+            latency_stddev: Spread of the time to first token in seconds
+            token_latency: Seconds spent generating each completion token
+            completion_tokens: Completion length when the request allows it
+            error_429_rate: Fraction of requests answered with 429 Too Many Requests
+            error_5xx_rate: Fraction of requests answered with 503 Service Unavailable
+            json_content: Completion returned verbatim for JSON-mode requests (a generic object if omitted)
+            seed: Random seed for reproducible runs
+        """
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency}")
+
+        self.latency = latency
+        self.latency_mean = latency_mean
+        self.latency_stddev = latency_stddev
+        self.token_latency = token_latency
+        self.completion_tokens = completion_tokens
+        self.error_429_rate = error_429_rate
+        self.error_5xx_rate = error_5xx_rate
+        self.json_content = json_content
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        """Draw a time-to-first-token value from the configured distribution"""
+        mean = max(0.0, self.latency_mean)
+        stddev = max(0.0, self.latency_stddev)
+
+        with self.rng_lock:
+            if self.latency == "fixed":
+                value = mean
+            elif self.latency == "uniform":
+                value = self.rng.uniform(mean - stddev, mean + stddev)
+            elif self.latency == "normal":
+                value = self.rng.gauss(mean, stddev)
+            elif self.latency == "exponential":
+                value = self.rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+            else:
+                # Parameterise the lognormal so that it has the requested mean and stddev
+                if mean <= 0:
+                    value = 0.0
+                else:
+                    sigma2 = math.log(1 + (stddev / mean) ** 2)
+                    mu = math.log(mean) - sigma2 / 2
+                    value = self.rng.lognormvariate(mu, math.sqrt(sigma2))
+
+        return max(0.0, value)
+
+    def sample_error(self) -> Optional[int]:
+        """Decide whether the next request should fail, returning the status code"""
+        with self.rng_lock:
+            roll = self.rng.random()
+
+        if roll < self.error_429_rate:
+            return 429
+        if roll < self.error_429_rate + self.error_5xx_rate:
+            return 503
+        return None
+
+class MockStats:
+    """Thread-safe request and token counters exposed on /stats"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all counters"""
+        with self.lock:
+            self.requests = 0
+            self.streamed_requests = 0
+            self.status_counts = {}
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+
+    def record(self, status: int, prompt_tokens: int = 0, completion_tokens: int = 0, stream: bool = False):
+        """Record one handled request"""
+        with self.lock:
+            self.requests += 1
+            if stream:
+                self.streamed_requests += 1
+            self.status_counts[str(status)] = self.status_counts.get(str(status), 0) + 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current counters as a dict"""
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "streamed_requests": self.streamed_requests,
+                "status_counts": dict(self.status_counts),
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens
+            }
+
+def build_completion_text(num_tokens: int, json_mode: bool = False) -> str:
+    """
+    Build a deterministic completion of roughly num_tokens tokens
+
+    Args:
+        num_tokens: Target completion length
+        json_mode: Whether the client asked for a JSON object
+
+    Returns:
+        Completion text
+    """
+    words = [MOCK_WORDS[i % len(MOCK_WORDS)] for i in range(max(1, num_tokens))]
+    text = " ".join(words)
+
+    if json_mode:
+        return json.dumps({"mock": True, "content": text})
+    return text
+
+class MockGroqHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the chat completions protocol"""
+
+    protocol_version = "HTTP/1.1"
+
+    # Silence the default per-request stderr logging
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def mock_config(self) -> MockServerConfig:
+        return self.server.mock_config
+
+    @property
+    def mock_stats(self) -> MockStats:
+        return self.server.mock_stats
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {
+                "object": "list",
+                "data": [{"id": self.server.model_name, "object": "model", "owned_by": "mock"}]
+            })
+        elif self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.mock_stats.snapshot())
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        raw_body = self.rfile.read(length) if length else b""
+
+        if self.path.rstrip("/") == "/stats/reset":
+            self.mock_stats.reset()
+            self._send_json(200, {"reset": True})
+            return
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+            return
+
+        try:
+            payload = json.loads(raw_body or b"{}")
+        except ValueError:
+            self.mock_stats.record(400)
+            self._send_json(400, {"error": {"message": "Request body is not valid JSON"}})
+            return
+
+        messages = payload.get("messages") or []
+        if not isinstance(messages, list) or not messages:
+            self.mock_stats.record(400)
+            self._send_json(400, {"error": {"message": "'messages' must be a non-empty list"}})
+            return
+
+        # Injected failures come back quickly, like a real rate limiter or overloaded gateway
+        error_status = self.mock_config.sample_error()
+        if error_status == 429:
+            self.mock_stats.record(429)
+            self._send_json(429, {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded"}},
+                            headers={"Retry-After": "1"})
+            return
+        if error_status is not None:
+            self.mock_stats.record(error_status)
+            self._send_json(error_status, {"error": {"message": "Service unavailable (mock)"}})
+            return
+
+        prompt_tokens = sum(count_tokens(str(m.get("content", ""))) for m in messages if isinstance(m, dict))
+        max_tokens = int(payload.get("max_tokens") or self.mock_config.completion_tokens)
+        completion_tokens = max(1, min(max_tokens, self.mock_config.completion_tokens))
+        json_mode = (payload.get("response_format") or {}).get("type") == "json_object"
+        if json_mode and self.mock_config.json_content is not None:
+            content = self.mock_config.json_content
+        else:
+            content = build_completion_text(completion_tokens, json_mode=json_mode)
+        model = payload.get("model") or self.server.model_name
+
+        time.sleep(self.mock_config.sample_latency())
+
+        if payload.get("stream"):
+            self._stream_completion(model, content, prompt_tokens, completion_tokens)
+        else:
+            time.sleep(self.mock_config.token_latency * completion_tokens)
+            self.mock_stats.record(200, prompt_tokens, completion_tokens)
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop" if completion_tokens < max_tokens else "length"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+            })
+
+    def _stream_completion(self, model: str, content: str, prompt_tokens: int, completion_tokens: int):
+        """Send the completion as server-sent events, one word per chunk"""
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        # Chunked framing, as real servers use, lets clients read each event as it arrives
+        def send_event(data: str):
+            body = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(body):X}\r\n".encode("ascii") + body + b"\r\n")
+            self.wfile.flush()
+
+        words = content.split(" ")
+        delay = self.mock_config.token_latency * completion_tokens / max(1, len(words))
+
+        try:
+            for i, word in enumerate(words):
+                delta = {"content": word if i == 0 else " " + word}
+                if i == 0:
+                    delta["role"] = "assistant"
+                send_event(json.dumps({
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": None}]
+                }))
+                time.sleep(delay)
+
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+            send_event(json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "usage": usage,
+                "x_groq": {"usage": usage}
+            }))
+            send_event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away mid-stream
+            self.close_connection = True
+
+        self.mock_stats.record(200, prompt_tokens, completion_tokens, stream=True)
+
+class MockGroqServer(ThreadingHTTPServer):
+    """Threaded HTTP server carrying the mock configuration and stats"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: MockServerConfig, model_name: str = "llama-3.3-70b-versatile"):
+        super().__init__(address, MockGroqHandler)
+        self.mock_config = config
+        self.mock_stats = MockStats()
+        self.model_name = model_name
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/openai/v1"
+
+    @property
+    def chat_url(self) -> str:
+        return f"{self.base_url}/chat/completions"
+
+def start_mock_server(config: Optional[MockServerConfig] = None, host: str = "127.0.0.1", port: int = 0) -> MockGroqServer:
+    """
+    Start the mock server on a background thread
+
+    Args:
+        config: Server behaviour (defaults to MockServerConfig())
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    server = MockGroqServer((host, port), config or MockServerConfig())
+    thread = threading.Thread(target=server.serve_forever, name="mock-groq-server", daemon=True)
+    thread.start()
+    return server
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    """Add the mock server options to an argument parser"""
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal",
+                        help="Distribution of the time to first token")
+    parser.add_argument("--latency-mean", type=float, default=0.5, help="Mean time to first token (s)")
+    parser.add_argument("--latency-stddev", type=float, default=0.2, help="Spread of the time to first token (s)")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="Seconds per generated token")
+    parser.add_argument("--completion-tokens", type=int, default=200, help="Completion length in tokens")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--json-fixture", default=None,
+                        help="File whose contents are returned for JSON-mode requests")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+
+def config_from_args(args: argparse.Namespace) -> MockServerConfig:
+    """Build a MockServerConfig from parsed arguments"""
+    json_content = None
+    if args.json_fixture:
+        with open(args.json_fixture, "r", encoding="utf-8") as f:
+            json_content = f.read()
+
+    return MockServerConfig(
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_stddev=args.latency_stddev,
+        token_latency=args.token_latency,
+        completion_tokens=args.completion_tokens,
+        error_429_rate=args.error_429,
+        error_5xx_rate=args.error_5xx,
+        json_content=json_content,
+        seed=args.seed
+    )
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run a local mock of the Groq chat completions API")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8787, help="Port to bind")
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = MockGroqServer((args.host, args.port), config_from_args(args))
+    print(f"Mock Groq server listening on {server.chat_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+Benchmark suite for the document processing pipeline.
+
+Generates synthetic contracts of increasing size (see benchmarks/synthetic_contracts.py),
+times each pipeline stage and the end-to-end pipeline, and records throughput and peak
+memory against document size. Results are written as JSON and can be compared with a
+stored baseline to flag regressions.
+
+Usage:
+    python -m benchmarks.pipeline_benchmark --sizes 1KB,100KB,1MB,10MB --output results.json
+    python -m benchmarks.pipeline_benchmark --sizes 1KB,100KB,1MB --baseline baseline.json
+    python -m benchmarks.pipeline_benchmark --sizes 50MB --stages preprocess,detect,simplify --no-memory
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep benchmark documents and paragraph caches out of the app's database
+os.environ.setdefault("DOCUMENT_STORE_PATH", os.path.join(tempfile.gettempdir(), "legal_ai_benchmark.db"))
+
+from benchmarks.synthetic_contracts import format_size, generate_contract, parse_size, write_contract
+from models.risk_detection import detect_risky_clauses
+from models.simplification import load_legal_terms, simplify_legal_jargon
+from models.summarization import summarize_document
+from services.document_processor import DocumentProcessor
+from services.document_store import get_document_store
+from services.incremental_analysis import join_paragraphs
+from services.risk_scoring import calculate_risk_score
+from utils.document_utils import (
+    extract_document_metadata,
+    extract_text_from_document,
+    preprocess_text,
+    split_into_chunk_spans,
+    split_into_paragraph_spans
+)
+
+STAGES = ["extraction", "preprocess", "metadata", "summarize", "detect", "score", "simplify", "pipeline"]
+
+# Stages whose output each stage consumes
+STAGE_INPUTS = {
+    "preprocess": ["extraction"],
+    "metadata": ["preprocess"],
+    "summarize": ["preprocess"],
+    "detect": ["preprocess"],
+    "score": ["detect"],
+    "simplify": ["preprocess"]
+}
+
+DEFAULT_SIZES = "1KB,10KB,100KB,1MB"
+
+# A stage regresses when it is this much slower than the baseline...
+DEFAULT_THRESHOLD = 0.2
+# ...and at least this many seconds slower, so timer noise on tiny inputs is ignored
+MIN_REGRESSION_S = 0.005
+
+def _simplify(text: str) -> str:
+    """Simplify chunk by chunk, as the document record does on a cold cache"""
+    legal_terms = load_legal_terms()
+    spans = split_into_paragraph_spans(text)
+    paragraphs = [
+        " ".join(simplify_legal_jargon(text[start:end], legal_terms) for start, end in split_into_chunk_spans(text, *span))
+        for span in spans
+    ]
+    return join_paragraphs(text, spans, paragraphs)
+
+def _run_pipeline(file_path: str) -> Any:
+    """Process a copy of the file end to end, including simplification, with empty caches"""
+    get_document_store().clear_paragraph_results()
+    suffix = os.path.splitext(file_path)[1]
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        copy_path = tmp.name
+    shutil.copyfile(file_path, copy_path)
+    record = DocumentProcessor().process_file(copy_path, os.path.basename(file_path), os.path.getsize(file_path))
+    record.warm("simplified_text")
+    return record
+
+def stage_functions(file_path: str) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    """
+    Return the benchmarked stages in pipeline order
+
+    Each stage reads the outputs of earlier stages from a shared dict and returns its own.
+    """
+    return {
+        "extraction": lambda state: extract_text_from_document(file_path),
+        "preprocess": lambda state: preprocess_text(state["extraction"]),
+        "metadata": lambda state: extract_document_metadata(state["preprocess"]),
+        "summarize": lambda state: summarize_document(state["preprocess"]),
+        "detect": lambda state: detect_risky_clauses(state["preprocess"]),
+        "score": lambda state: calculate_risk_score(state["detect"]),
+        "simplify": lambda state: _simplify(state["preprocess"]),
+        "pipeline": lambda state: _run_pipeline(file_path)
+    }
+
+def _measure_peak(func: Callable[[], Any]) -> int:
+    """Run func under tracemalloc and return its peak allocation in bytes"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        func()
+        return max(0, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+def benchmark_size(
+    size_bytes: int,
+    file_format: str = "pdf",
+    repeat: int = 3,
+    stages: Optional[List[str]] = None,
+    measure_memory: bool = True,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Benchmark the pipeline on one synthetic contract
+
+    Args:
+        size_bytes: Contract text size
+        file_format: 'pdf' or 'docx'
+        repeat: Timed runs per stage; the median is reported
+        stages: Stages to report (all by default); earlier stages still run to feed them
+        measure_memory: Also run each stage once under tracemalloc for its peak memory
+        seed: Contract generator seed
+
+    Returns:
+        Dict with the size and per-stage time, throughput and peak memory
+    """
+    stages = stages or STAGES
+    text = generate_contract(size_bytes, seed=seed)
+    work_dir = tempfile.mkdtemp(prefix="legal_ai_benchmark_")
+    file_path = os.path.join(work_dir, f"contract.{file_format}")
+
+    try:
+        write_contract(text, file_path, file_format)
+        functions = stage_functions(file_path)
+        state = {}
+        results = {}
+
+        needed = set(stages)
+        for name in reversed(STAGES):
+            if name in needed:
+                needed.update(STAGE_INPUTS.get(name, []))
+
+        for name, func in functions.items():
+            if name not in needed:
+                continue
+            if name not in stages:
+                # Only an input to a reported stage
+                state[name] = func(state)
+                continue
+
+            timings = []
+            for _ in range(max(1, repeat)):
+                start = time.perf_counter()
+                state[name] = func(state)
+                timings.append(time.perf_counter() - start)
+
+            elapsed = statistics.median(timings)
+            results[name] = {
+                "time_s": elapsed,
+                "min_s": min(timings),
+                "throughput_mb_s": (size_bytes / (1024 * 1024)) / elapsed if elapsed > 0 else 0.0
+            }
+            if measure_memory:
+                results[name]["peak_mb"] = _measure_peak(lambda: func(state)) / (1024 * 1024)
+
+        return {
+            "size": format_size(size_bytes),
+            "bytes": size_bytes,
+            "characters": len(text),
+            "file_bytes": os.path.getsize(file_path),
+            "stages": results
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def scaling_exponents(results: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Fit time ~ size^k per stage by least squares on log-log points
+
+    An exponent near 1 means the stage scales linearly; well above 1 flags super-linear work.
+    """
+    exponents = {}
+    for stage in STAGES:
+        points = [
+            (math.log(result["bytes"]), math.log(result["stages"][stage]["time_s"]))
+            for result in results
+            if stage in result["stages"] and result["stages"][stage]["time_s"] > 0
+        ]
+        if len(points) < 2:
+            continue
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        variance = sum((x - mean_x) ** 2 for x, _ in points)
+        if variance:
+            exponents[stage] = sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+    return exponents
+
+def run_benchmarks(
+    sizes: List[int],
+    file_format: str = "pdf",
+    repeat: int = 3,
+    stages: Optional[List[str]] = None,
+    measure_memory: bool = True,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """Benchmark every size and return the full report"""
+    results = []
+    for size_bytes in sizes:
+        print(f"Benchmarking {format_size(size_bytes)}...", file=sys.stderr)
+        results.append(benchmark_size(size_bytes, file_format, repeat, stages, measure_memory, seed))
+
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "format": file_format,
+            "repeat": repeat,
+            "seed": seed
+        },
+        "results": results,
+        "scaling_exponents": scaling_exponents(results)
+    }
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_s: float = MIN_REGRESSION_S
+) -> List[Dict[str, Any]]:
+    """
+    Compare stage timings with a baseline report
+
+    Args:
+        current: Report from run_benchmarks
+        baseline: Earlier report
+        threshold: Relative slowdown that counts as a regression
+        min_delta_s: Absolute slowdown below which differences are ignored
+
+    Returns:
+        One entry per size and stage present in both reports, with a 'status' of
+        'regression', 'improvement' or 'ok'
+    """
+    baseline_times = {
+        (result["size"], stage): stats["time_s"]
+        for result in baseline.get("results", [])
+        for stage, stats in result["stages"].items()
+    }
+
+    comparisons = []
+    for result in current["results"]:
+        for stage, stats in result["stages"].items():
+            before = baseline_times.get((result["size"], stage))
+            if before is None:
+                continue
+            after = stats["time_s"]
+            change = (after - before) / before if before > 0 else 0.0
+            if change > threshold and after - before > min_delta_s:
+                status = "regression"
+            elif change < -threshold and before - after > min_delta_s:
+                status = "improvement"
+            else:
+                status = "ok"
+            comparisons.append({
+                "size": result["size"],
+                "stage": stage,
+                "baseline_s": before,
+                "current_s": after,
+                "change": change,
+                "status": status
+            })
+    return comparisons
+
+def format_report(report: Dict[str, Any], comparisons: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Render a benchmark report as text tables"""
+    results = report["results"]
+    stages = [stage for stage in STAGES if any(stage in result["stages"] for result in results)]
+
+    lines = [f"{'Size':>8} " + " ".join(f"{stage:>12}" for stage in stages)]
+    lines.append("Time (s)")
+    for result in results:
+        lines.append(f"{result['size']:>8} " + " ".join(
+            f"{result['stages'][stage]['time_s']:>12.4f}" if stage in result["stages"] else f"{'':>12}"
+            for stage in stages
+        ))
+    lines.append("Throughput (MB/s)")
+    for result in results:
+        lines.append(f"{result['size']:>8} " + " ".join(
+            f"{result['stages'][stage]['throughput_mb_s']:>12.2f}" if stage in result["stages"] else f"{'':>12}"
+            for stage in stages
+        ))
+    if any("peak_mb" in stats for result in results for stats in result["stages"].values()):
+        lines.append("Peak memory (MB)")
+        for result in results:
+            lines.append(f"{result['size']:>8} " + " ".join(
+                f"{result['stages'][stage].get('peak_mb', 0.0):>12.2f}" if stage in result["stages"] else f"{'':>12}"
+                for stage in stages
+            ))
+
+    exponents = report.get("scaling_exponents", {})
+    if exponents:
+        lines.append("Scaling exponent (time ~ size^k)")
+        lines.append(f"{'':>8} " + " ".join(
+            f"{exponents[stage]:>12.2f}" if stage in exponents else f"{'':>12}" for stage in stages
+        ))
+
+    if comparisons is not None:
+        regressions = [entry for entry in comparisons if entry["status"] == "regression"]
+        improvements = [entry for entry in comparisons if entry["status"] == "improvement"]
+        lines.append(f"Compared with baseline: {len(regressions)} regressions, {len(improvements)} improvements")
+        for entry in regressions + improvements:
+            lines.append(
+                f"  {entry['status'].upper():<12} {entry['size']:>8} {entry['stage']:<12} "
+                f"{entry['baseline_s']:.4f} s -> {entry['current_s']:.4f} s ({entry['change']:+.0%})"
+            )
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the document processing pipeline on synthetic contracts")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated text sizes, e.g. 1KB,1MB,50MB")
+    parser.add_argument("--format", choices=["pdf", "docx"], default="pdf", help="Uploaded file format")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (median reported)")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stages to report")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak memory pass")
+    parser.add_argument("--seed", type=int, default=0, help="Contract generator seed")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown flagged as a regression (0.2 = 20%%)")
+    parser.add_argument("--json", action="store_true", help="Print the JSON report instead of tables")
+    args = parser.parse_args(argv)
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+
+    report = run_benchmarks(
+        [parse_size(size) for size in args.sizes.split(",") if size.strip()],
+        file_format=args.format,
+        repeat=args.repeat,
+        stages=stages,
+        measure_memory=not args.no_memory,
+        seed=args.seed
+    )
+
+    comparisons = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            comparisons = compare_results(report, json.load(f), threshold=args.threshold)
+        report["comparison"] = comparisons
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report, comparisons))
+
+    # A non-zero exit lets CI reject changes that regress a stage
+    if comparisons and any(entry["status"] == "regression" for entry in comparisons):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Cold-start benchmark for the Streamlit app.
+
+Each run starts a fresh Python interpreter and renders the app's first page with
+Streamlit's AppTest, recording interpreter start-up, the Streamlit import and the
+first script run, and which heavy libraries were loaded by then. One extra run
+under `-X importtime` lists the slowest imports.
+
+Usage:
+    python -m benchmarks.startup_benchmark --repeat 5
+    python -m benchmarks.startup_benchmark --page "Document Analysis" --max-seconds 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries whose import cost the app should only pay on the pages that use them
+HEAVY_MODULES = ["pandas", "numpy", "plotly", "matplotlib", "seaborn", "nltk", "PyPDF2", "docx", "requests"]
+
+# Run in the child interpreter; prints one JSON line with its timings
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+app = AppTest.from_file({app_path!r}, default_timeout=120)
+app.session_state["page"] = {page!r}
+app.run()
+finished = time.perf_counter()
+print(json.dumps({{
+    "streamlit_import_s": imported - started,
+    "first_run_s": finished - imported,
+    "errors": [str(exception.value) for exception in app.exception],
+    "loaded": [name for name in {heavy!r} if name in sys.modules]
+}}))
+"""
+
+def _child_command(page: str, import_time: bool = False) -> List[str]:
+    script = CHILD_SCRIPT.format(app_path=os.path.join(PROJECT_ROOT, "app.py"), page=page, heavy=HEAVY_MODULES)
+    return [sys.executable] + (["-X", "importtime"] if import_time else []) + ["-c", script]
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # Keep the benchmark's sessions out of the app's database
+    env.setdefault("DOCUMENT_STORE_PATH", os.path.join(tempfile.gettempdir(), "legal_ai_startup_benchmark.db"))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+    return env
+
+def measure_cold_start(page: str = "Home") -> Dict[str, Any]:
+    """
+    Start a fresh interpreter and render one page of the app
+
+    Args:
+        page: Page selected before the first run
+
+    Returns:
+        Wall-clock total plus the child's Streamlit import and first run timings
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        _child_command(page), cwd=PROJECT_ROOT, env=_child_env(), capture_output=True, text=True
+    )
+    total = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"App start-up failed:\n{result.stderr[-2000:]}")
+
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["total_s"] = total
+    # Whatever the child did not account for is interpreter start-up and teardown
+    timings["interpreter_s"] = max(0.0, total - timings["streamlit_import_s"] - timings["first_run_s"])
+    return timings
+
+def parse_import_times(stderr: str) -> List[Dict[str, Any]]:
+    """Parse `-X importtime` output into per-module self and cumulative seconds"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            modules.append({
+                "module": name.strip(),
+                "self_s": int(self_us) / 1e6,
+                "cumulative_s": int(cumulative_us) / 1e6
+            })
+        except ValueError:
+            continue
+    return modules
+
+def import_profile(page: str = "Home", top: int = 15) -> Dict[str, Any]:
+    """
+    Profile the imports of one cold start
+
+    Args:
+        page: Page selected before the first run
+        top: Number of packages to report
+
+    Returns:
+        Import time per top-level package, slowest first
+    """
+    result = subprocess.run(
+        _child_command(page, import_time=True), cwd=PROJECT_ROOT, env=_child_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"App start-up failed:\n{result.stderr[-2000:]}")
+
+    packages = defaultdict(float)
+    for module in parse_import_times(result.stderr):
+        packages[module["module"].split(".")[0]] += module["self_s"]
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "total_import_s": sum(packages.values()),
+        "packages": [{"package": name, "self_s": seconds} for name, seconds in ranked[:top]]
+    }
+
+def run_startup_benchmark(page: str = "Home", repeat: int = 5, top: int = 15) -> Dict[str, Any]:
+    """
+    Measure repeated cold starts and one import profile
+
+    Args:
+        page: Page selected before the first run
+        repeat: Number of cold starts (median reported)
+        top: Number of packages in the import profile
+
+    Returns:
+        Report with median timings, the individual runs and the import profile
+    """
+    runs = [measure_cold_start(page) for _ in range(repeat)]
+    keys = ["interpreter_s", "streamlit_import_s", "first_run_s", "total_s"]
+    return {
+        "page": page,
+        "python": sys.version.split()[0],
+        "median": {key: statistics.median(run[key] for run in runs) for key in keys},
+        "runs": runs,
+        "loaded_heavy_modules": runs[-1]["loaded"],
+        "errors": runs[-1]["errors"],
+        "imports": import_profile(page, top)
+    }
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Format a start-up report as plain-text tables"""
+    median = report["median"]
+    lines = [
+        f"Cold start of page '{report['page']}' ({len(report['runs'])} runs, Python {report['python']})",
+        "",
+        f"  Interpreter start-up   {median['interpreter_s']:8.3f} s",
+        f"  Streamlit import       {median['streamlit_import_s']:8.3f} s",
+        f"  First script run       {median['first_run_s']:8.3f} s",
+        f"  Total                  {median['total_s']:8.3f} s",
+        "",
+        "Heavy libraries loaded: " + (", ".join(report["loaded_heavy_modules"]) or "none"),
+        "",
+        f"Slowest imports (self time by package, {report['imports']['total_import_s']:.3f} s in total)"
+    ]
+    for entry in report["imports"]["packages"]:
+        lines.append(f"  {entry['package']:<30} {entry['self_s']:8.3f} s")
+    if report["errors"]:
+        lines.extend(["", "Errors raised by the page:"] + [f"  {error}" for error in report["errors"]])
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the Streamlit app's cold-start time")
+    parser.add_argument("--page", default="Home", help="Page rendered by the first run")
+    parser.add_argument("--repeat", type=int, default=5, help="Cold starts to measure (median reported)")
+    parser.add_argument("--top", type=int, default=15, help="Packages listed in the import profile")
+    parser.add_argument("--max-seconds", type=float, default=None,
+                        help="Exit with status 1 if the median total exceeds this many seconds")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    parser.add_argument("--json", action="store_true", help="Print the JSON report instead of tables")
+    args = parser.parse_args(argv)
+
+    report = run_startup_benchmark(args.page, repeat=args.repeat, top=args.top)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+    if args.max_seconds is not None and report["median"]["total_s"] > args.max_seconds:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Synthetic contract generator for benchmarks.
+
+Builds contracts of a requested size from the sample risky clauses in
+data/training/risk_clauses.csv and the legal terms in data/training/legal_jargon.csv,
+mixed with neutral boilerplate, and writes them as PDF or DOCX files.
+
+Usage:
+    python -m benchmarks.synthetic_contracts --size 1MB --format pdf --output contract.pdf
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import textwrap
+from typing import List, Optional
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import TRAINING_DATA_DIR
+
+SIZE_UNITS = {"KB": 1024, "MB": 1024 * 1024, "B": 1}
+
+# Share of clauses taken from the risky clause samples
+RISKY_CLAUSE_RATIO = 0.15
+
+SUBJECTS = ["The Company", "The Contractor", "Each party", "The Licensee", "The Supplier", "The Customer"]
+VERBS = ["shall deliver", "shall maintain", "may request", "shall provide", "agrees to keep", "shall submit"]
+OBJECTS = [
+    "all reports required under this Agreement",
+    "records of the Services performed",
+    "the Deliverables described in Schedule A",
+    "written notice of any material change",
+    "insurance coverage in reasonable amounts",
+    "invoices in accordance with the payment terms"
+]
+QUALIFIERS = [
+    "within thirty (30) days of the Effective Date",
+    "in a professional and workmanlike manner",
+    "at its own cost and expense",
+    "upon reasonable request",
+    "during the Term of this Agreement",
+    "in accordance with applicable law"
+]
+HEADINGS = ["DEFINITIONS", "SERVICES", "PAYMENT", "TERM AND TERMINATION", "CONFIDENTIALITY",
+            "WARRANTIES", "LIABILITY", "INDEMNIFICATION", "GENERAL PROVISIONS"]
+
+def parse_size(value: str) -> int:
+    """Parse a size such as '512KB' or '50MB' into bytes"""
+    value = value.strip().upper()
+    for unit in ("KB", "MB", "B"):
+        if value.endswith(unit):
+            return int(float(value[:-len(unit)]) * SIZE_UNITS[unit])
+    return int(value)
+
+def format_size(size: int) -> str:
+    """Format a byte count as the shortest of B, KB or MB"""
+    if size >= SIZE_UNITS["MB"] and size % SIZE_UNITS["MB"] == 0:
+        return f"{size // SIZE_UNITS['MB']}MB"
+    if size >= SIZE_UNITS["KB"] and size % SIZE_UNITS["KB"] == 0:
+        return f"{size // SIZE_UNITS['KB']}KB"
+    return f"{size}B"
+
+def load_samples() -> tuple:
+    """Return (risky clause texts, legal terms) from the training data"""
+    with open(os.path.join(TRAINING_DATA_DIR, "risk_clauses.csv"), newline="", encoding="utf-8") as f:
+        clauses = [row["text"] for row in csv.DictReader(f) if row.get("text")]
+    with open(os.path.join(TRAINING_DATA_DIR, "legal_jargon.csv"), newline="", encoding="utf-8") as f:
+        terms = [row["legal_term"] for row in csv.DictReader(f) if row.get("legal_term")]
+    return clauses, terms
+
+def generate_contract(size_bytes: int, seed: int = 0) -> str:
+    """
+    Generate contract text of roughly the requested size
+
+    Args:
+        size_bytes: Target size of the UTF-8 text in bytes
+        seed: Random seed, so the same size always yields the same contract
+
+    Returns:
+        Contract text with numbered sections separated by blank lines
+    """
+    rng = random.Random(seed)
+    risky_clauses, legal_terms = load_samples()
+
+    paragraphs = ["MASTER SERVICES AGREEMENT"]
+    size = len(paragraphs[0])
+    section = 0
+    clause = 0
+
+    while size < size_bytes:
+        if clause % 8 == 0:
+            section += 1
+            heading = f"{section}. {HEADINGS[(section - 1) % len(HEADINGS)]}"
+            paragraphs.append(heading)
+            size += len(heading) + 2
+        clause += 1
+
+        if rng.random() < RISKY_CLAUSE_RATIO:
+            body = rng.choice(risky_clauses)
+        else:
+            body = (
+                f"{rng.choice(legal_terms).capitalize()}, {rng.choice(SUBJECTS).lower()} "
+                f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(QUALIFIERS)}, "
+                f"{rng.choice(legal_terms)} the terms set forth herein."
+            )
+        paragraph = f"{section}.{clause} {body}"
+        paragraphs.append(paragraph)
+        size += len(paragraph.encode("utf-8")) + 2
+
+    return "\n\n".join(paragraphs)[:size_bytes]
+
+def _pdf_escape(line: str) -> str:
+    line = line.encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def write_pdf(text: str, path: str, lines_per_page: int = 60, width: int = 95):
+    """
+    Write text to a minimal single-font PDF that PyPDF2 can extract
+
+    Args:
+        text: Text to write
+        path: Output file
+        lines_per_page: Lines of text per page
+        width: Characters per line
+    """
+    lines: List[str] = []
+    for paragraph in text.split("\n\n"):
+        lines.extend(textwrap.wrap(paragraph, width) or [""])
+        lines.append("")
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    objects = {3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    for index, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * index, 5 + 2 * index
+        kids.append(f"{page_id} 0 R")
+        stream = "BT /F1 10 Tf 12 TL 50 750 Td\n" + "".join(f"({_pdf_escape(line)}) Tj T*\n" for line in page_lines) + "ET"
+        data = stream.encode("latin-1")
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(data), data)
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1")
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode("latin-1")
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = {}
+        for object_id in sorted(objects):
+            offsets[object_id] = f.tell()
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (object_id, objects[object_id]))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for object_id in sorted(objects):
+            f.write(b"%010d 00000 n \n" % offsets[object_id])
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+def write_docx(text: str, path: str):
+    """Write text to a DOCX file, one paragraph per blank-line separated block"""
+    import docx
+
+    document = docx.Document()
+    for paragraph in text.split("\n\n"):
+        document.add_paragraph(paragraph)
+    document.save(path)
+
+def write_contract(text: str, path: str, file_format: str = "pdf"):
+    """Write contract text as a 'pdf' or 'docx' file"""
+    if file_format == "pdf":
+        write_pdf(text, path)
+    elif file_format == "docx":
+        write_docx(text, path)
+    else:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic contract")
+    parser.add_argument("--size", default="100KB", help="Target text size, e.g. 1KB, 5MB")
+    parser.add_argument("--format", choices=["pdf", "docx", "txt"], default="pdf", help="Output format")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", required=True, help="Output file")
+    args = parser.parse_args(argv)
+
+    text = generate_contract(parse_size(args.size), seed=args.seed)
+    if args.format == "txt":
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        write_contract(text, args.output, args.format)
+    print(f"Wrote {len(text):,} characters to {args.output}")
+
+if __name__ == "__main__":
+    main()
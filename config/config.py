@@ -2,6 +2,7 @@
 Configuration settings for the Legal AI Platform
 """
 import os
+import json
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -10,6 +11,49 @@ load_dotenv()
 # API Configuration
 GROUPQ_API_KEY = os.getenv("GROUPQ_API_KEY", "")
 GROUPQ_API_URL = os.getenv("GROUPQ_API_URL", "https://api.groupq.ai/v1")
+GROUPQ_CHAT_COMPLETIONS_URL = os.getenv("GROUPQ_CHAT_COMPLETIONS_URL", "https://api.groq.com/openai/v1/chat/completions")
+GROUPQ_MODEL = os.getenv("GROUPQ_MODEL", "llama-3.3-70b-versatile")
+
+# Optional local model server speaking the same chat completions protocol (e.g. llama.cpp, vLLM, Ollama)
+LOCAL_LLM_URL = os.getenv("LOCAL_LLM_URL", "")  # e.g. http://127.0.0.1:8080/v1/chat/completions
+LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "llama-3.1-8b-instruct")
+LOCAL_LLM_API_KEY = os.getenv("LOCAL_LLM_API_KEY", "")
+
+def _load_json_env(name: str, default):
+    """Parse a JSON environment variable, falling back to the default on errors"""
+    value = os.getenv(name, "")
+    if not value:
+        return default
+    try:
+        return json.loads(value)
+    except ValueError:
+        print(f"Error parsing {name}: expected JSON")
+        return default
+
+def _default_llm_backends():
+    backends = {
+        "groq": {"url": GROUPQ_CHAT_COMPLETIONS_URL, "model": GROUPQ_MODEL, "api_key": GROUPQ_API_KEY, "requires_api_key": True}
+    }
+    if LOCAL_LLM_URL:
+        backends["local"] = {"url": LOCAL_LLM_URL, "model": LOCAL_LLM_MODEL, "api_key": LOCAL_LLM_API_KEY, "requires_api_key": False}
+    return backends
+
+def _default_llm_routes():
+    # Every feature fails over to the local backend when one is configured
+    return {"default": ["groq", "local"] if LOCAL_LLM_URL else ["groq"]}
+
+# LLM backends by name: {"name": {"url": ..., "model": ..., "api_key": ..., "requires_api_key": bool}}
+LLM_BACKENDS = _load_json_env("LLM_BACKENDS", _default_llm_backends())
+
+# Per-feature routing in failover order, e.g. {"chat": ["groq"], "risk_explanations": ["local", "groq"]}.
+# Features without an entry use the "default" route.
+LLM_ROUTES = {**_default_llm_routes(), **_load_json_env("LLM_ROUTES", {})}
+
+# Pooled HTTP connections kept open per LLM backend host, shared by all sessions
+LLM_HTTP_POOL_SIZE = int(os.getenv("LLM_HTTP_POOL_SIZE", "20"))
+
+# Seconds before an unhealthy backend is probed again
+LLM_BACKEND_RECHECK_INTERVAL = float(os.getenv("LLM_BACKEND_RECHECK_INTERVAL", "30"))
 
 # Model Configuration
 SUMMARIZATION_MODEL = os.getenv("SUMMARIZATION_MODEL", "groupq")  # Options: 'groupq', 'local'
@@ -17,12 +61,104 @@ RISK_DETECTION_MODEL = os.getenv("RISK_DETECTION_MODEL", "rule_based")  # Option
 TRANSLATION_MODEL = os.getenv("TRANSLATION_MODEL", "googletrans")  # Options: 'indictrans', 'googletrans', 'marianmt'
 SIMPLIFICATION_MODEL = os.getenv("SIMPLIFICATION_MODEL", "groupq")  # Options: 'groupq', 'local'
 
+# LLM Request Configuration
+GROUPQ_MAX_RETRIES = int(os.getenv("GROUPQ_MAX_RETRIES", "2"))  # Retries on 429/5xx responses
+GROUPQ_RETRY_BACKOFF = float(os.getenv("GROUPQ_RETRY_BACKOFF", "1.0"))  # Base backoff in seconds
+
+# LLM timeouts: read timeouts are derived from max_tokens and the measured tokens per second
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT_MIN = float(os.getenv("LLM_READ_TIMEOUT_MIN", "10"))
+LLM_READ_TIMEOUT_MAX = float(os.getenv("LLM_READ_TIMEOUT_MAX", "180"))
+LLM_STREAM_IDLE_TIMEOUT = float(os.getenv("LLM_STREAM_IDLE_TIMEOUT", "15"))  # Max gap between streamed chunks
+LLM_DEFAULT_TOKENS_PER_SECOND = float(os.getenv("LLM_DEFAULT_TOKENS_PER_SECOND", "100"))
+LLM_TIMEOUT_SAFETY_FACTOR = float(os.getenv("LLM_TIMEOUT_SAFETY_FACTOR", "2.0"))
+
+# max_tokens sizing from input length and historical output length per feature
+LLM_ADAPTIVE_MAX_TOKENS = os.getenv("LLM_ADAPTIVE_MAX_TOKENS", "true").lower() == "true"
+LLM_MAX_COMPLETION_TOKENS = int(os.getenv("LLM_MAX_COMPLETION_TOKENS", "8192"))
+LLM_MIN_COMPLETION_TOKENS = int(os.getenv("LLM_MIN_COMPLETION_TOKENS", "256"))
+
+# Prompt token budgets per feature. Longer documents are chunked (summary, simplify) or
+# truncated (chat history, analysis, guide topics); anything still over budget is rejected
+# before it is sent. The analysis response repeats the document simplified, so its budget
+# stays within what LLM_MAX_COMPLETION_TOKENS can hold.
+LLM_TOKEN_BUDGETS = {
+    "summary": 12000,
+    "simplify": 4000,
+    "chat": 6000,
+    "guide": 3000,
+    "guide_section": 1500,
+    "analysis": 4500,
+    "risk_explanations": 4000,
+    **_load_json_env("LLM_TOKEN_BUDGETS", {})
+}
+LLM_CHUNK_WORKERS = int(os.getenv("LLM_CHUNK_WORKERS", "4"))  # Concurrent requests when chunking a document
+
+# Background document processing
+JOB_QUEUE_WORKERS = int(os.getenv("JOB_QUEUE_WORKERS", "2"))  # Documents processed concurrently across all sessions
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))  # How long finished jobs wait to be collected
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))  # Seconds between status refreshes in the UI
+
+# Strip boilerplate and repeated clauses from document text before summarizing or simplifying
+PROMPT_COMPRESSION_ENABLED = os.getenv("PROMPT_COMPRESSION_ENABLED", "true").lower() == "true"
+
+# Concurrent section requests when generating legal guides in parallel
+GUIDE_PARALLEL_WORKERS = int(os.getenv("GUIDE_PARALLEL_WORKERS", "9"))
+GUIDE_PARALLEL_SECTIONS = os.getenv("GUIDE_PARALLEL_SECTIONS", "true").lower() == "true"
+GUIDE_CACHE_SIZE = int(os.getenv("GUIDE_CACHE_SIZE", "100"))  # Generated guides shared by all sessions
+
+# Batched risk explanations
+RISK_EXPLAINER_BATCH_TOKENS = int(os.getenv("RISK_EXPLAINER_BATCH_TOKENS", "3000"))  # Prompt tokens per batch
+RISK_EXPLAINER_CLAUSE_TOKENS = int(os.getenv("RISK_EXPLAINER_CLAUSE_TOKENS", "1000"))  # Clause text sent per clause; longer clauses are cut
+RISK_EXPLAINER_CACHE_SIZE = int(os.getenv("RISK_EXPLAINER_CACHE_SIZE", "5000"))  # Cached clause explanations
+
+# LLM pricing in USD per million tokens (input, output)
+LLM_PRICING = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+
 # Path Configuration
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 TRAINING_DATA_DIR = os.path.join(DATA_DIR, "training")
 DICTIONARIES_DIR = os.path.join(DATA_DIR, "dictionaries")
 TEMP_DIR = os.path.join(BASE_DIR, "temp")
+LOGS_DIR = os.getenv("LOGS_DIR", os.path.join(BASE_DIR, "logs"))
+DOCUMENT_STORE_PATH = os.getenv("DOCUMENT_STORE_PATH", os.path.join(DATA_DIR, "documents.db"))
+
+# In-memory text compression: texts at least this long are kept zlib-compressed,
+# with recently read texts cached decompressed up to a total number of characters
+TEXT_COMPRESSION_MIN_CHARS = int(os.getenv("TEXT_COMPRESSION_MIN_CHARS", "2048"))
+TEXT_CACHE_MAX_CHARS = int(os.getenv("TEXT_CACHE_MAX_CHARS", str(16 * 1024 * 1024)))
+
+# Dashboard charts: serialized Plotly figures kept per data version and chart parameters
+FIGURE_CACHE_SIZE = int(os.getenv("FIGURE_CACHE_SIZE", "200"))
+
+# Highlighted document view: characters of text rendered per page
+HIGHLIGHT_PAGE_CHARS = int(os.getenv("HIGHLIGHT_PAGE_CHARS", "20000"))
+
+# Telemetry Configuration
+LLM_TELEMETRY_ENABLED = os.getenv("LLM_TELEMETRY_ENABLED", "true").lower() == "true"
+LLM_TELEMETRY_LOG = os.getenv("LLM_TELEMETRY_LOG", os.path.join(LOGS_DIR, "llm_calls.jsonl"))
+LLM_TELEMETRY_MAX_BYTES = int(os.getenv("LLM_TELEMETRY_MAX_BYTES", str(10 * 1024 * 1024)))
+LLM_TELEMETRY_BACKUP_COUNT = int(os.getenv("LLM_TELEMETRY_BACKUP_COUNT", "5"))
+
+# Profiling: time every function of the document pipeline, optionally with cProfile
+# and tracemalloc captures per document (adds overhead; for diagnosis only)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_CPROFILE = os.getenv("PROFILING_CPROFILE", "false").lower() == "true"
+PROFILING_TRACEMALLOC = os.getenv("PROFILING_TRACEMALLOC", "false").lower() == "true"
+PROFILING_HISTORY = int(os.getenv("PROFILING_HISTORY", "20"))
+
+# Session links: the URL carries a signed token that reopens a session's documents until
+# it expires. Anyone holding an unexpired link can open those documents.
+SESSION_SECRET = os.getenv("SESSION_SECRET", "")  # Signing key; generated and kept in SESSION_SECRET_PATH if empty
+SESSION_SECRET_PATH = os.getenv("SESSION_SECRET_PATH", os.path.join(DATA_DIR, "session_secret"))
+SESSION_TOKEN_TTL_HOURS = float(os.getenv("SESSION_TOKEN_TTL_HOURS", "12"))
+
+# Admin pages (LLM usage, performance) are hidden unless enabled
+ENABLE_ADMIN_PAGES = os.getenv("ENABLE_ADMIN_PAGES", "false").lower() == "true"
 
 # Translation Configuration
 SUPPORTED_LANGUAGES = {
@@ -47,8 +183,11 @@ RISK_THRESHOLD_HIGH = 0.8
 MAX_FILE_SIZE_MB = 10
 SUPPORTED_EXTENSIONS = [".pdf", ".docx"]
 
-# Ensure directories exist
-os.makedirs(TEMP_DIR, exist_ok=True)
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(TRAINING_DATA_DIR, exist_ok=True)
-os.makedirs(DICTIONARIES_DIR, exist_ok=True)
\ No newline at end of file
+# NLTK data: download missing tokenizers on first use (disable for offline containers;
+# sentence splitting then falls back to a regular expression)
+NLTK_DOWNLOAD_ENABLED = os.getenv("NLTK_DOWNLOAD_ENABLED", "true").lower() == "true"
+
+def ensure_directories():
+    """Create the data and temp directories; called once at app startup, not on import"""
+    for directory in (TEMP_DIR, DATA_DIR, TRAINING_DATA_DIR, DICTIONARIES_DIR):
+        os.makedirs(directory, exist_ok=True)
@@ -0,0 +1,253 @@
+"""
+Compact storage for the risky clauses detected in a document
+"""
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+# Either the document text itself or a callable returning it (e.g. from a compressed record)
+TextSource = Union[str, Callable[[], str]]
+
+CLAUSE_FIELDS = ("text", "risk_type", "start_index", "end_index", "confidence")
+
+class Clause:
+    """Read-only, dict-like view of one clause of a ClauseSet"""
+
+    __slots__ = ("clause_set", "index")
+
+    def __init__(self, clause_set: "ClauseSet", index: int):
+        self.clause_set = clause_set
+        self.index = index
+
+    def __getitem__(self, key: str) -> Any:
+        return self.clause_set.field(self.index, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        return key in CLAUSE_FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(CLAUSE_FIELDS)
+
+    def __len__(self) -> int:
+        return len(CLAUSE_FIELDS)
+
+    def keys(self):
+        return CLAUSE_FIELDS
+
+    def items(self):
+        return [(key, self[key]) for key in CLAUSE_FIELDS]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"Clause({self.to_dict()!r})"
+
+class ClauseSet:
+    """
+    Risky clauses stored as parallel arrays of risk type ids, offsets and confidences
+
+    Clause text is not copied: it is read as a span of the document text, so a ClauseSet
+    costs a few bytes per clause. Clauses whose offsets do not reproduce their text (e.g.
+    clauses loaded from older data) keep that text in `overrides`. Iterating or indexing
+    yields read-only dict-like Clause views, so code written for lists of clause dicts
+    keeps working; the aggregation helpers work on the arrays directly.
+    """
+
+    __slots__ = ("risk_types", "type_index", "type_ids", "starts", "ends", "confidences", "overrides", "source")
+
+    def __init__(self, source: TextSource = ""):
+        """
+        Initialize an empty set
+
+        Args:
+            source: Text the clause offsets refer to, or a callable returning it
+        """
+        self.risk_types: List[str] = []
+        self.type_index: Dict[str, int] = {}
+        self.type_ids = array("H")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.confidences = array("d")
+        self.overrides: Dict[int, str] = {}
+        self.source = source
+
+    def document_text(self) -> str:
+        """Return the text the clause offsets refer to"""
+        return self.source() if callable(self.source) else self.source
+
+    def append(self, risk_type: str, start: int, end: int, confidence: float = 1.0, text: Optional[str] = None):
+        """
+        Add a clause
+
+        Args:
+            risk_type: Risk category
+            start: Start offset in the document text
+            end: End offset in the document text
+            confidence: Detection confidence
+            text: Clause text to keep when it differs from the span
+        """
+        type_id = self.type_index.get(risk_type)
+        if type_id is None:
+            type_id = self.type_index[risk_type] = len(self.risk_types)
+            self.risk_types.append(risk_type)
+
+        if text is not None:
+            self.overrides[len(self.starts)] = text
+        self.type_ids.append(type_id)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.confidences.append(confidence)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Clause:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("clause index out of range")
+        return Clause(self, index)
+
+    def __iter__(self) -> Iterator[Clause]:
+        return (Clause(self, index) for index in range(len(self)))
+
+    def text(self, index: int, text: Optional[str] = None) -> str:
+        """Return one clause's text; pass the document text when reading many clauses"""
+        if index in self.overrides:
+            return self.overrides[index]
+        if text is None:
+            text = self.document_text()
+        return text[self.starts[index]:self.ends[index]]
+
+    def field(self, index: int, key: str) -> Any:
+        """Return one field of a clause by its dict key"""
+        if key == "text":
+            return self.text(index)
+        if key == "risk_type":
+            return self.risk_types[self.type_ids[index]]
+        if key == "start_index":
+            return self.starts[index]
+        if key == "end_index":
+            return self.ends[index]
+        if key == "confidence":
+            return self.confidences[index]
+        raise KeyError(key)
+
+    def texts(self, max_chars: Optional[int] = None) -> List[str]:
+        """
+        Return the text of every clause, reading the document text once
+
+        Args:
+            max_chars: Truncate each text to this many characters
+        """
+        text = self.document_text() if len(self.overrides) < len(self) else ""
+        texts = [self.text(index, text) for index in range(len(self))]
+        if max_chars is not None:
+            texts = [clause_text[:max_chars] for clause_text in texts]
+        return texts
+
+    def risk_type_names(self) -> List[str]:
+        """Return the risk type of every clause"""
+        names = self.risk_types
+        return [names[type_id] for type_id in self.type_ids]
+
+    def risk_type_counts(self) -> Dict[str, int]:
+        """Return the number of clauses per risk type"""
+        counts = [0] * len(self.risk_types)
+        for type_id in self.type_ids:
+            counts[type_id] += 1
+        return {risk_type: count for risk_type, count in zip(self.risk_types, counts) if count}
+
+    def weighted_confidence(self, weights: Dict[str, float], default: float = 0.5) -> float:
+        """
+        Return the sum of confidence times risk type weight over all clauses
+
+        Args:
+            weights: Weight per risk type
+            default: Weight of risk types missing from weights
+        """
+        type_weights = [weights.get(risk_type, default) for risk_type in self.risk_types]
+        return sum(type_weights[type_id] * confidence for type_id, confidence in zip(self.type_ids, self.confidences))
+
+    def to_columns(self) -> Dict[str, Any]:
+        """Return the clauses column by column (risk_type, start_index, end_index, confidence), e.g. for a DataFrame"""
+        return {
+            "risk_type": self.risk_type_names(),
+            "start_index": self.starts,
+            "end_index": self.ends,
+            "confidence": self.confidences
+        }
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Return the clauses as a list of plain dicts"""
+        return [clause.to_dict() for clause in self]
+
+    def to_storage(self) -> Dict[str, Any]:
+        """Return a JSON-serializable form without the clause texts"""
+        return {
+            "risk_types": list(self.risk_types),
+            "type_ids": self.type_ids.tolist(),
+            "starts": self.starts.tolist(),
+            "ends": self.ends.tolist(),
+            "confidences": self.confidences.tolist(),
+            "overrides": {str(index): text for index, text in self.overrides.items()}
+        }
+
+    @classmethod
+    def from_storage(cls, data: Dict[str, Any], source: TextSource = "") -> "ClauseSet":
+        """Rebuild a set from to_storage() output"""
+        clause_set = cls(source)
+        clause_set.risk_types = list(data.get("risk_types", []))
+        clause_set.type_index = {risk_type: type_id for type_id, risk_type in enumerate(clause_set.risk_types)}
+        clause_set.type_ids = array("H", data.get("type_ids", []))
+        clause_set.starts = array("q", data.get("starts", []))
+        clause_set.ends = array("q", data.get("ends", []))
+        clause_set.confidences = array("d", data.get("confidences", []))
+        clause_set.overrides = {int(index): text for index, text in data.get("overrides", {}).items()}
+        return clause_set
+
+    @classmethod
+    def from_dicts(cls, clauses: Iterable[Dict[str, Any]], source: TextSource = "") -> "ClauseSet":
+        """
+        Build a set from clause dicts
+
+        Clauses whose 'text' matches their span of the source are stored as spans only.
+
+        Args:
+            clauses: Dicts with 'risk_type', 'start_index', 'end_index', 'confidence' and 'text'
+            source: Text the offsets refer to, or a callable returning it
+        """
+        clause_set = cls(source)
+        text = None
+        for clause in clauses:
+            start = clause.get("start_index", 0)
+            end = clause.get("end_index", 0)
+            clause_text = clause.get("text")
+            if clause_text is not None:
+                if text is None:
+                    try:
+                        text = clause_set.document_text()
+                    except KeyError:
+                        text = ""
+                if text[start:end] == clause_text:
+                    clause_text = None
+            clause_set.append(
+                clause.get("risk_type", "unknown"),
+                start,
+                end,
+                clause.get("confidence", 1.0),
+                text=clause_text
+            )
+        return clause_set
+
+def as_clause_set(clauses: Optional[Iterable[Dict[str, Any]]]) -> ClauseSet:
+    """Return clauses as a ClauseSet, converting a list of clause dicts if needed"""
+    if isinstance(clauses, ClauseSet):
+        return clauses
+    return ClauseSet.from_dicts(clauses or [])
@@ -3,73 +3,126 @@ Risk detection model for identifying risky clauses in legal documents
 """
 import os
 import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from config.config import RISK_DETECTION_MODEL
-from services.risk_scoring import load_risk_keywords
+from models.clause_set import ClauseSet
+from utils.document_utils import SENTENCE_GAP_PATTERN, split_into_paragraph_spans
 
-def detect_risky_clauses(text: str) -> List[Dict[str, Any]]:
+class RiskMatcher:
+    """Matches paragraphs against risk keywords lowercased once for a keywords dictionary"""
+    
+    def __init__(self, risk_keywords: Dict[str, List[str]]):
+        """
+        Prepare the keywords
+        
+        Args:
+            risk_keywords: Risk type -> keywords, from load_risk_keywords()
+        """
+        self.keywords = [
+            (risk_type, [keyword.lower() for keyword in keywords])
+            for risk_type, keywords in risk_keywords.items()
+        ]
+        
+        # Keyword counts of a paragraph's chunks (see split_into_chunk_spans) add up to the
+        # paragraph's counts unless a keyword can match the whitespace between two chunks
+        self.chunkable = not any(
+            not keyword or keyword[0].isspace() or SENTENCE_GAP_PATTERN.search(keyword)
+            for _, keywords in self.keywords
+            for keyword in keywords
+        )
+    
+    def detect(self, paragraph: str) -> Optional[Tuple[str, float]]:
+        """
+        Detect the risk of a single paragraph
+        
+        Args:
+            paragraph: Paragraph text
+            
+        Returns:
+            (risk_type, confidence) of the first matching risk type, or None
+        """
+        lowered = paragraph.lower()
+        for risk_type, keywords in self.keywords:
+            for keyword in keywords:
+                if keyword in lowered:
+                    # Calculate confidence based on keyword match strength
+                    # More exact matches have higher confidence
+                    confidence = min(0.9, 0.5 + 0.2 * lowered.count(keyword))
+                    return risk_type, confidence
+        return None
+
+    def keyword_counts(self, text: str) -> List[List[int]]:
+        """
+        Count the occurrences of every keyword in a text
+        
+        Args:
+            text: Paragraph or chunk text
+            
+        Returns:
+            [risk type index, keyword index, count] for every keyword found
+        """
+        lowered = text.lower()
+        counts = []
+        for type_index, (_, keywords) in enumerate(self.keywords):
+            for keyword_index, keyword in enumerate(keywords):
+                count = lowered.count(keyword)
+                if count:
+                    counts.append([type_index, keyword_index, count])
+        return counts
+    
+    def detect_from_counts(self, counts: Dict[Tuple[int, int], int]) -> Optional[Tuple[str, float]]:
+        """
+        Detect the risk of a paragraph from its keyword counts, with the same result as detect()
+        
+        Args:
+            counts: (risk type index, keyword index) -> occurrences in the paragraph
+            
+        Returns:
+            (risk_type, confidence) of the first matching risk type, or None
+        """
+        for type_index, (risk_type, keywords) in enumerate(self.keywords):
+            for keyword_index in range(len(keywords)):
+                count = counts.get((type_index, keyword_index))
+                if count:
+                    return risk_type, min(0.9, 0.5 + 0.2 * count)
+        return None
+
+def detect_paragraph_risk(paragraph: str, risk_keywords: Dict[str, List[str]]) -> Optional[Tuple[str, float]]:
     """
-    Detect risky clauses in the document text
+    Detect the risk of a single paragraph
     
     Args:
-        text: Document text
+        paragraph: Paragraph text
+        risk_keywords: Risk type -> keywords, from load_risk_keywords()
         
     Returns:
-        List of detected risky clauses
+        (risk_type, confidence) of the first matching risk type, or None
     """
-    # Load risk keywords
-    risk_keywords = load_risk_keywords()
-    
-    risky_clauses = []
-    
-    # Split text into paragraphs
-    paragraphs = text.split('\n\n')
+    return RiskMatcher(risk_keywords).detect(paragraph)
+
+def detect_risky_clauses(text: str) -> ClauseSet:
+    """
+    Detect risky clauses in the document text
     
-    # Track current position in the text
-    current_pos = 0
+    Each paragraph (see split_into_paragraph_spans) is reported at most once, with the
+    first risk type whose keywords it contains. Text without blank lines is one paragraph.
     
-    for paragraph in paragraphs:
-        if not paragraph.strip():
-            # Skip empty paragraphs
-            current_pos += len(paragraph) + 2  # +2 for newlines
-            continue
-        
-        # Check if paragraph contains any risk keywords
-        for risk_type, keywords in risk_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in paragraph.lower():
-                    # Found a risk keyword
-                    start_index = current_pos
-                    end_index = current_pos + len(paragraph)
-                    
-                    # Calculate confidence based on keyword match strength
-                    # More exact matches have higher confidence
-                    matches = re.findall(re.escape(keyword.lower()), paragraph.lower())
-                    confidence = min(0.9, 0.5 + 0.2 * len(matches))
-                    
-                    # Add the risky clause
-                    risky_clauses.append({
-                        "text": paragraph,
-                        "risk_type": risk_type,
-                        "start_index": start_index,
-                        "end_index": end_index,
-                        "confidence": confidence
-                    })
-                    
-                    # Move to next risk type once we find a match
-                    break
+    Args:
+        text: Document text
         
-        # Update position
-        current_pos += len(paragraph) + 2  # +2 for newlines
+    Returns:
+        ClauseSet of detected risky clauses, referencing spans of text
+    """
+    from services.shared_resources import get_risk_matcher
     
-    # Remove duplicates (same paragraph, different risk types)
-    unique_clauses = []
-    seen_indices = set()
+    # Keywords prepared once per process for the dictionaries on disk
+    risk_matcher = get_risk_matcher()
     
-    for clause in risky_clauses:
-        index_key = f"{clause['start_index']}-{clause['end_index']}"
-        if index_key not in seen_indices:
-            unique_clauses.append(clause)
-            seen_indices.add(index_key)
+    risky_clauses = ClauseSet(text)
+    for start_index, end_index in split_into_paragraph_spans(text):
+        risk = risk_matcher.detect(text[start_index:end_index])
+        if risk is not None:
+            risk_type, confidence = risk
+            risky_clauses.append(risk_type, start_index, end_index, confidence)
     
-    return unique_clauses
\ No newline at end of file
+    return risky_clauses
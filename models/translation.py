@@ -1,14 +1,8 @@
 """
 Document summarization model for legal documents
 """
-import nltk
 from config.config import SUMMARIZATION_MODEL
-
-# Ensure NLTK punkt tokenizer is available
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+from utils.document_utils import split_into_sentences
 
 def summarize_document(text: str) -> str:
     """
@@ -21,7 +15,7 @@ def summarize_document(text: str) -> str:
         Summarized text
     """
     # Simple extractive summarization
-    sentences = nltk.sent_tokenize(text)
+    sentences = split_into_sentences(text)
     
     # If very few sentences, return as is
     if len(sentences) <= 5:
@@ -8,6 +8,7 @@ import os
 from typing import Dict, List, Any
 import pandas as pd
 from config.config import DATA_DIR
+from services.shared_resources import get_groupq_service
 
 def get_mock_chat_response(query: str) -> str:
     """Get detailed response for the chatbot based on query content"""
@@ -170,11 +171,6 @@ def show_chatbot_page():
 def show_chatbot_tab():
     """Display the legal chatbot tab"""
     
-    # Initialize Groq service if not already initialized
-    if 'groupq_service' not in st.session_state:
-        from services.groupq_service import GroupQService
-        st.session_state.groupq_service = GroupQService()
-    
     # Custom CSS for better chat styling
     st.markdown("""
     <style>
@@ -320,12 +316,15 @@ def show_chatbot_tab():
                 "content": user_input
             })
             
-            # Get response from Groq API
-            with st.spinner("Thinking..."):
-                response = st.session_state.groupq_service.chat_query(
-                    user_input,
-                    st.session_state.chat_history
-                )
+            # Stream the response from Groq API so the first words show up immediately
+            response_placeholder = st.empty()
+            response = ""
+            for chunk in get_groupq_service().chat_query_stream(
+                user_input,
+                st.session_state.chat_history
+            ):
+                response += chunk
+                response_placeholder.markdown(response)
             
             # Add assistant message to chat history
             st.session_state.chat_history.append({
@@ -374,7 +373,7 @@ def show_chatbot_tab():
                 })
                 
                 # Get response from Groq API
-                response = st.session_state.groupq_service.chat_query(
+                response = get_groupq_service().chat_query(
                     actual_question,
                     st.session_state.chat_history
                 )
@@ -2,21 +2,19 @@
 Document analysis page for the Legal AI Platform
 """
 import streamlit as st
+import html
 import os
 import time
-import uuid
+from typing import Dict, Any
 
-from config.config import SUPPORTED_LANGUAGES, MAX_FILE_SIZE_MB, SUPPORTED_EXTENSIONS
-from utils.document_utils import (
-    save_uploaded_file,
-    extract_text_from_document,
-    preprocess_text,
-    extract_document_metadata
-)
-from models.summarization import summarize_document
-from models.risk_detection import detect_risky_clauses
-from models.simplification import simplify_legal_jargon
-from services.risk_scoring import calculate_risk_score, get_risk_recommendations
+from config.config import SUPPORTED_LANGUAGES, MAX_FILE_SIZE_MB, SUPPORTED_EXTENSIONS, JOB_POLL_INTERVAL
+from utils.document_utils import save_uploaded_file, compute_content_hash
+from services.risk_scoring import get_risk_recommendations
+from services.document_processor import DocumentProcessor, DOCUMENT_PIPELINE_STAGES
+from services.document_store import get_document_store
+from services.shared_resources import get_groupq_service
+from services.job_queue import get_job_queue, JOB_QUEUED, JOB_RUNNING, JOB_COMPLETED, JOB_FAILED
+from services.risk_explainer import RiskExplainer
 
 def show_document_analysis_page():
     """Display the document analysis page"""
@@ -42,6 +40,11 @@ def show_document_analysis_page():
     # Simplification tab
     with tabs[3]:
         show_simplification_tab()
+    
+    # Poll background jobs until they finish
+    if st.session_state.get("document_jobs"):
+        time.sleep(JOB_POLL_INTERVAL)
+        st.rerun()
 
 def show_upload_tab():
     """Display the document upload tab"""
@@ -74,74 +77,109 @@ def show_upload_tab():
         
         # Process button
         if st.button("Process Document"):
-            with st.spinner("Processing document..."):
-                try:
-                    # Generate a unique ID for this document
-                    doc_id = str(uuid.uuid4())
-                    
-                    # Save the uploaded file
-                    file_path = save_uploaded_file(uploaded_file)
-                    
-                    # Extract text from the document
-                    raw_text = extract_text_from_document(file_path)
-                    
-                    # Preprocess the text
-                    processed_text = preprocess_text(raw_text)
-                    
-                    # Extract metadata
-                    metadata = extract_document_metadata(processed_text)
-                    
-                    # Summarize the document
-                    summary = summarize_document(processed_text)
-                    
-                    # Detect risky clauses
-                    risky_clauses = detect_risky_clauses(processed_text)
-                    
-                    # Calculate risk score
-                    risk_score, risk_level = calculate_risk_score(risky_clauses)
-                    
-                    # Store the processed document
-                    doc_data = {
-                        "id": doc_id,
-                        "filename": uploaded_file.name,
-                        "file_type": file_ext,
-                        "file_size": uploaded_file.size,
-                        "raw_text": raw_text,
-                        "processed_text": processed_text,
-                        "metadata": metadata,
-                        "summary": summary,
-                        "risky_clauses": risky_clauses,
-                        "risk_score": risk_score,
-                        "risk_level": risk_level
-                    }
-                    
-                    # Initialize if not exists
-                    if 'uploaded_docs' not in st.session_state:
-                        st.session_state.uploaded_docs = {}
-                    if 'analyzed_docs' not in st.session_state:
-                        st.session_state.analyzed_docs = {}
-                    
-                    # Store in session state
-                    st.session_state.uploaded_docs[doc_id] = doc_data
-                    st.session_state.analyzed_docs[doc_id] = doc_data
-                    
-                    # Set active document
-                    st.session_state.active_doc_id = doc_id
-                    
-                    # Clean up temporary file
-                    try:
-                        os.remove(file_path)
-                    except:
-                        pass
-                    
-                    # Success message
-                    st.success("Document processed successfully!")
-                    
-                    # Navigation message
-                    st.markdown("👉 Navigate to the **Summary** tab to view document analysis.")
-                    
-                except Exception as e:
-                    st.error(f"Error processing document: {str(e)}")
+            try:
+                doc_id = compute_content_hash(uploaded_file)
+                
+                if get_document_store().exists(doc_id):
+                    # Identical content was analyzed before, possibly in another session
+                    attach_document(doc_id, uploaded_file.name)
+                    st.success(f"{uploaded_file.name} was analyzed before - open the Summary tab to view the analysis.")
+                else:
+                    # The pipeline runs in the background so this session stays responsive
+                    job = get_job_queue().submit(
+                        process_upload,
+                        uploaded_file,
+                        doc_id,
+                        label=uploaded_file.name,
+                        stages=DOCUMENT_PIPELINE_STAGES,
+                        owner=st.session_state.session_id
+                    )
+                    st.session_state.document_jobs.append(job.id)
+                
+            except Exception as e:
+                st.error(f"Error processing document: {str(e)}")
+    
+    show_document_jobs()
+
+def process_upload(job, uploaded_file, doc_id: str):
+    """Background job: analyze an upload, reusing an analysis of identical content finished meanwhile"""
+    existing = get_document_store().get(doc_id)
+    if existing is not None:
+        return existing
+    return DocumentProcessor().process_file(
+        save_uploaded_file(uploaded_file),
+        uploaded_file.name,
+        uploaded_file.size,
+        job=job,
+        doc_id=doc_id
+    )
+
+def attach_document(doc_id: str, filename: str):
+    """Add a stored document to this session under the user's file name and make it active"""
+    get_document_store().add_upload(doc_id, st.session_state.session_id, filename)
+    if doc_id not in st.session_state.document_ids:
+        st.session_state.document_ids.append(doc_id)
+    st.session_state.active_doc_id = doc_id
+
+def show_document_jobs():
+    """Display the status of this session's background processing jobs"""
+    
+    queue = get_job_queue()
+    jobs = [job for job in (queue.get(job_id) for job_id in st.session_state.document_jobs) if job is not None]
+    if not jobs:
+        return
+    
+    st.markdown("### Processing")
+    st.caption("Documents are processed in the background - you can switch tabs or pages while you wait.")
+    
+    for job in jobs:
+        status = job.status_dict()
+        col1, col2 = st.columns([4, 1])
+        
+        with col1:
+            if status["status"] == JOB_QUEUED:
+                text = f"**{status['label']}** - waiting in queue"
+            elif status["status"] == JOB_RUNNING:
+                text = f"**{status['label']}** - {status['stage'] or 'Starting'} ({status['elapsed_s']:.0f}s)"
+            else:
+                text = f"**{status['label']}** - {status['status']}"
+            st.progress(status["progress"], text=text)
+        
+        with col2:
+            if not job.finished and st.button("Cancel", key=f"cancel_job_{job.id}"):
+                queue.cancel(job.id)
+                st.rerun()
+
+def collect_document_jobs():
+    """Move finished background jobs for this session into session state"""
+    
+    if not st.session_state.get("document_jobs"):
+        return
+    
+    queue = get_job_queue()
+    pending = []
+    
+    for job_id in st.session_state.document_jobs:
+        job = queue.get(job_id)
+        if job is None:
+            continue
+        if not job.finished:
+            pending.append(job_id)
+            continue
+        
+        if job.status == JOB_COMPLETED:
+            doc_data = job.result
+            
+            # Persist the document; session state keeps only its ID
+            doc_id = get_document_store().save(doc_data)
+            attach_document(doc_id, job.label)
+            st.toast(f"{job.label} processed successfully! Open the Summary tab to view the analysis.")
+        elif job.status == JOB_FAILED:
+            st.toast(f"Error processing {job.label}: {job.error}")
+        
+        queue.remove(job_id)
+    
+    st.session_state.document_jobs = pending
 
 def show_summary_tab():
     """Display the document summary tab"""
@@ -153,12 +191,11 @@ def show_summary_tab():
     
     # Get the active document
     doc_id = st.session_state.active_doc_id
-    if doc_id not in st.session_state.analyzed_docs:
+    doc_data = get_document_store().get(doc_id, owner=st.session_state.session_id) if doc_id in st.session_state.document_ids else None
+    if doc_data is None:
         st.error("Document not found. Please upload a document first.")
         return
     
-    doc_data = st.session_state.analyzed_docs[doc_id]
-    
     # Display document summary
     st.markdown(f"### Document Summary: {doc_data.get('filename', 'Unknown')}")
     
@@ -204,6 +241,41 @@ def show_summary_tab():
     # Full text expandable section
     with st.expander("View Full Document Text"):
         st.markdown(doc_data.get("processed_text", "No text available."))
+    
+    show_llm_analysis(doc_id, doc_data)
+
+def show_llm_analysis(doc_id: str, doc_data: Dict[str, Any]):
+    """Display the one-shot AI analysis (summary, risk annotations and simplification)"""
+    
+    st.markdown("### AI Analysis")
+    st.markdown("Get an AI summary, explained risk annotations and a plain-English version in a single request.")
+    
+    if st.button("Run AI Analysis"):
+        with st.spinner("Analyzing document with AI..."):
+            doc_data = DocumentProcessor().analyze_with_llm(doc_data, get_groupq_service())
+    
+    if doc_data.get("llm_analysis_error"):
+        st.error(doc_data["llm_analysis_error"])
+    
+    analysis = doc_data.get("llm_analysis")
+    if not analysis:
+        return
+    
+    st.markdown("#### AI Summary")
+    st.markdown(analysis["summary"])
+    
+    st.markdown("#### Risk Annotations")
+    if not analysis["risks"]:
+        st.info("The AI did not flag any risky clauses.")
+    for risk in analysis["risks"]:
+        risk_type = risk["risk_type"].replace("_", " ").title()
+        with st.expander(f"{risk_type} ({risk['severity']} severity)"):
+            # Quoted from the uploaded document, so any markup in it is shown as text
+            st.markdown(f"<div class='highlight'>{html.escape(risk['clause'])}</div>", unsafe_allow_html=True)
+            st.markdown(f"**Why it matters:** {risk['explanation']}")
+    
+    with st.expander("AI Plain-English Version"):
+        st.markdown(analysis["simplified_text"])
 
 def show_risk_analysis_tab():
     """Display the risk analysis tab"""
@@ -215,12 +287,11 @@ def show_risk_analysis_tab():
     
     # Get the active document
     doc_id = st.session_state.active_doc_id
-    if doc_id not in st.session_state.analyzed_docs:
+    doc_data = get_document_store().get(doc_id, owner=st.session_state.session_id) if doc_id in st.session_state.document_ids else None
+    if doc_data is None:
         st.error("Document not found. Please upload a document first.")
         return
     
-    doc_data = st.session_state.analyzed_docs[doc_id]
-    
     # Display risk analysis
     st.markdown(f"### Risk Analysis: {doc_data.get('filename', 'Unknown')}")
     
@@ -231,11 +302,21 @@ def show_risk_analysis_tab():
     if not risky_clauses:
         st.info("No risky clauses detected in this document.")
     else:
+        explainer = RiskExplainer(get_groupq_service())
+        
+        # Explanations are only requested on demand, batched into as few calls as possible
+        if st.button("Explain clauses in plain language"):
+            with st.spinner(f"Explaining {len(risky_clauses)} clauses..."):
+                result = explainer.explain(risky_clauses)
+            for error in set(result["errors"]):
+                st.error(error)
+        
         # Display each risky clause
         for i, clause in enumerate(risky_clauses):
             risk_type = clause.get("risk_type", "unknown").replace("_", " ").title()
             confidence = clause.get("confidence", 0)
             clause_text = clause.get("text", "")
+            explanation = explainer.get_cached(clause)
             
             # Create expandable section for each clause
             with st.expander(f"{risk_type} ({confidence:.2f} confidence)"):
@@ -244,7 +325,39 @@ def show_risk_analysis_tab():
                 
                 # Clause text
                 st.markdown("**Clause Text:**")
-                st.markdown(f"<div class='highlight'>{clause_text}</div>", unsafe_allow_html=True)
+                st.markdown(f"<div class='highlight'>{html.escape(clause_text)}</div>", unsafe_allow_html=True)
+                
+                if explanation:
+                    st.markdown(f"**In plain language:** {explanation}")
+    
+    show_highlighted_document(doc_id, doc_data, risky_clauses)
+
+def show_highlighted_document(doc_id: str, doc_data: Dict[str, Any], risky_clauses):
+    """Display the document text with its risky clauses highlighted, one page at a time"""
+    # Imported here so the page does not load Plotly until a document is shown
+    from utils.visualization import highlight_risky_text, paginate_text
+    
+    text = doc_data.get("processed_text", "")
+    if not text:
+        return
+    
+    st.markdown("### Highlighted Document")
+    
+    # Only the selected page is rendered and sent to the browser
+    pages = paginate_text(text)
+    page = 1
+    if len(pages) > 1:
+        page = st.number_input(
+            f"Page (of {len(pages)})",
+            min_value=1,
+            max_value=len(pages),
+            value=1,
+            step=1,
+            key=f"highlight_page_{doc_id}"
+        )
+    
+    start, end = pages[page - 1]
+    st.markdown(highlight_risky_text(text, risky_clauses, start, end), unsafe_allow_html=True)
 
 def show_simplification_tab():
     """Display the document simplification tab"""
@@ -256,12 +369,11 @@ def show_simplification_tab():
     
     # Get the active document
     doc_id = st.session_state.active_doc_id
-    if doc_id not in st.session_state.analyzed_docs:
+    doc_data = get_document_store().get(doc_id, owner=st.session_state.session_id) if doc_id in st.session_state.document_ids else None
+    if doc_data is None:
         st.error("Document not found. Please upload a document first.")
         return
     
-    doc_data = st.session_state.analyzed_docs[doc_id]
-    
     # Display simplification
     st.markdown(f"### Legal Jargon Simplification: {doc_data.get('filename', 'Unknown')}")
     
@@ -275,15 +387,8 @@ def show_simplification_tab():
     if st.button("Simplify Document"):
         with st.spinner("Simplifying document..."):
             try:
-                # Get the text to simplify
-                original_text = doc_data.get("processed_text", "")
-                
-                # Use the simplify_legal_jargon function to simplify the text
-                simplified_text = simplify_legal_jargon(original_text)
-                
-                # Store the simplified text in the document data
-                doc_data["simplified_text"] = simplified_text
-                st.session_state.analyzed_docs[doc_id] = doc_data
+                # Computed once on the document record and kept for later visits
+                doc_data["simplified_text"]
                 
                 st.success("Document simplified successfully!")
                 st.rerun()  # Rerun to display the simplified text
@@ -291,7 +396,7 @@ def show_simplification_tab():
                 st.error(f"Error simplifying document: {str(e)}")
     
     # Display simplified text if available
-    if "simplified_text" in doc_data and doc_data["simplified_text"]:
+    if doc_data.is_computed("simplified_text") and doc_data["simplified_text"]:
         col1, col2 = st.columns(2)
         
         with col1:
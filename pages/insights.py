@@ -3,11 +3,13 @@ Insights dashboard page for the Legal AI Platform
 """
 import streamlit as st
 import pandas as pd
-import numpy as np
-import datetime
 from typing import Dict, List, Any
 
+from services.document_processor import DocumentProcessor
+from services.insights_aggregates import WorkspaceAggregates, get_workspace_aggregates
+
 from utils.visualization import (
+    cached_figure,
     create_risk_trend_chart,
     create_document_comparison_chart,
     create_risk_distribution
@@ -19,8 +21,11 @@ def show_insights_page():
     # Main heading
     st.markdown('<h1 class="main-header">Legal Insights Dashboard</h1>', unsafe_allow_html=True)
     
+    # Aggregates are kept up to date as documents are added or removed, so only new documents are loaded
+    aggregates = get_workspace_aggregates(st.session_state.get("session_id"), st.session_state.get("document_ids", []))
+    
     # Check if any documents have been analyzed
-    if not hasattr(st.session_state, 'analyzed_docs') or not st.session_state.analyzed_docs:
+    if not aggregates.num_docs:
         st.info("No documents have been analyzed yet. Please upload and analyze documents first.")
         
         # Quick navigation to document analysis
@@ -41,43 +46,31 @@ def show_insights_page():
     
     # Overview tab
     with tabs[0]:
-        show_overview_tab()
+        show_overview_tab(aggregates)
     
     # Risk Analysis tab
     with tabs[1]:
-        show_risk_analysis_tab()
+        show_risk_analysis_tab(aggregates)
     
     # Document Comparison tab
     with tabs[2]:
-        show_document_comparison_tab()
+        show_document_comparison_tab(aggregates)
     
     # Trends tab
     with tabs[3]:
-        show_trends_tab()
+        show_trends_tab(aggregates)
 
-def show_overview_tab():
+def show_overview_tab(aggregates: WorkspaceAggregates):
     """Display the overview tab"""
     
     # Dashboard statistics
     st.markdown("### Document Portfolio Overview")
     
-    # Get document statistics
-    num_docs = len(st.session_state.analyzed_docs)
-    
-    # Calculate average risk and other metrics
-    avg_risk = np.mean([doc.get("risk_score", 0) for doc in st.session_state.analyzed_docs.values()])
-    
-    # Count risk levels
-    risk_levels = {"low": 0, "medium": 0, "high": 0}
-    for doc in st.session_state.analyzed_docs.values():
-        risk_level = doc.get("risk_level", "low")
-        risk_levels[risk_level] = risk_levels.get(risk_level, 0) + 1
-    
-    # Count document types
-    doc_types = {}
-    for doc in st.session_state.analyzed_docs.values():
-        doc_type = doc.get("file_type", "").upper()[1:]  # Remove dot and capitalize
-        doc_types[doc_type] = doc_types.get(doc_type, 0) + 1
+    # Document statistics, maintained as documents are added or removed
+    num_docs = aggregates.num_docs
+    avg_risk = aggregates.average_risk
+    risk_levels = aggregates.risk_levels
+    doc_types = aggregates.doc_types
     
     # Display statistics in columns
     col1, col2, col3, col4 = st.columns(4)
@@ -106,142 +99,105 @@ def show_overview_tab():
     st.markdown("### Recent Documents")
     
     # Create a table of recent documents
-    docs_data = []
-    for doc_id, doc in st.session_state.analyzed_docs.items():
-        # Create a simple timestamp from document ID (first 8 chars of UUID as hex timestamp)
-        timestamp = int(doc_id.split("-")[0], 16) % (10**10)
-        date = datetime.datetime.fromtimestamp(timestamp)
+    def build_recent_documents():
+        docs_data = [
+            {
+                "Document ID": doc_id,
+                "Filename": summary["filename"],
+                "Date Added": summary["date"].strftime("%Y-%m-%d") if summary["date"] else "Unknown",
+                "Risk Score": f"{summary['risk_score']:.2f}",
+                "Risk Level": summary["risk_level"].capitalize()
+            }
+            for doc_id, summary in aggregates.summaries.items()
+        ]
         
-        docs_data.append({
-            "Document ID": doc_id,
-            "Filename": doc.get("filename", "Unknown"),
-            "Date Added": date.strftime("%Y-%m-%d"),
-            "Risk Score": f"{doc.get('risk_score', 0):.2f}",
-            "Risk Level": doc.get("risk_level", "Unknown").capitalize()
-        })
-    
-    # Sort by date (newest first)
-    docs_data.sort(key=lambda x: x["Date Added"], reverse=True)
+        # Sort by date (newest first)
+        docs_data.sort(key=lambda x: (x["Date Added"] != "Unknown", x["Date Added"]), reverse=True)
+        return pd.DataFrame(docs_data)
     
     # Display as dataframe
-    df = pd.DataFrame(docs_data)
-    st.dataframe(df, use_container_width=True)
+    st.dataframe(aggregates.memo("recent_documents", build_recent_documents), use_container_width=True)
     
     # Most common risk types across all documents
     st.markdown("---")
     st.markdown("### Common Risk Types")
     
-    # Collect risk types from all documents
-    risk_counts = {}
-    for doc in st.session_state.analyzed_docs.values():
-        risky_clauses = doc.get("risky_clauses", [])
-        for clause in risky_clauses:
-            risk_type = clause.get("risk_type", "unknown")
-            risk_counts[risk_type] = risk_counts.get(risk_type, 0) + 1
+    # Risk types counted across all documents
+    risk_counts = aggregates.risk_counts()
     
     # Display risk types as a horizontal bar chart
     if risk_counts:
-        # Convert to dataframe
-        risk_df = pd.DataFrame({
-            "Risk Type": list(risk_counts.keys()),
-            "Count": list(risk_counts.values())
-        })
-        
-        # Sort by count
-        risk_df = risk_df.sort_values("Count", ascending=False)
+        def build_risk_types():
+            # Convert to dataframe
+            risk_df = pd.DataFrame({
+                "Risk Type": list(risk_counts.keys()),
+                "Count": list(risk_counts.values())
+            })
+            
+            # Sort by count
+            return risk_df.sort_values("Count", ascending=False).set_index("Risk Type")
         
         # Display as bar chart
-        st.bar_chart(risk_df.set_index("Risk Type"))
+        st.bar_chart(aggregates.memo("risk_types", build_risk_types))
     else:
         st.info("No risk data available yet.")
 
-def show_risk_analysis_tab():
+def show_risk_analysis_tab(aggregates: WorkspaceAggregates):
     """Display the risk analysis tab"""
     
     st.markdown("### Document Risk Analysis")
     
-    # Get all risky clauses from all documents
-    all_risky_clauses = []
-    for doc_id, doc in st.session_state.analyzed_docs.items():
-        risky_clauses = doc.get("risky_clauses", [])
-        
-        # Add document ID and filename to each clause
-        for clause in risky_clauses:
-            clause["doc_id"] = doc_id
-            clause["filename"] = doc.get("filename", "Unknown")
-        
-        all_risky_clauses.extend(risky_clauses)
+    # Risk types counted across documents
+    risk_counts = aggregates.risk_counts()
     
     # If no risky clauses found
-    if not all_risky_clauses:
+    if not risk_counts:
         st.info("No risky clauses found in any documents.")
         return
     
-    # Display risk distribution
-    risk_dist_fig = create_risk_distribution(all_risky_clauses)
+    # Display risk distribution (figures are cached per version of the workspace's documents)
+    risk_dist_fig = cached_figure(
+        ("risk_distribution", aggregates.version),
+        lambda: create_risk_distribution(None, risk_counts=risk_counts)
+    )
     st.plotly_chart(risk_dist_fig, use_container_width=True)
     
     # Display most risky documents
     st.markdown("### Most Risky Documents")
     
     # Create a table of documents sorted by risk score
-    docs_data = []
-    for doc_id, doc in st.session_state.analyzed_docs.items():
-        docs_data.append({
-            "Document ID": doc_id,
-            "Filename": doc.get("filename", "Unknown"),
-            "Risk Score": doc.get("risk_score", 0),
-            "Risk Level": doc.get("risk_level", "Unknown").capitalize(),
-            "Risky Clauses": len(doc.get("risky_clauses", []))
-        })
-    
-    # Sort by risk score (highest first)
-    docs_data.sort(key=lambda x: x["Risk Score"], reverse=True)
+    def build_risky_documents():
+        docs_data = [
+            {
+                "Document ID": doc_id,
+                "Filename": summary["filename"],
+                "Risk Score": summary["risk_score"],
+                "Risk Level": summary["risk_level"].capitalize(),
+                "Risky Clauses": summary["num_risky_clauses"]
+            }
+            for doc_id, summary in aggregates.summaries.items()
+        ]
+        
+        # Sort by risk score (highest first)
+        docs_data.sort(key=lambda x: x["Risk Score"], reverse=True)
+        return pd.DataFrame(docs_data)
     
     # Display as dataframe
-    df = pd.DataFrame(docs_data)
-    st.dataframe(df, use_container_width=True)
+    st.dataframe(aggregates.memo("risky_documents", build_risky_documents), use_container_width=True)
     
     # Display most common risky clauses
     st.markdown("### Common Risky Clauses")
     
-    # Group clauses by text
-    clause_texts = {}
-    for clause in all_risky_clauses:
-        text = clause.get("text", "")
-        if text:
-            # Use only first 100 chars as key to group similar clauses
-            text_key = text[:100]
-            if text_key in clause_texts:
-                clause_texts[text_key]["count"] += 1
-                clause_texts[text_key]["docs"].add(clause.get("filename", "Unknown"))
-            else:
-                clause_texts[text_key] = {
-                    "text": text,
-                    "count": 1,
-                    "risk_type": clause.get("risk_type", "unknown"),
-                    "docs": {clause.get("filename", "Unknown")}
-                }
-    
-    # Convert to list and sort by count
-    clause_list = [
-        {
-            "text": info["text"],
-            "count": info["count"],
-            "risk_type": info["risk_type"],
-            "docs": ", ".join(list(info["docs"])[:3]) + (f" and {len(info['docs']) - 3} more" if len(info["docs"]) > 3 else "")
-        }
-        for text_key, info in clause_texts.items()
-    ]
-    clause_list.sort(key=lambda x: x["count"], reverse=True)
+    # Clauses grouped by their first 100 characters, most frequent first
+    clause_list = aggregates.common_clauses(10)
     
     # Display top risky clauses
-    for i, clause in enumerate(clause_list[:10]):  # Show top 10
-        with st.expander(f"{clause['risk_type'].replace('_', ' ').title()} (Found in {clause['count']} documents)"):
+    for i, clause in enumerate(clause_list):  # Show top 10
+        with st.expander(f"{clause['risk_type'].replace('_', ' ').title()} (Found in {clause['doc_count']} documents)"):
             st.markdown(f"**Documents:** {clause['docs']}")
             st.markdown(f"**Text:** {clause['text']}")
 
-def show_document_comparison_tab():
+def show_document_comparison_tab(aggregates: WorkspaceAggregates):
     """Display the document comparison tab"""
     
     st.markdown("### Document Comparison")
@@ -251,8 +207,8 @@ def show_document_comparison_tab():
     st.markdown("#### Select Documents to Compare")
     
     # Get document options
-    doc_options = {doc.get("filename", f"Document {doc_id}"): doc_id 
-                  for doc_id, doc in st.session_state.analyzed_docs.items()}
+    doc_options = {summary["filename"]: doc_id 
+                  for doc_id, summary in aggregates.summaries.items()}
     
     # Multi-select for documents
     selected_doc_names = st.multiselect(
@@ -266,13 +222,16 @@ def show_document_comparison_tab():
     
     # Show comparison if at least two documents selected
     if len(selected_doc_ids) >= 2:
-        # Get selected documents data
-        selected_docs = {doc_id: st.session_state.analyzed_docs[doc_id] 
+        # Get selected documents' summaries
+        selected_docs = {doc_id: aggregates.summaries[doc_id] 
                         for doc_id in selected_doc_ids}
         
         # Create radar chart comparison
         st.markdown("#### Document Comparison Chart")
-        comparison_fig = create_document_comparison_chart(selected_docs)
+        comparison_fig = cached_figure(
+            ("document_comparison", aggregates.version, tuple(selected_doc_ids)),
+            lambda: create_document_comparison_chart(selected_docs)
+        )
         st.plotly_chart(comparison_fig, use_container_width=True)
         
         # Create table comparison
@@ -282,13 +241,13 @@ def show_document_comparison_tab():
         comparison_data = []
         for doc_id, doc in selected_docs.items():
             comparison_data.append({
-                "Document": doc.get("filename", f"Document {doc_id}"),
-                "Risk Score": f"{doc.get('risk_score', 0):.2f}",
-                "Risk Level": doc.get("risk_level", "low").capitalize(),
-                "Length (chars)": doc.get("metadata", {}).get("length", 0),
-                "Sentences": doc.get("metadata", {}).get("num_sentences", 0),
-                "Clauses": doc.get("metadata", {}).get("num_clauses", 0),
-                "Risky Clauses": len(doc.get("risky_clauses", []))
+                "Document": doc["filename"],
+                "Risk Score": f"{doc['risk_score']:.2f}",
+                "Risk Level": doc["risk_level"].capitalize(),
+                "Length (chars)": doc["metadata"]["length"],
+                "Sentences": doc["metadata"]["num_sentences"],
+                "Clauses": doc["metadata"]["num_clauses"],
+                "Risky Clauses": doc["num_risky_clauses"]
             })
         
         # Display as dataframe
@@ -298,42 +257,81 @@ def show_document_comparison_tab():
         # Common risky clauses
         st.markdown("#### Common Risk Types")
         
-        # Count risk types in each document
-        doc_risk_counts = {}
-        for doc_id, doc in selected_docs.items():
-            doc_name = doc.get("filename", f"Document {doc_id}")
-            doc_risk_counts[doc_name] = {}
-            
-            for clause in doc.get("risky_clauses", []):
-                risk_type = clause.get("risk_type", "unknown")
-                doc_risk_counts[doc_name][risk_type] = doc_risk_counts[doc_name].get(risk_type, 0) + 1
-        
-        # Get all risk types
-        all_risk_types = set()
-        for doc_name, risk_counts in doc_risk_counts.items():
-            all_risk_types.update(risk_counts.keys())
-        
-        # Create comparison dataframe
-        risk_comparison_data = []
-        for risk_type in sorted(all_risk_types):
-            row_data = {"Risk Type": risk_type.replace("_", " ").title()}
-            
-            for doc_name in doc_risk_counts.keys():
-                row_data[doc_name] = doc_risk_counts[doc_name].get(risk_type, 0)
-            
-            risk_comparison_data.append(row_data)
+        # Count risk types in each document (a group-by on the clause table)
+        risk_counts = aggregates.risk_counts_by_document(selected_doc_ids)
         
         # Display as dataframe
-        if risk_comparison_data:
-            risk_comparison_df = pd.DataFrame(risk_comparison_data)
+        if not risk_counts.empty:
+            risk_comparison_df = risk_counts.rename(
+                index=lambda risk_type: risk_type.replace("_", " ").title(),
+                columns={doc_id: selected_docs[doc_id]["filename"] for doc_id in selected_doc_ids}
+            ).rename_axis(index="Risk Type", columns=None).reset_index()
             st.dataframe(risk_comparison_df, use_container_width=True)
         else:
             st.info("No risk data available for comparison.")
+        
+        show_clause_comparison(aggregates, selected_docs)
     
     else:
         st.info("Please select at least two documents to compare.")
 
-def show_trends_tab():
+def show_clause_comparison(aggregates: WorkspaceAggregates, selected_docs: Dict[str, Dict[str, Any]]):
+    """Display the clause-level differences between two of the selected documents"""
+    
+    st.markdown("#### Clause-Level Differences")
+    
+    names = {doc_id: doc.get("filename", f"Document {doc_id}") for doc_id, doc in selected_docs.items()}
+    doc_ids = list(names.keys())
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        base_id = st.selectbox("Base document", doc_ids, index=0, format_func=names.get)
+    with col2:
+        other_id = st.selectbox("Compared document", doc_ids, index=1, format_func=names.get)
+    
+    if base_id == other_id:
+        st.info("Select two different documents.")
+        return
+    
+    # Diffing loads and decompresses both documents, so the result is kept until the workspace changes
+    comparison = aggregates.memo(
+        f"clause_comparison:{base_id}:{other_id}",
+        lambda: DocumentProcessor().get_document_comparison(base_id, other_id)
+    )
+    if "error" in comparison:
+        st.error(comparison["error"])
+        return
+    
+    delta = comparison["risk_delta"]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Unchanged Clauses", comparison["unchanged"])
+    col2.metric("Changed", len(comparison["changed"]))
+    col3.metric("Added / Removed", f"{len(comparison['added'])} / {len(comparison['removed'])}")
+    col4.metric("Risk Score", f"{delta['new_score']:.2f}", f"{delta['score']:+.2f}", delta_color="inverse")
+    
+    if delta["by_type"]:
+        st.markdown("**Risky clauses by type:** " + ", ".join(
+            f"{risk_type.replace('_', ' ').title()} {count:+d}" for risk_type, count in sorted(delta["by_type"].items())
+        ))
+    
+    def risk_label(risk_type):
+        return f" ({risk_type.replace('_', ' ').title()})" if risk_type else ""
+    
+    with st.expander(f"Changed clauses ({len(comparison['changed'])})"):
+        for clause in comparison["changed"]:
+            st.markdown(f"**Before{risk_label(clause['old_risk_type'])}:** {clause['old_text']}")
+            st.markdown(f"**After{risk_label(clause['new_risk_type'])}:** {clause['new_text']}")
+            st.markdown("---")
+    
+    with st.expander(f"Added clauses ({len(comparison['added'])})"):
+        for clause in comparison["added"]:
+            st.markdown(f"- {clause['text']}{risk_label(clause['risk_type'])}")
+    
+    with st.expander(f"Removed clauses ({len(comparison['removed'])})"):
+        for clause in comparison["removed"]:
+            st.markdown(f"- {clause['text']}{risk_label(clause['risk_type'])}")
+
+def show_trends_tab(aggregates: WorkspaceAggregates):
     """Display the trends tab"""
     
     st.markdown("### Document Trends Over Time")
@@ -342,54 +340,54 @@ def show_trends_tab():
     # Create mock historical data for demonstration
     # In a real implementation, this would come from a database
     
-    # Create a simple timestamp from document ID (first 8 chars of UUID as hex timestamp)
-    risk_history = []
-    for doc_id, doc in st.session_state.analyzed_docs.items():
-        # Create a date from document ID
-        timestamp = int(doc_id.split("-")[0], 16) % (10**10)
-        date = datetime.datetime.fromtimestamp(timestamp)
-        
-        risk_history.append({
-            "document_id": doc_id,
-            "filename": doc.get("filename", "Unknown"),
-            "date": date,
-            "risk_score": doc.get("risk_score", 0),
-            "document_type": doc.get("file_type", "").upper()[1:]
-        })
+    # Dates come from each upload's time; documents without a recorded upload are left out
+    def build_risk_trend():
+        risk_history = [
+            {
+                "document_id": doc_id,
+                "filename": summary["filename"],
+                "date": summary["date"],
+                "risk_score": summary["risk_score"],
+                "document_type": summary["file_type"].upper()[1:]
+            }
+            for doc_id, summary in aggregates.summaries.items()
+            if summary["date"] is not None
+        ]
+        return create_risk_trend_chart(risk_history)
     
     # Create risk trend chart
-    risk_trend_fig = create_risk_trend_chart(risk_history)
+    risk_trend_fig = cached_figure(("risk_trend", aggregates.version), build_risk_trend)
     st.plotly_chart(risk_trend_fig, use_container_width=True)
     
     # Document metrics over time
     st.markdown("### Document Metrics Over Time")
     
     # Create metrics history
-    metrics_history = []
-    for doc_id, doc in st.session_state.analyzed_docs.items():
-        # Create a date from document ID
-        timestamp = int(doc_id.split("-")[0], 16) % (10**10)
-        date = datetime.datetime.fromtimestamp(timestamp)
+    def build_metrics_history():
+        metrics_history = [
+            {
+                "document_id": doc_id,
+                "filename": summary["filename"],
+                "date": summary["date"],
+                "length": summary["metadata"]["length"],
+                "sentences": summary["metadata"]["num_sentences"],
+                "clauses": summary["metadata"]["num_clauses"],
+                "risky_clauses": summary["num_risky_clauses"]
+            }
+            for doc_id, summary in aggregates.summaries.items()
+            if summary["date"] is not None
+        ]
         
-        # Get document metrics
-        metadata = doc.get("metadata", {})
+        # Convert to dataframe
+        metrics_df = pd.DataFrame(metrics_history)
+        if metrics_df.empty:
+            return metrics_df
         
-        metrics_history.append({
-            "document_id": doc_id,
-            "filename": doc.get("filename", "Unknown"),
-            "date": date,
-            "length": metadata.get("length", 0),
-            "sentences": metadata.get("num_sentences", 0),
-            "clauses": metadata.get("num_clauses", 0),
-            "risky_clauses": len(doc.get("risky_clauses", []))
-        })
-    
-    # Convert to dataframe
-    metrics_df = pd.DataFrame(metrics_history)
-    
-    # Sort by date
-    metrics_df["date"] = pd.to_datetime(metrics_df["date"])
-    metrics_df = metrics_df.sort_values("date")
+        # Sort by date
+        metrics_df["date"] = pd.to_datetime(metrics_df["date"])
+        return metrics_df.sort_values("date")
+    
+    metrics_df = aggregates.memo("metrics_history", build_metrics_history)
     
     # Display line charts for different metrics
     metric_options = ["length", "sentences", "clauses", "risky_clauses"]
@@ -4,15 +4,55 @@ Legal guides page for the Legal AI Platform
 import streamlit as st
 import random
 from typing import Dict, List, Any
-from services.groupq_service import GroupQService
+from config.config import GUIDE_PARALLEL_SECTIONS
+from services.groupq_service import LEGAL_GUIDE_SECTIONS
+from services.shared_resources import get_groupq_service, get_guide_cache
+
+def generate_guide_in_parallel(topic: str) -> str:
+    """
+    Generate a guide section by section, rendering each section as it completes
+    
+    Args:
+        topic: Legal topic
+        
+    Returns:
+        Complete guide content in markdown format
+    """
+    service = get_groupq_service()
+    
+    # Live preview, cleared once the full guide is stored
+    preview = st.empty()
+    sections = {}
+    
+    with preview.container():
+        st.markdown(f"### Generating guide: {topic}")
+        progress = st.progress(0.0, text="Requesting sections...")
+        placeholders = []
+        for section in LEGAL_GUIDE_SECTIONS:
+            placeholder = st.empty()
+            placeholder.info(f"⏳ {section['title']}...")
+            placeholders.append(placeholder)
+        
+        # Fill each placeholder in document order as soon as its section arrives
+        for index, title, content in service.iter_legal_guide_sections(topic):
+            sections[index] = content
+            placeholders[index].markdown(content)
+            progress.progress(
+                len(sections) / len(LEGAL_GUIDE_SECTIONS),
+                text=f"{len(sections)} of {len(LEGAL_GUIDE_SECTIONS)} sections ready"
+            )
+    
+    preview.empty()
+    guide_content = service.merge_legal_guide_sections(sections)
+    
+    # Guides are not user-specific, so complete ones are shared with other sessions
+    if not any(content.startswith("⚠️") for content in sections.values()):
+        get_guide_cache().put(topic, guide_content)
+    return guide_content
 
 def show_legal_guides_page():
     """Display the legal guides page"""
     
-    # Initialize Groq service if not already initialized
-    if 'groupq_service' not in st.session_state:
-        st.session_state.groupq_service = GroupQService()
-    
     # Main heading
     st.markdown('<h1 class="main-header">AI-Generated Legal Guides</h1>', unsafe_allow_html=True)
     
@@ -58,20 +98,35 @@ def show_legal_guides_page():
             placeholder="e.g., How to file a trademark in India"
         )
     
+    # Parallel mode requests each section separately, so the slowest section bounds the wait
+    fast_mode = st.checkbox(
+        "Fast mode (generate sections in parallel)",
+        value=GUIDE_PARALLEL_SECTIONS,
+        help="Generates the guide section by section in parallel and shows each section as soon as it is ready."
+    )
+    
     # Generate guide button
     if selected_topic and st.button("Generate Guide"):
-        with st.spinner(f"Generating comprehensive guide on '{selected_topic}'..."):
-            # Get guide content from Groq API
-            guide_content = st.session_state.groupq_service.generate_legal_guide(selected_topic)
-            
+        guide_content = get_guide_cache().get(selected_topic)
+        if guide_content is None:
+            if fast_mode:
+                guide_content = generate_guide_in_parallel(selected_topic)
+            else:
+                with st.spinner(f"Generating comprehensive guide on '{selected_topic}'..."):
+                    # Get guide content from Groq API
+                    guide_content = get_groupq_service().generate_legal_guide(selected_topic)
+                if guide_content and not guide_content.startswith("⚠️"):
+                    get_guide_cache().put(selected_topic, guide_content)
+        
+        if guide_content:
             # Store in session state
             st.session_state.current_guide = {
                 "topic": selected_topic,
                 "content": guide_content
             }
-        
-        # Show success message
-        st.success(f"Guide on '{selected_topic}' generated successfully!")
+            
+            # Show success message
+            st.success(f"Guide on '{selected_topic}' generated successfully!")
     
     # Display guide if available
     if hasattr(st.session_state, 'current_guide') and st.session_state.current_guide:
@@ -0,0 +1,110 @@
+"""
+LLM usage admin page for the Legal AI Platform
+"""
+import streamlit as st
+import pandas as pd
+
+from config.config import LLM_TELEMETRY_ENABLED, LLM_TELEMETRY_LOG
+from services.llm_backends import get_backend_router
+from services.llm_telemetry import get_telemetry
+
+def show_llm_usage_page():
+    """Display latency, token and cost telemetry for LLM calls"""
+
+    st.markdown('<h1 class="main-header">LLM Usage</h1>', unsafe_allow_html=True)
+
+    if not LLM_TELEMETRY_ENABLED:
+        st.info("LLM telemetry is disabled. Set LLM_TELEMETRY_ENABLED=true to collect it.")
+        return
+
+    telemetry = get_telemetry()
+    summary = telemetry.summary()
+
+    st.markdown(
+        "Statistics for LLM calls made by this server process since it started. "
+        f"Every call is also appended to `{LLM_TELEMETRY_LOG}`."
+    )
+
+    # Backend health and routing
+    st.markdown("### Backends")
+    router = get_backend_router()
+    backend_rows = [
+        {
+            "Backend": backend["name"],
+            "Model": backend["model"],
+            "URL": backend["url"],
+            "Configured": backend["configured"],
+            "Healthy": backend["healthy"],
+            "Last Error": backend["last_error"] or ""
+        }
+        for backend in router.status()
+    ]
+    st.dataframe(pd.DataFrame(backend_rows), use_container_width=True)
+    st.caption("Routes: " + "; ".join(f"{feature} → {' → '.join(names)}" for feature, names in router.routes.items()))
+
+    if st.button("Check backends now"):
+        router.check_all()
+        st.rerun()
+
+    if not summary:
+        st.info("No LLM calls have been made yet.")
+        return
+
+    # Totals across all features
+    total_calls = sum(stats["calls"] for stats in summary.values())
+    total_errors = sum(stats["errors"] for stats in summary.values())
+    total_tokens = sum(stats["total_tokens"] for stats in summary.values())
+    total_cost = sum(stats["cost_usd"] for stats in summary.values())
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Calls", total_calls)
+    with col2:
+        st.metric("Errors", total_errors)
+    with col3:
+        st.metric("Tokens", f"{total_tokens:,}")
+    with col4:
+        st.metric("Estimated Cost", f"${total_cost:.4f}")
+
+    # Per-feature breakdown
+    st.markdown("### By Feature")
+    rows = []
+    for feature, stats in sorted(summary.items(), key=lambda item: item[1]["cost_usd"], reverse=True):
+        rows.append({
+            "Feature": feature,
+            "Calls": stats["calls"],
+            "Errors": stats["errors"],
+            "Retries": stats["retries"],
+            "Mean Latency (s)": round(stats["latency_mean_s"], 2),
+            "p50 Latency (s)": stats["latency_p50_s"],
+            "p95 Latency (s)": stats["latency_p95_s"],
+            "p95 TTFT, Streamed (s)": stats["ttft_p95_s"],
+            "Prompt Tokens": stats["prompt_tokens"],
+            "Completion Tokens": stats["completion_tokens"],
+            "Prompt Tokens Saved": stats["prompt_tokens_saved"],
+            "Cost (USD)": round(stats["cost_usd"], 4)
+        })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    st.caption("Percentiles are approximate (histogram bucket upper bounds).")
+
+    # Histograms for a selected feature
+    st.markdown("### Distributions")
+    feature = st.selectbox("Feature", options=sorted(summary.keys()))
+    histograms = telemetry.histograms(feature)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Latency (s)**")
+        st.bar_chart(pd.Series(histograms.get("latency_s", {}), name="Calls"))
+    with col2:
+        st.markdown("**Total Tokens**")
+        st.bar_chart(pd.Series(histograms.get("total_tokens", {}), name="Calls"))
+
+    # Recent calls
+    st.markdown("### Recent Calls")
+    recent = telemetry.recent_records(limit=100)
+    st.dataframe(pd.DataFrame(recent), use_container_width=True)
+
+    if st.button("Reset in-process statistics"):
+        telemetry.reset()
+        st.rerun()
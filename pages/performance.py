@@ -0,0 +1,139 @@
+"""
+Performance admin page for the Legal AI Platform
+"""
+import datetime
+
+import streamlit as st
+import pandas as pd
+
+from config.config import PROFILING_ENABLED, PROFILING_CPROFILE, PROFILING_TRACEMALLOC
+from services.profiling import get_profiler
+from services.shared_resources import resource_stats
+
+def show_performance_page():
+    """Display per-stage document processing timings and rerun durations"""
+
+    st.markdown('<h1 class="main-header">Performance</h1>', unsafe_allow_html=True)
+
+    if not PROFILING_ENABLED:
+        st.info(
+            "Profiling is disabled. Set PROFILING_ENABLED=true (and optionally PROFILING_CPROFILE=true "
+            "or PROFILING_TRACEMALLOC=true) and restart the app to collect timings."
+        )
+        return
+
+    profiler = get_profiler()
+    st.markdown("Timings collected by this server process since it started.")
+    if PROFILING_CPROFILE or PROFILING_TRACEMALLOC:
+        st.caption(
+            "cProfile and tracemalloc captures cover the whole process, so documents are captured "
+            "one at a time: concurrent uploads wait for each other while capture is enabled."
+        )
+
+    # Recent documents
+    st.markdown("### Recent Documents")
+    documents = profiler.recent_documents()
+    if not documents:
+        st.info("No documents have been processed since profiling was enabled.")
+    else:
+        rows = []
+        for profile in documents:
+            row = {
+                "Document": profile["filename"],
+                "Processed": datetime.datetime.fromtimestamp(profile["started_at"]).strftime("%Y-%m-%d %H:%M:%S"),
+                "Total (s)": round(profile["duration_s"] or 0.0, 3)
+            }
+            for stage in profile["stages"]:
+                row[f"{stage['stage']} (s)"] = round(stage["duration_s"], 3)
+            rows.append(row)
+        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+
+        # Breakdown of one document
+        labels = [f"{profile['filename']} ({profile['doc_id'][:8]})" for profile in documents]
+        selected = st.selectbox("Document", options=range(len(documents)), format_func=lambda i: labels[i])
+        profile = documents[selected]
+
+        st.markdown("**Stages**")
+        stage_df = pd.DataFrame(profile["stages"])
+        if not stage_df.empty:
+            st.bar_chart(stage_df.set_index("stage")["duration_s"])
+
+        st.markdown("**Functions** (self time excludes time spent in other timed functions)")
+        function_rows = [
+            {
+                "Function": name,
+                "Calls": stats["calls"],
+                "Total (s)": round(stats["total_s"], 4),
+                "Self (s)": round(stats["self_s"], 4),
+                "Allocated (KB)": round(stats["allocated_bytes"] / 1024, 1)
+            }
+            for name, stats in sorted(profile["functions"].items(), key=lambda item: item[1]["self_s"], reverse=True)
+        ]
+        st.dataframe(pd.DataFrame(function_rows), use_container_width=True)
+        if not PROFILING_TRACEMALLOC:
+            st.caption("Allocations are recorded when PROFILING_TRACEMALLOC=true.")
+
+        if profile["peak_memory_bytes"] is not None:
+            st.metric("Peak Traced Memory", f"{profile['peak_memory_bytes'] / (1024 * 1024):.1f} MB")
+        if profile["allocations"]:
+            st.markdown("**Largest allocations**")
+            st.dataframe(pd.DataFrame(profile["allocations"]), use_container_width=True)
+
+        if profile["cprofile"]:
+            with st.expander("cProfile output"):
+                st.code(profile["cprofile"])
+        elif not PROFILING_CPROFILE:
+            st.caption("Full cProfile output is captured per document when PROFILING_CPROFILE=true.")
+
+    # Functions across all documents and pages
+    st.markdown("### All Timed Functions")
+    function_stats = profiler.function_stats()
+    if function_stats:
+        rows = [
+            {
+                "Function": name,
+                "Calls": stats["calls"],
+                "Total (s)": round(stats["total_s"], 4),
+                "Self (s)": round(stats["self_s"], 4),
+                "Max (s)": round(stats["max_s"], 4)
+            }
+            for name, stats in sorted(function_stats.items(), key=lambda item: item[1]["self_s"], reverse=True)
+        ]
+        st.dataframe(pd.DataFrame(rows[:100]), use_container_width=True)
+
+    # Shared resources built by the warm-up
+    st.markdown("### Shared Resources")
+    rows = [
+        {
+            "Resource": stats["name"],
+            "Built": stats["built"],
+            "Builds": stats["builds"],
+            "Build (s)": round(stats["build_seconds"], 4) if stats["build_seconds"] is not None else None
+        }
+        for stats in resource_stats()
+    ]
+    st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    st.caption("Matchers are rebuilt when the dictionaries change.")
+
+    # Streamlit reruns
+    st.markdown("### Page Reruns")
+    rerun_stats = profiler.rerun_stats()
+    if rerun_stats:
+        rows = [
+            {
+                "Page": page,
+                "Reruns": stats["reruns"],
+                "Mean (s)": round(stats["mean_s"], 3),
+                "p95 (s)": stats["p95_s"],
+                "Max (s)": round(stats["max_s"], 3)
+            }
+            for page, stats in sorted(rerun_stats.items())
+        ]
+        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+        st.caption("Percentiles are approximate (histogram bucket upper bounds).")
+
+        recent = pd.DataFrame(profiler.recent_reruns()[:100])
+        recent["time"] = recent["time"].map(lambda ts: datetime.datetime.fromtimestamp(ts).strftime("%H:%M:%S"))
+        st.dataframe(recent, use_container_width=True)
+    else:
+        st.info("No reruns recorded yet.")
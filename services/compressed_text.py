@@ -0,0 +1,78 @@
+"""
+Compressed in-memory storage for large text fields
+"""
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any
+
+from config.config import TEXT_CACHE_MAX_CHARS, TEXT_COMPRESSION_MIN_CHARS
+
+class CompressedText:
+    """A string kept zlib-compressed in memory"""
+
+    __slots__ = ("data", "length", "__weakref__")
+
+    def __init__(self, text: str):
+        self.data = zlib.compress(text.encode("utf-8"), 6)
+        self.length = len(text)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def text(self) -> str:
+        """Return the decompressed string, served from the shared LRU when recently used"""
+        return _text_cache.get(self)
+
+    def __repr__(self) -> str:
+        return f"<CompressedText {self.length} chars in {len(self.data)} bytes>"
+
+class TextCache:
+    """Thread-safe LRU of decompressed texts, bounded by total characters"""
+
+    def __init__(self, max_chars: int = TEXT_CACHE_MAX_CHARS):
+        self.max_chars = max_chars
+        self.chars = 0
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, compressed: CompressedText) -> str:
+        key = id(compressed)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] is compressed:
+                self.entries.move_to_end(key)
+                return entry[1]
+
+        text = zlib.decompress(compressed.data).decode("utf-8")
+
+        with self.lock:
+            # The entry keeps the compressed object alive, so its id cannot be reused while cached
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.chars -= len(previous[1])
+            self.entries[key] = (compressed, text)
+            self.chars += len(text)
+            while self.chars > self.max_chars and len(self.entries) > 1:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.chars -= len(evicted)
+        return text
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.chars = 0
+
+_text_cache = TextCache()
+
+def compress_text(value: Any) -> Any:
+    """Compress a string if it is long enough to be worth it; other values are returned unchanged"""
+    if isinstance(value, str) and len(value) >= TEXT_COMPRESSION_MIN_CHARS:
+        return CompressedText(value)
+    return value
+
+def decompress_text(value: Any) -> Any:
+    """Return the plain string for a CompressedText; other values are returned unchanged"""
+    if isinstance(value, CompressedText):
+        return value.text()
+    return value
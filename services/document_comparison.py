@@ -0,0 +1,210 @@
+"""
+Clause-level document comparison for the Legal AI Platform
+"""
+import difflib
+import hashlib
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.document_utils import split_into_clauses
+from services.risk_scoring import load_risk_keywords
+
+# Minimum similarity for an unmatched old and new clause to count as one changed clause
+CHANGED_CLAUSE_THRESHOLD = 0.6
+
+# Candidate old clauses examined per unmatched new clause
+MAX_CANDIDATES = 5
+
+# Words per shingle used to find candidate pairs among unmatched clauses
+SHINGLE_SIZE = 3
+
+def normalize_clause(text: str) -> str:
+    """Normalize a clause for matching: lowercase, no outline numbering, punctuation or extra whitespace"""
+    text = text.lower()
+    text = re.sub(r"^\s*(?:\d+(?:\.\d+)*\.?|\(?[ivx]{1,4}[.)]|\(?[a-z][.)])\s+", "", text)
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+def clause_hash(normalized: str) -> bytes:
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=12).digest()
+
+def clause_risk_type(text: str, risk_keywords: Dict[str, List[str]]) -> Optional[str]:
+    """Return the first risk type whose keywords occur in the clause, as detect_risky_clauses does"""
+    lowered = text.lower()
+    for risk_type, keywords in risk_keywords.items():
+        for keyword in keywords:
+            if keyword.lower() in lowered:
+                return risk_type
+    return None
+
+def _shingles(words: List[str]) -> set:
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+def _word_changes(old_words: List[str], new_words: List[str]) -> List[Dict[str, str]]:
+    """Word-level differences between two clauses"""
+    changes = []
+    matcher = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op != "equal":
+            changes.append({"op": op, "old": " ".join(old_words[i1:i2]), "new": " ".join(new_words[j1:j2])})
+    return changes
+
+def _pair_changed(
+    removed: List[int],
+    added: List[int],
+    old_norm: List[str],
+    new_norm: List[str]
+) -> List[Tuple[int, int, float]]:
+    """
+    Pair unmatched old and new clauses that are edits of each other
+
+    Candidates are found through shared word shingles, so only clauses with common
+    wording are compared with difflib.
+
+    Returns:
+        List of (old index, new index, similarity), best pairs first
+    """
+    old_words = {i: old_norm[i].split() for i in removed}
+    index = defaultdict(list)
+    for i in removed:
+        for shingle in _shingles(old_words[i]):
+            index[shingle].append(i)
+
+    scored = []
+    for j in added:
+        new_words = new_norm[j].split()
+        shared = defaultdict(int)
+        for shingle in _shingles(new_words):
+            for i in index.get(shingle, ()):
+                shared[i] += 1
+
+        for i in sorted(shared, key=shared.get, reverse=True)[:MAX_CANDIDATES]:
+            matcher = difflib.SequenceMatcher(None, old_words[i], new_words, autojunk=False)
+            if matcher.real_quick_ratio() < CHANGED_CLAUSE_THRESHOLD or matcher.quick_ratio() < CHANGED_CLAUSE_THRESHOLD:
+                continue
+            similarity = matcher.ratio()
+            if similarity >= CHANGED_CLAUSE_THRESHOLD:
+                scored.append((similarity, i, j))
+
+    pairs = []
+    used_old, used_new = set(), set()
+    for similarity, i, j in sorted(scored, reverse=True):
+        if i not in used_old and j not in used_new:
+            used_old.add(i)
+            used_new.add(j)
+            pairs.append((i, j, similarity))
+    return pairs
+
+def compare_texts(old_text: str, new_text: str, risk_keywords: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    """
+    Compare two document texts clause by clause
+
+    Identical clauses (after normalization) are aligned by hash in linear time; only the
+    remaining clauses are paired up and diffed word by word.
+
+    Args:
+        old_text: Text of the first (base) document
+        new_text: Text of the second document
+        risk_keywords: Risk keyword dictionary (loaded if omitted)
+
+    Returns:
+        Dict with the number of 'unchanged' clauses, 'added', 'removed' and 'changed'
+        clauses (each tagged with its risk type) and the share of clauses in common
+    """
+    if risk_keywords is None:
+        risk_keywords = load_risk_keywords()
+
+    old_clauses = split_into_clauses(old_text)
+    new_clauses = split_into_clauses(new_text)
+    old_norm = [normalize_clause(clause) for clause in old_clauses]
+    new_norm = [normalize_clause(clause) for clause in new_clauses]
+
+    # Align identical clauses: each old occurrence of a hash matches one new occurrence
+    old_by_hash = defaultdict(list)
+    for i, normalized in enumerate(old_norm):
+        if normalized:
+            old_by_hash[clause_hash(normalized)].append(i)
+
+    matched_old = set()
+    added = []
+    for j, normalized in enumerate(new_norm):
+        if not normalized:
+            continue
+        occurrences = old_by_hash.get(clause_hash(normalized))
+        if occurrences:
+            matched_old.add(occurrences.pop(0))
+        else:
+            added.append(j)
+    removed = [i for i, normalized in enumerate(old_norm) if normalized and i not in matched_old]
+
+    # Fine-grained diffing on the unmatched remainder only
+    pairs = _pair_changed(removed, added, old_norm, new_norm)
+    paired_old = {i for i, _, _ in pairs}
+    paired_new = {j for _, j, _ in pairs}
+
+    changed = [
+        {
+            "old_text": old_clauses[i],
+            "new_text": new_clauses[j],
+            "similarity": similarity,
+            "old_risk_type": clause_risk_type(old_clauses[i], risk_keywords),
+            "new_risk_type": clause_risk_type(new_clauses[j], risk_keywords),
+            "changes": _word_changes(old_norm[i].split(), new_norm[j].split())
+        }
+        for i, j, similarity in sorted(pairs, key=lambda pair: pair[1])
+    ]
+
+    total = max(1, max(len(old_norm), len(new_norm)))
+    return {
+        "unchanged": len(matched_old),
+        "added": [
+            {"text": new_clauses[j], "risk_type": clause_risk_type(new_clauses[j], risk_keywords)}
+            for j in added if j not in paired_new
+        ],
+        "removed": [
+            {"text": old_clauses[i], "risk_type": clause_risk_type(old_clauses[i], risk_keywords)}
+            for i in removed if i not in paired_old
+        ],
+        "changed": changed,
+        "similarity": len(matched_old) / total
+    }
+
+def risk_delta(old_doc: Dict[str, Any], new_doc: Dict[str, Any], comparison: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Summarize how risk changed between two documents
+
+    Args:
+        old_doc: Base document data
+        new_doc: Compared document data
+        comparison: Result of compare_texts for the two documents
+
+    Returns:
+        Dict with the score change, both risk levels and the change in risky clauses per type
+    """
+    by_type = defaultdict(int)
+    for clause in comparison["added"]:
+        if clause["risk_type"]:
+            by_type[clause["risk_type"]] += 1
+    for clause in comparison["removed"]:
+        if clause["risk_type"]:
+            by_type[clause["risk_type"]] -= 1
+    for clause in comparison["changed"]:
+        if clause["old_risk_type"] != clause["new_risk_type"]:
+            if clause["new_risk_type"]:
+                by_type[clause["new_risk_type"]] += 1
+            if clause["old_risk_type"]:
+                by_type[clause["old_risk_type"]] -= 1
+
+    old_score = old_doc.get("risk_score", 0.0)
+    new_score = new_doc.get("risk_score", 0.0)
+    return {
+        "score": new_score - old_score,
+        "old_score": old_score,
+        "new_score": new_score,
+        "old_level": old_doc.get("risk_level", "low"),
+        "new_level": new_doc.get("risk_level", "low"),
+        "by_type": {risk_type: count for risk_type, count in by_type.items() if count}
+    }
@@ -3,18 +3,27 @@ Document processing service for the Legal AI Platform
 """
 import os
 import uuid
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 
 from utils.document_utils import (
     save_uploaded_file, 
+    compute_content_hash,
     extract_text_from_document, 
     preprocess_text,
     extract_document_metadata
 )
-from models.summarization import summarize_document
-from models.risk_detection import detect_risky_clauses
-from models.simplification import simplify_legal_jargon
-from services.risk_scoring import calculate_risk_score
+from services.document_record import DocumentRecord
+from services.profiling import profile_document, mark_stage
+
+# Stages of the upload pipeline, reported as job progress
+DOCUMENT_PIPELINE_STAGES = [
+    "Extracting text",
+    "Preprocessing",
+    "Extracting metadata",
+    "Summarizing",
+    "Detecting risky clauses",
+    "Scoring risk"
+]
 
 class DocumentProcessor:
     """Service for processing legal documents"""
@@ -27,61 +36,25 @@ class DocumentProcessor:
         """
         Process an uploaded document and return analysis results
         
+        Simplification and translations are not computed here; they are computed on first
+        access to the returned DocumentRecord.
+        
         Args:
             uploaded_file: Streamlit UploadedFile object
             
         Returns:
-            Dict containing analysis results
+            DocumentRecord containing analysis results
         """
         try:
-            # Generate a unique ID for this document
-            doc_id = str(uuid.uuid4())
-            
             # Save the uploaded file
             file_path = save_uploaded_file(uploaded_file)
             
-            # Extract text from the document
-            raw_text = extract_text_from_document(file_path)
-            
-            # Preprocess the text
-            processed_text = preprocess_text(raw_text)
-            
-            # Extract metadata
-            metadata = extract_document_metadata(processed_text)
-            
-            # Summarize the document
-            summary = summarize_document(processed_text)
-            
-            # Detect risky clauses
-            risky_clauses = detect_risky_clauses(processed_text)
-            
-            # Calculate risk score
-            risk_score, risk_level = calculate_risk_score(risky_clauses)
-            
-            # Simplify legal jargon
-            simplified_text = simplify_legal_jargon(processed_text)
-            
-            # Clean up temporary file
-            try:
-                os.remove(file_path)
-            except:
-                pass
-            
-            # Return the processed document
-            return {
-                "id": doc_id,
-                "filename": uploaded_file.name,
-                "file_type": os.path.splitext(uploaded_file.name)[1].lower(),
-                "file_size": uploaded_file.size,
-                "raw_text": raw_text,
-                "processed_text": processed_text,
-                "metadata": metadata,
-                "summary": summary,
-                "risky_clauses": risky_clauses,
-                "risk_score": risk_score,
-                "risk_level": risk_level,
-                "simplified_text": simplified_text
-            }
+            return self.process_file(
+                file_path,
+                uploaded_file.name,
+                uploaded_file.size,
+                doc_id=compute_content_hash(uploaded_file)
+            )
         
         except Exception as e:
             # Handle errors
@@ -89,6 +62,79 @@ class DocumentProcessor:
                 "error": str(e)
             }
     
+    def process_file(
+        self,
+        file_path: str,
+        filename: str,
+        file_size: int,
+        job=None,
+        doc_id: Optional[str] = None
+    ) -> DocumentRecord:
+        """
+        Run the upload pipeline on a saved file, reporting progress to a background job
+        
+        The summary and risk assessment are computed eagerly so they are ready when the job
+        finishes; other artifacts of the returned record stay lazy. The file is deleted afterwards.
+        
+        Args:
+            file_path: Path of the saved upload
+            filename: Original file name
+            file_size: File size in bytes
+            job: Job from services.job_queue to report stages to and check for cancellation
+            doc_id: Document ID, normally the content hash of the file (a random ID if omitted)
+            
+        Returns:
+            DocumentRecord containing analysis results
+        """
+        def stage(name: str):
+            mark_stage(name)
+            if job is not None:
+                job.stage(name)
+        
+        doc_id = doc_id or str(uuid.uuid4())
+        
+        try:
+            with profile_document(doc_id, filename):
+                stage("Extracting text")
+                raw_text = extract_text_from_document(
+                    file_path,
+                    progress_callback=job.set_stage_progress if job is not None else None
+                )
+                
+                stage("Preprocessing")
+                processed_text = preprocess_text(raw_text)
+                
+                stage("Extracting metadata")
+                metadata = extract_document_metadata(processed_text)
+                
+                record = DocumentRecord({
+                    "id": doc_id,
+                    "filename": filename,
+                    "file_type": os.path.splitext(filename)[1].lower(),
+                    "file_size": file_size,
+                    "raw_text": raw_text,
+                    "processed_text": processed_text,
+                    "metadata": metadata
+                })
+                
+                stage("Summarizing")
+                record.warm("summary")
+                
+                stage("Detecting risky clauses")
+                record.warm("risky_clauses")
+                
+                stage("Scoring risk")
+                record.warm("risk_score")
+                
+                return record
+        
+        finally:
+            # Clean up temporary file
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+    
     def translate_document(self, doc_data: Dict[str, Any], target_language: str) -> Dict[str, Any]:
         """
         Translate the document to the target language
@@ -100,9 +146,15 @@ class DocumentProcessor:
         Returns:
             Updated document data with translations
         """
-        from models.translation import translate_text
-        
         try:
+            if isinstance(doc_data, DocumentRecord):
+                # Memoized per language on the record
+                doc_data.translation(target_language)
+                doc_data.pop("translation_error", None)
+                return doc_data
+            
+            from models.translation import translate_text
+            
             # Translate document text
             translated_text = translate_text(doc_data["processed_text"], target_language)
             
@@ -119,11 +171,33 @@ class DocumentProcessor:
             return doc_data
         
         except Exception as e:
-            # Handle translation errors
-            return {
-                **doc_data,
-                "translation_error": str(e)
-            }
+            # Handle translation errors; the record is updated in place so lazy artifacts are kept
+            doc_data["translation_error"] = str(e)
+            return doc_data
+    
+    def analyze_with_llm(self, doc_data: Dict[str, Any], service=None) -> Dict[str, Any]:
+        """
+        Run the one-shot LLM analysis (summary, risk annotations and simplification)
+        
+        Args:
+            doc_data: Document data dictionary
+            service: GroupQService to use (defaults to the process-wide service)
+            
+        Returns:
+            Updated document data with an 'llm_analysis' entry
+        """
+        from services.shared_resources import get_groupq_service
+        
+        service = service or get_groupq_service()
+        analysis = service.analyze_document(doc_data["processed_text"])
+        
+        if "error" in analysis:
+            doc_data["llm_analysis_error"] = analysis["error"]
+            return doc_data
+        
+        doc_data.pop("llm_analysis_error", None)
+        doc_data["llm_analysis"] = analysis
+        return doc_data
     
     def get_document_comparison(self, doc_id1: str, doc_id2: str) -> Dict[str, Any]:
         """
@@ -134,7 +208,20 @@ class DocumentProcessor:
             doc_id2: Second document ID
             
         Returns:
-            Comparison results
+            Comparison results: 'unchanged' clause count, 'added', 'removed' and 'changed'
+            clauses, 'similarity' and 'risk_delta', or an 'error'
         """
-        # This method can be implemented later to compare two documents
-        pass
\ No newline at end of file
+        from services.document_comparison import compare_texts, risk_delta
+        from services.document_store import get_document_store
+        
+        docs = get_document_store().get_many([doc_id1, doc_id2])
+        missing = [doc_id for doc_id in (doc_id1, doc_id2) if doc_id not in docs]
+        if missing:
+            return {"error": f"Document not found: {', '.join(missing)}"}
+        
+        old_doc, new_doc = docs[doc_id1], docs[doc_id2]
+        comparison = compare_texts(old_doc["processed_text"], new_doc["processed_text"])
+        comparison["risk_delta"] = risk_delta(old_doc, new_doc, comparison)
+        comparison["doc_id1"] = doc_id1
+        comparison["doc_id2"] = doc_id2
+        return comparison
\ No newline at end of file
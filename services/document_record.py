@@ -0,0 +1,266 @@
+"""
+Document records whose analysis artifacts are computed lazily and memoized
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from config.config import DICTIONARIES_DIR
+from models.summarization import summarize_document
+from models.clause_set import ClauseSet
+from services.compressed_text import compress_text, decompress_text
+from services.incremental_analysis import detect_risky_clauses_incremental, simplify_text_incremental
+from services.risk_scoring import calculate_risk_score
+
+# Seconds between checks of the dictionary files for changes
+DICTIONARY_CHECK_INTERVAL = 2.0
+
+_dictionaries_version = None
+_dictionaries_checked_at = 0.0
+_dictionaries_lock = threading.Lock()
+
+def dictionaries_version() -> tuple:
+    """
+    Return a token that changes whenever a file in the dictionaries directory changes
+
+    Returns:
+        Tuple of (file name, modification time, size) for every dictionary file
+    """
+    global _dictionaries_version, _dictionaries_checked_at
+
+    with _dictionaries_lock:
+        now = time.monotonic()
+        if _dictionaries_version is None or now - _dictionaries_checked_at >= DICTIONARY_CHECK_INTERVAL:
+            entries = []
+            try:
+                for name in sorted(os.listdir(DICTIONARIES_DIR)):
+                    stat = os.stat(os.path.join(DICTIONARIES_DIR, name))
+                    entries.append((name, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                pass
+            _dictionaries_version = tuple(entries)
+            _dictionaries_checked_at = now
+        return _dictionaries_version
+
+def _compute_summary(record: "DocumentRecord") -> Dict[str, Any]:
+    return {"summary": summarize_document(record["processed_text"])}
+
+def _compute_risky_clauses(record: "DocumentRecord") -> Dict[str, Any]:
+    # Paragraphs unchanged from earlier documents or versions reuse their cached results
+    return {"risky_clauses": detect_risky_clauses_incremental(record["processed_text"], record._dictionaries_version)}
+
+def _compute_risk_score(record: "DocumentRecord") -> Dict[str, Any]:
+    risk_score, risk_level = calculate_risk_score(record["risky_clauses"])
+    return {"risk_score": risk_score, "risk_level": risk_level}
+
+def _compute_simplified_text(record: "DocumentRecord") -> Dict[str, Any]:
+    return {"simplified_text": simplify_text_incremental(record["processed_text"], record._dictionaries_version)}
+
+# Artifact key -> (function computing it and its siblings, whether it depends on the dictionaries)
+ARTIFACTS: Dict[str, tuple] = {
+    "summary": (_compute_summary, False),
+    "risky_clauses": (_compute_risky_clauses, True),
+    "risk_score": (_compute_risk_score, True),
+    "risk_level": (_compute_risk_score, True),
+    "simplified_text": (_compute_simplified_text, True)
+}
+
+# Compute function -> the artifact keys it produces
+ARTIFACTS_BY_FUNCTION = {}
+for _key, (_compute, _) in ARTIFACTS.items():
+    ARTIFACTS_BY_FUNCTION.setdefault(_compute, []).append(_key)
+
+# Changing one of these fields invalidates every artifact derived from the text
+SOURCE_FIELDS = {"processed_text"}
+
+# Large text fields kept compressed in memory
+COMPRESSED_FIELDS = {"raw_text", "processed_text", "summary", "simplified_text"}
+
+class DocumentRecord(dict):
+    """
+    Document data dictionary whose analysis artifacts are computed on first access
+
+    Reading an artifact key ('summary', 'risky_clauses', 'risk_score', 'risk_level',
+    'simplified_text') with [] or get() computes and stores it once. `in` only reports
+    fields that are in memory; use is_computed() for artifacts. Artifacts built from the
+    legal dictionaries are dropped when a dictionary file changes, and all artifacts are
+    dropped when the processed text changes. Translations are memoized per language by
+    translation().
+
+    Large text fields are held zlib-compressed and decompressed on access through a shared
+    LRU, and risky clauses are a ClauseSet of offsets into the processed text.
+
+    A record can be backed by a store: fields missing from memory are fetched with the
+    loader on first access, and computed or assigned fields are written back with persist.
+    """
+
+    def __init__(
+        self,
+        *args,
+        loader: Optional[Callable[[str], Any]] = None,
+        persist: Optional[Callable[[Dict[str, Any], tuple], None]] = None,
+        version: Optional[tuple] = None,
+        **kwargs
+    ):
+        """
+        Initialize the record
+
+        Args:
+            loader: Returns a stored field by name, raising KeyError if there is none
+            persist: Writes changed fields (None deletes) with the dictionaries version
+            version: Dictionaries version the stored artifacts were computed with
+        """
+        super().__init__()
+        self._lock = threading.RLock()
+        self._loader = loader
+        self._persist = persist
+        self._dictionaries_version = version if version is not None else dictionaries_version()
+        # Clauses are stored last so the text their spans refer to is already present
+        for key, value in sorted(dict(*args, **kwargs).items(), key=lambda item: item[0] == "risky_clauses"):
+            self._set(key, value)
+
+    def _wrap(self, key: str, value: Any) -> Any:
+        """Convert a value to its compact in-memory form"""
+        if key in COMPRESSED_FIELDS:
+            return compress_text(value)
+        if key == "risky_clauses":
+            source = lambda: self["processed_text"]
+            if isinstance(value, ClauseSet):
+                # Refer to the record's compressed text rather than holding another copy
+                value.source = source
+            elif isinstance(value, dict):
+                value = ClauseSet.from_storage(value, source)
+            elif isinstance(value, list):
+                value = ClauseSet.from_dicts(value, source)
+        return value
+
+    @staticmethod
+    def _serializable(key: str, value: Any) -> Any:
+        """Convert a value to the plain form written to storage"""
+        value = decompress_text(value)
+        if isinstance(value, ClauseSet):
+            return value.to_storage()
+        return value
+
+    def _set(self, key: str, value: Any):
+        super().__setitem__(key, self._wrap(key, value))
+
+    def storage_items(self) -> Dict[str, Any]:
+        """Return the fields held in memory in plain, serializable form"""
+        with self._lock:
+            return {key: self._serializable(key, value) for key, value in dict.items(self)}
+
+    def _invalidate(self, dictionary_dependent_only: bool = False):
+        """Drop computed artifacts so they are rebuilt on next access"""
+        dropped = {
+            key: None
+            for key, (_, uses_dictionaries) in ARTIFACTS.items()
+            if uses_dictionaries or not dictionary_dependent_only
+        }
+        if not dictionary_dependent_only:
+            dropped["translations"] = None
+
+        for key in dropped:
+            super().pop(key, None)
+        return dropped
+
+    def _check_dictionaries(self):
+        version = dictionaries_version()
+        if version != self._dictionaries_version:
+            dropped = self._invalidate(dictionary_dependent_only=True)
+            self._dictionaries_version = version
+            if self._persist:
+                self._persist(dropped, version)
+
+    def _load(self, key: str) -> bool:
+        """Fetch a field from the backing store into memory; returns whether it existed"""
+        if self._loader is None:
+            return False
+        try:
+            value = self._loader(key)
+        except KeyError:
+            return False
+        self._set(key, value)
+        return True
+
+    def __getitem__(self, key):
+        with self._lock:
+            if key in ARTIFACTS:
+                self._check_dictionaries()
+
+            if super().__contains__(key) or self._load(key):
+                return decompress_text(super().__getitem__(key))
+
+            if key not in ARTIFACTS:
+                raise KeyError(key)
+
+            compute, _ = ARTIFACTS[key]
+            for artifact_key, value in compute(self).items():
+                self._set(artifact_key, value)
+            if self._persist:
+                self._persist(self._changed(ARTIFACTS_BY_FUNCTION[compute]), self._dictionaries_version)
+            return decompress_text(super().__getitem__(key))
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            dropped = self._invalidate() if key in SOURCE_FIELDS else {}
+            self._set(key, value)
+            if self._persist:
+                self._persist({**dropped, **self._changed([key])}, self._dictionaries_version)
+
+    def _changed(self, keys: List[str]) -> Dict[str, Any]:
+        """Return the serializable values of the given in-memory fields"""
+        return {key: self._serializable(key, super(DocumentRecord, self).__getitem__(key)) for key in keys}
+
+    def pop(self, key, *default):
+        with self._lock:
+            # A stored field that was not loaded yet is present too; only present fields are deleted
+            if not (super().__contains__(key) or self._load(key)):
+                if default:
+                    return default[0]
+                raise KeyError(key)
+            value = decompress_text(super().pop(key))
+            if self._persist:
+                self._persist({key: None}, self._dictionaries_version)
+            return value
+
+    def is_computed(self, key: str) -> bool:
+        """Whether an artifact has been computed and is still current"""
+        with self._lock:
+            self._check_dictionaries()
+            return super().__contains__(key) or self._load(key)
+
+    def translation(self, target_language: str, translate: Optional[Callable[[str, str], str]] = None) -> Dict[str, str]:
+        """
+        Return the document text and summary translated to a language, translating once
+
+        Args:
+            target_language: Target language code
+            translate: Translation function (defaults to models.translation.translate_text)
+
+        Returns:
+            Dict with the translated 'text' and 'summary'
+        """
+        with self._lock:
+            translations = self.get("translations") or {}
+            if target_language not in translations:
+                if translate is None:
+                    from models.translation import translate_text as translate
+                translations[target_language] = {
+                    "text": translate(self["processed_text"], target_language),
+                    "summary": translate(self["summary"], target_language)
+                }
+                self["translations"] = translations
+            return translations[target_language]
+
+    def warm(self, *keys: str):
+        """Compute the given artifacts now, e.g. on a background worker"""
+        for key in keys:
+            self[key]
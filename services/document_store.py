@@ -0,0 +1,380 @@
+"""
+SQLite-backed persistent store for analyzed documents
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+from config.config import DOCUMENT_STORE_PATH
+from services.document_record import DocumentRecord, dictionaries_version
+
+# Small fields kept as indexed columns and loaded with every record
+COLUMN_FIELDS = ["filename", "file_type", "file_size", "risk_score", "risk_level", "created_at"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY,
+    owner TEXT,
+    filename TEXT,
+    file_type TEXT,
+    file_size INTEGER,
+    risk_score REAL,
+    risk_level TEXT,
+    created_at REAL,
+    metadata TEXT,
+    dictionaries_version TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_documents_owner ON documents (owner, created_at);
+CREATE INDEX IF NOT EXISTS idx_documents_risk_score ON documents (risk_score);
+CREATE INDEX IF NOT EXISTS idx_documents_risk_level ON documents (risk_level);
+CREATE INDEX IF NOT EXISTS idx_documents_file_type ON documents (file_type);
+CREATE INDEX IF NOT EXISTS idx_documents_created_at ON documents (created_at);
+
+CREATE TABLE IF NOT EXISTS document_uploads (
+    owner TEXT NOT NULL,
+    doc_id TEXT NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    filename TEXT,
+    uploaded_at REAL,
+    PRIMARY KEY (owner, doc_id)
+);
+CREATE INDEX IF NOT EXISTS idx_document_uploads_doc_id ON document_uploads (doc_id);
+
+CREATE TABLE IF NOT EXISTS paragraph_results (
+    kind TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    version TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, hash, version)
+);
+
+CREATE TABLE IF NOT EXISTS document_fields (
+    doc_id TEXT NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (doc_id, name)
+);
+"""
+
+def _pack(value: Any) -> bytes:
+    """Serialize a field value as zlib-compressed JSON"""
+    return zlib.compress(json.dumps(value).encode("utf-8"), 6)
+
+def _unpack(data: bytes) -> Any:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+def _version_key(version: Iterable) -> str:
+    return json.dumps([list(entry) for entry in version])
+
+def _version_digest(version: Iterable) -> str:
+    return hashlib.sha1(_version_key(version).encode("utf-8")).hexdigest()[:16]
+
+# Fields the Insights dashboard aggregates
+INSIGHTS_FIELDS = {"filename", "file_type", "risk_score", "risk_level", "metadata", "risky_clauses"}
+
+# SQLite host parameter limit per query
+MAX_QUERY_PARAMS = 500
+
+# Uploads recorded before per-owner uploads were tracked
+MIGRATE_UPLOADS = """
+INSERT OR IGNORE INTO document_uploads (owner, doc_id, filename, uploaded_at)
+SELECT owner, id, filename, created_at FROM documents WHERE owner IS NOT NULL
+"""
+
+class DocumentStore:
+    """
+    Stores documents in SQLite: small fields as indexed columns, large fields
+    (texts, clauses, translations, AI analysis) as compressed blobs loaded on first access
+
+    Documents are identified by the hash of their file content, so an analysis is shared by
+    everyone who uploads the same file; each owner's file name and upload time are kept
+    separately as uploads.
+    """
+
+    def __init__(self, db_path: str = DOCUMENT_STORE_PATH):
+        """
+        Initialize the store, creating the database if needed
+
+        Args:
+            db_path: SQLite database file
+        """
+        self.db_path = db_path
+        self.local = threading.local()
+        self.paragraph_versions = {}
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            conn.execute(MIGRATE_UPLOADS)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection"""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self.local.conn = conn
+        return conn
+
+    def save(self, record: Dict[str, Any], owner: Optional[str] = None, filename: Optional[str] = None) -> str:
+        """
+        Insert a document and record its upload by an owner
+
+        Only fields present in the record are written; lazy artifacts that have not been
+        computed yet are computed later and persisted then. A document that is already
+        stored is not rewritten, since its ID is the hash of identical content.
+
+        Args:
+            record: Document data dictionary with an 'id'
+            owner: Session that uploaded the document
+            filename: The owner's file name (defaults to the record's)
+
+        Returns:
+            Document ID
+        """
+        doc_id = record["id"]
+        version = getattr(record, "_dictionaries_version", None) or dictionaries_version()
+        created_at = dict.get(record, "created_at") or time.time()
+
+        with self._connect() as conn:
+            inserted = conn.execute(
+                """INSERT OR IGNORE INTO documents
+                   (id, owner, filename, file_type, file_size, risk_score, risk_level, created_at, metadata, dictionaries_version)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    doc_id,
+                    owner,
+                    record.get("filename"),
+                    record.get("file_type"),
+                    record.get("file_size"),
+                    dict.get(record, "risk_score"),
+                    dict.get(record, "risk_level"),
+                    created_at,
+                    json.dumps(record.get("metadata", {})),
+                    _version_key(version)
+                )
+            ).rowcount
+            if inserted:
+                items = record.storage_items() if isinstance(record, DocumentRecord) else record
+                fields = {key: value for key, value in items.items() if key not in COLUMN_FIELDS and key not in ("id", "metadata")}
+                conn.executemany(
+                    "INSERT OR REPLACE INTO document_fields (doc_id, name, data) VALUES (?, ?, ?)",
+                    [(doc_id, name, _pack(value)) for name, value in fields.items() if value is not None]
+                )
+
+        if owner is not None:
+            self.add_upload(doc_id, owner, filename or record.get("filename"))
+        return doc_id
+
+    def exists(self, doc_id: str) -> bool:
+        """Whether a document with this ID (content hash) has been analyzed"""
+        row = self._connect().execute("SELECT 1 FROM documents WHERE id = ?", (doc_id,)).fetchone()
+        return row is not None
+
+    def add_upload(self, doc_id: str, owner: str, filename: Optional[str] = None, uploaded_at: Optional[float] = None):
+        """
+        Record that an owner uploaded a stored document
+
+        Args:
+            doc_id: Document ID
+            owner: Session that uploaded the document
+            filename: The owner's file name
+            uploaded_at: Upload time (defaults to now)
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO document_uploads (owner, doc_id, filename, uploaded_at) VALUES (?, ?, ?, ?)",
+                (owner, doc_id, filename, uploaded_at or time.time())
+            )
+
+    def update(self, doc_id: str, fields: Dict[str, Any], version: Optional[tuple] = None):
+        """
+        Write changed fields of a document
+
+        Args:
+            doc_id: Document ID
+            fields: Field values; None deletes a field
+            version: Dictionaries version the values were computed with
+        """
+        with self._connect() as conn:
+            for name, value in fields.items():
+                if name in COLUMN_FIELDS:
+                    conn.execute(f"UPDATE documents SET {name} = ? WHERE id = ?", (value, doc_id))
+                elif name == "metadata":
+                    conn.execute("UPDATE documents SET metadata = ? WHERE id = ?", (json.dumps(value or {}), doc_id))
+                elif value is None:
+                    conn.execute("DELETE FROM document_fields WHERE doc_id = ? AND name = ?", (doc_id, name))
+                else:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO document_fields (doc_id, name, data) VALUES (?, ?, ?)",
+                        (doc_id, name, _pack(value))
+                    )
+            if version is not None:
+                conn.execute("UPDATE documents SET dictionaries_version = ? WHERE id = ?", (_version_key(version), doc_id))
+
+        # Dashboards reload the document the next time they are shown
+        if INSIGHTS_FIELDS.intersection(fields):
+            from services.insights_aggregates import invalidate_document
+
+            invalidate_document(doc_id)
+
+    def load_field(self, doc_id: str, name: str) -> Any:
+        """
+        Load one large field of a document
+
+        Raises:
+            KeyError: If the document has no such field
+        """
+        row = self._connect().execute(
+            "SELECT data FROM document_fields WHERE doc_id = ? AND name = ?",
+            (doc_id, name)
+        ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return _unpack(row["data"])
+
+    def _record_from_row(self, row: sqlite3.Row) -> DocumentRecord:
+        doc_id = row["id"]
+        fields = {"id": doc_id, "metadata": json.loads(row["metadata"] or "{}")}
+        for name in COLUMN_FIELDS:
+            if row[name] is not None:
+                fields[name] = row[name]
+
+        # The owner's own file name and upload time
+        if "upload_filename" in row.keys():
+            if row["upload_filename"] is not None:
+                fields["filename"] = row["upload_filename"]
+            if row["uploaded_at"] is not None:
+                fields["created_at"] = row["uploaded_at"]
+                fields["uploaded_at"] = row["uploaded_at"]
+
+        version = tuple(tuple(entry) for entry in json.loads(row["dictionaries_version"] or "[]"))
+        return DocumentRecord(
+            fields,
+            loader=lambda name: self.load_field(doc_id, name),
+            persist=lambda changed, version: self.update(doc_id, changed, version),
+            version=version
+        )
+
+    def _select(self, owner: Optional[str]) -> str:
+        """Return the document query, joined with the owner's uploads when an owner is given"""
+        if owner is None:
+            return "SELECT documents.* FROM documents"
+        return """SELECT documents.*, document_uploads.filename AS upload_filename, document_uploads.uploaded_at
+                  FROM documents
+                  LEFT JOIN document_uploads ON document_uploads.doc_id = documents.id AND document_uploads.owner = ?"""
+
+    def get(self, doc_id: str, owner: Optional[str] = None) -> Optional[DocumentRecord]:
+        """
+        Return a document with its large fields loaded lazily, or None
+
+        Args:
+            doc_id: Document ID
+            owner: Session whose file name and upload time to show
+        """
+        params = [doc_id] if owner is None else [owner, doc_id]
+        row = self._connect().execute(f"{self._select(owner)} WHERE documents.id = ?", params).fetchone()
+        return self._record_from_row(row) if row else None
+
+    def get_many(self, doc_ids: List[str], owner: Optional[str] = None) -> Dict[str, DocumentRecord]:
+        """Return documents by ID in the given order, skipping unknown IDs"""
+        if not doc_ids:
+            return {}
+        placeholders = ",".join("?" for _ in doc_ids)
+        params = list(doc_ids) if owner is None else [owner] + list(doc_ids)
+        rows = self._connect().execute(f"{self._select(owner)} WHERE documents.id IN ({placeholders})", params).fetchall()
+        records = {row["id"]: self._record_from_row(row) for row in rows}
+        return {doc_id: records[doc_id] for doc_id in doc_ids if doc_id in records}
+
+    def list_ids(self, owner: str) -> List[str]:
+        """Return the IDs of the documents an owner uploaded, oldest first"""
+        rows = self._connect().execute(
+            "SELECT doc_id FROM document_uploads WHERE owner = ? ORDER BY uploaded_at",
+            (owner,)
+        ).fetchall()
+        return [row["doc_id"] for row in rows]
+
+    def delete(self, doc_id: str, owner: Optional[str] = None):
+        """
+        Delete an owner's upload of a document, and the document once nobody has it
+
+        Args:
+            doc_id: Document ID
+            owner: Session whose upload to remove (None deletes the document outright)
+        """
+        with self._connect() as conn:
+            if owner is not None:
+                conn.execute("DELETE FROM document_uploads WHERE owner = ? AND doc_id = ?", (owner, doc_id))
+                remaining = conn.execute("SELECT 1 FROM document_uploads WHERE doc_id = ?", (doc_id,)).fetchone()
+                if remaining is not None:
+                    return
+            conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    def get_paragraph_results(self, kind: str, hashes: Iterable[str], version: tuple) -> Dict[str, Any]:
+        """
+        Look up cached per-paragraph analysis results
+
+        Args:
+            kind: Analysis the results belong to, e.g. 'risk' or 'simplified'
+            hashes: Paragraph content hashes
+            version: Dictionaries version the results must have been computed with
+
+        Returns:
+            Paragraph hash -> result for the hashes found
+        """
+        hashes = list(hashes)
+        digest = _version_digest(version)
+        results = {}
+        conn = self._connect()
+        for i in range(0, len(hashes), MAX_QUERY_PARAMS):
+            batch = hashes[i:i + MAX_QUERY_PARAMS]
+            placeholders = ",".join("?" for _ in batch)
+            rows = conn.execute(
+                f"SELECT hash, data FROM paragraph_results WHERE kind = ? AND version = ? AND hash IN ({placeholders})",
+                [kind, digest] + batch
+            ).fetchall()
+            results.update((row["hash"], json.loads(row["data"])) for row in rows)
+        return results
+
+    def put_paragraph_results(self, kind: str, results: Dict[str, Any], version: tuple):
+        """
+        Cache per-paragraph analysis results, dropping results from older dictionaries
+
+        Args:
+            kind: Analysis the results belong to
+            results: Paragraph hash -> JSON-serializable result
+            version: Dictionaries version the results were computed with
+        """
+        digest = _version_digest(version)
+        with self._connect() as conn:
+            if self.paragraph_versions.get(kind) != digest:
+                conn.execute("DELETE FROM paragraph_results WHERE kind = ? AND version != ?", (kind, digest))
+                self.paragraph_versions[kind] = digest
+            conn.executemany(
+                "INSERT OR REPLACE INTO paragraph_results (kind, hash, version, data) VALUES (?, ?, ?, ?)",
+                [(kind, paragraph_hash, digest, json.dumps(result)) for paragraph_hash, result in results.items()]
+            )
+
+    def clear_paragraph_results(self):
+        """Drop all cached per-paragraph results"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM paragraph_results")
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_document_store() -> DocumentStore:
+    """Return the process-wide document store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DocumentStore()
+    return _store
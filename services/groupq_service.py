@@ -2,109 +2,703 @@
 Service for interacting with the Groq API
 """
 import json
+import time
 import requests
-from typing import Dict, List, Any, Optional, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Optional, Union, Iterator, Tuple
 
-from config.config import GROUPQ_API_KEY
+from config.config import (
+    GROUPQ_API_KEY,
+    GROUPQ_CHAT_COMPLETIONS_URL,
+    GROUPQ_MODEL,
+    GROUPQ_MAX_RETRIES,
+    GROUPQ_RETRY_BACKOFF,
+    GUIDE_CACHE_SIZE,
+    GUIDE_PARALLEL_WORKERS,
+    LLM_ADAPTIVE_MAX_TOKENS,
+    LLM_CHUNK_WORKERS,
+    LLM_MAX_COMPLETION_TOKENS,
+    LLM_TOKEN_BUDGETS,
+    PROMPT_COMPRESSION_ENABLED
+)
+from services.llm_backends import (
+    FAILOVER_ERRORS,
+    LLMBackend,
+    classify_request_error,
+    get_backend_router,
+    single_backend_router
+)
+from services.llm_telemetry import get_telemetry
+from services.llm_timeouts import (
+    INPUT_PROPORTIONAL_FEATURES,
+    compute_timeouts,
+    compute_stream_timeouts,
+    size_max_tokens
+)
+from services.prompt_compression import compress_prompt_text
+from utils.lru_cache import LRUCache
+from services.token_counter import get_token_counter, raw_message_tokens
+from services.risk_scoring import RISK_WEIGHTS
+from services.shared_resources import get_http_session
+
+SEVERITY_LEVELS = ["low", "medium", "high"]
+
+# Guide topics are repeated throughout the guide prompts, so they are kept short
+MAX_GUIDE_TOPIC_TOKENS = 60
+
+# Completion tokens of a one-shot analysis kept for the summary and risks, on top of the
+# simplified document (INPUT_PROPORTIONAL_FEATURES["analysis"] tokens per document token)
+ANALYSIS_RESERVED_TOKENS = 2048
+
+DOCUMENT_ANALYSIS_SYSTEM_PROMPT = f"""You are a legal document analysis expert specializing in Indian legal documents. You analyse a document once and return a single JSON object with exactly these keys:
+
+{{
+  "summary": string - a clear summary of the key clauses, obligations, parties and important terms,
+  "risks": [
+    {{
+      "clause": string - the risky clause quoted verbatim from the document,
+      "risk_type": one of {", ".join(sorted(RISK_WEIGHTS))} or "other",
+      "severity": one of "low", "medium", "high",
+      "explanation": string - one or two plain-English sentences on why it is risky for the reader
+    }}
+  ],
+  "simplified_text": string - the document rewritten in simple, easy-to-understand English
+}}
+
+Consider Indian legal context and Indian contract law principles. Return only the JSON object."""
+
+LEGAL_GUIDE_SYSTEM_PROMPT = """You are a legal education expert specializing in Indian law. Create EXTREMELY DETAILED, comprehensive, well-structured guides on legal topics based on the Indian legal system, Indian Constitution, and Indian regulations.
+
+CRITICAL: Always provide information in the context of Indian law unless explicitly asked about another jurisdiction.
+
+Your guides must be COMPREHENSIVE and DETAILED - include every single step, every document, every fee, every timeline. Make it so detailed that someone with NO legal knowledge can follow it successfully."""
+
+# Guide sections requested in parallel by generate_legal_guide(parallel=True).
+# Each entry is generated by its own, smaller request and merged in this order.
+LEGAL_GUIDE_SECTIONS = [
+    {
+        "key": "overview",
+        "title": "Introduction and Overview",
+        "max_tokens": 1200,
+        "instructions": """### 1. Introduction and Overview (Detailed)
+- What exactly is {topic} in the Indian legal context
+- Why it matters in India (constitutional and practical reasons)
+- Who can use this (eligibility criteria)
+- When to use this process
+
+### 2. Key Concepts and Legal Terminology (Explained)
+- Every legal term explained in simple language
+- Indian legal terms with meanings
+- Important definitions from relevant Acts"""
+    },
+    {
+        "key": "laws",
+        "title": "Applicable Indian Laws and Regulations",
+        "max_tokens": 1200,
+        "instructions": """### 3. Applicable Indian Laws and Regulations (Complete List)
+- ALL relevant Acts with full names and years
+- Specific sections and sub-sections that apply
+- Constitutional provisions if applicable
+- Recent amendments (with dates)
+- Rules and regulations under each Act
+- Relevant notifications and circulars"""
+    },
+    {
+        "key": "procedure",
+        "title": "Step-by-Step Procedure",
+        "max_tokens": 2500,
+        "instructions": """### 4. EXTREMELY DETAILED Step-by-Step Procedures in India
+Break down the ENTIRE process into granular steps, from pre-filing preparation through filing, fees,
+hearings, orders, execution and appeals. For EACH step, include:
+a) **What to do** (exact action required)
+b) **Where to go** (specific office/court/online portal with address/URL)
+c) **Forms to fill** (form numbers, where to get, how to fill)
+d) **Fees to pay** (exact amounts in ₹, payment methods)
+e) **Timeline** (how long this step takes)
+f) **What happens next** (immediate next step)
+g) **Common issues** at this step and solutions"""
+    },
+    {
+        "key": "documents",
+        "title": "Documents Required",
+        "max_tokens": 1500,
+        "instructions": """### 5. Documents Required (Exhaustive Checklist)
+For EACH document:
+- Document name
+- Why it's needed
+- Where to obtain it
+- Format required (original/copy/notarized)
+- Number of copies needed
+- Valid period
+- Alternative if not available"""
+    },
+    {
+        "key": "costs",
+        "title": "Fees, Costs and Timelines",
+        "max_tokens": 1500,
+        "instructions": """### 6. Fees and Costs (Complete Breakdown)
+- Court fees (category-wise), stamp duty, lawyer fees (typical range)
+- Documentation costs, notary charges, miscellaneous expenses
+- Total estimated cost (minimum to maximum)
+- Fee exemptions/waivers available
+
+### 7. Timeline Expectations (Realistic)
+- Each step duration
+- Total minimum and maximum time
+- Factors that can delay and how to expedite"""
+    },
+    {
+        "key": "considerations",
+        "title": "Important Considerations and Common Mistakes",
+        "max_tokens": 1500,
+        "instructions": """### 8. Important Considerations for India
+- State-specific variations (list major states)
+- Urban vs rural differences
+- Jurisdiction rules (detailed)
+- Practical challenges and language issues
+
+### 9. Common Mistakes to Avoid (With Solutions)
+For EACH common mistake: what it is, why people make it, what happens, how to avoid it and how to fix it"""
+    },
+    {
+        "key": "case_law",
+        "title": "Relevant Case Law",
+        "max_tokens": 1200,
+        "instructions": """### 10. Relevant Case Law
+- 5-10 important Supreme Court judgments with case name and citation, year, key ruling and how it affects this topic
+- Important High Court judgments"""
+    },
+    {
+        "key": "rights",
+        "title": "Practical Tips, Rights and Alternatives",
+        "max_tokens": 1800,
+        "instructions": """### 11. Practical Tips and Best Practices
+- Do's and Don'ts, working with lawyers, preparing for hearings
+- Legal aid options in India
+
+### 12. Troubleshooting Common Issues
+- What if the petition is rejected, documents are incomplete, the opposite party doesn't respond,
+  the hearing is delayed or the order is not favorable? Solutions for each scenario
+
+### 13. Alternative Options
+- Mediation, Arbitration, Lok Adalat, Online Dispute Resolution and when to use each"""
+    },
+    {
+        "key": "resources",
+        "title": "Resources and FAQs",
+        "max_tokens": 1500,
+        "instructions": """### 14. Additional Resources
+- Government websites (with exact URLs), relevant ministry/department, helpline numbers
+- Legal aid organizations, online portals, official mobile apps, downloadable forms
+
+### 15. Frequently Asked Questions
+- 10-15 most common questions with detailed answers"""
+    }
+]
+
+class GuideCache(LRUCache):
+    """LRU cache of generated legal guides shared by all sessions, keyed by topic"""
+    
+    def __init__(self, max_size: int = GUIDE_CACHE_SIZE):
+        super().__init__(max_size)
+    
+    @staticmethod
+    def key(topic: str) -> str:
+        """Cache key of a topic, insensitive to case and whitespace differences"""
+        return " ".join(topic.lower().split())
+    
+    def get(self, topic: str) -> Optional[str]:
+        return super().get(self.key(topic))
+    
+    def put(self, topic: str, guide: str):
+        super().put(self.key(topic), guide)
 
 class GroupQService:
     """Service for interacting with the Groq API"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, api_url: Optional[str] = None, model: Optional[str] = None):
         """
         Initialize the Groq API service
         
+        Without arguments, requests are routed per feature across the backends in config
+        (LLM_BACKENDS / LLM_ROUTES) with failover. Passing any argument pins the service to a
+        single endpoint instead, e.g. a local stand-in server.
+        
         Args:
             api_key: Groq API key (defaults to config value)
+            api_url: Chat completions endpoint (defaults to config value)
+            model: Model name sent with every request (defaults to config value)
         """
-        self.api_key = api_key or GROUPQ_API_KEY
-        self.api_url = "https://api.groq.com/openai/v1/chat/completions"
+        if api_key or api_url or model:
+            self.router = single_backend_router(
+                api_url or GROUPQ_CHAT_COMPLETIONS_URL,
+                model or GROUPQ_MODEL,
+                api_key=api_key or GROUPQ_API_KEY,
+                requires_api_key=not api_url
+            )
+        else:
+            self.router = get_backend_router()
+        
+        self.max_retries = GROUPQ_MAX_RETRIES
+        self.retry_backoff = GROUPQ_RETRY_BACKOFF
         
-        if not self.api_key:
+        if not any(backend.configured for backend in self.router.backends.values()):
             print("Warning: Groq API key not set. Using mock responses.")
     
-    def _make_groq_request(self, messages: List[Dict[str, str]], temperature: float = 0.7, max_tokens: int = 1024) -> str:
+    def _make_groq_request(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        feature: str = "other",
+        response_format: Optional[Dict[str, str]] = None,
+        compression: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
-        Make a request to the Groq API
+        Make a request to the LLM backends routed for the feature, failing over on transient errors
         
         Args:
             messages: List of chat messages
             temperature: Sampling temperature
-            max_tokens: Maximum tokens in response
+            max_tokens: Maximum tokens in response (adjusted per feature when adaptive sizing is on)
+            feature: Calling feature, used for routing and telemetry
+            response_format: Optional response format, e.g. {"type": "json_object"} for JSON mode
+            compression: Prompt compression report for the document text, recorded in telemetry
             
         Returns:
             AI response text
         """
-        if not self.api_key:
+        backends = self.router.candidates(feature)
+        if not backends:
             return f"⚠️ API Key not configured. Please add your GROUPQ_API_KEY to the .env file to enable AI responses."
         
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
+        over_budget = self._check_token_budget(messages, feature)
+        if over_budget:
+            return over_budget
+        
+        for index, backend in enumerate(backends):
+            result, call = self._request_backend(backend, messages, temperature, max_tokens, feature, response_format, compression)
             
-            payload = {
-                "model": "llama-3.3-70b-versatile",
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-                "top_p": 1,
-                "stream": False
-            }
+            if call["error"] in FAILOVER_ERRORS:
+                backend.mark_failure(call["error"])
+                if index < len(backends) - 1:
+                    continue
+            elif call["status"] == 200:
+                backend.mark_success()
+            
+            return result
+    
+    def _make_groq_stream_request(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        feature: str = "other"
+    ) -> Iterator[str]:
+        """
+        Make a streaming request to the LLM backends routed for the feature
+        
+        Fails over to the next backend only while nothing has been streamed yet.
+        
+        Args:
+            messages: List of chat messages
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response (adjusted per feature when adaptive sizing is on)
+            feature: Calling feature, used for routing and telemetry
+            
+        Yields:
+            Chunks of AI response text; errors are yielded as a single message
+        """
+        backends = self.router.candidates(feature)
+        if not backends:
+            yield f"⚠️ API Key not configured. Please add your GROUPQ_API_KEY to the .env file to enable AI responses."
+            return
+        
+        over_budget = self._check_token_budget(messages, feature)
+        if over_budget:
+            yield over_budget
+            return
+        
+        for index, backend in enumerate(backends):
+            call = self._new_call(backend, feature, max_tokens, stream=True)
+            chunks = self._stream_backend(backend, messages, temperature, max_tokens, call)
+            produced = False
+            failed_over = False
+            
+            try:
+                for chunk in chunks:
+                    if not produced and call["error"] in FAILOVER_ERRORS and index < len(backends) - 1:
+                        failed_over = True
+                        break
+                    produced = True
+                    yield chunk
+            finally:
+                chunks.close()
+            
+            if call["error"] in FAILOVER_ERRORS:
+                backend.mark_failure(call["error"])
+            elif call["status"] == 200:
+                backend.mark_success()
+            
+            if not failed_over:
+                return
+    
+    @staticmethod
+    def _token_budget(feature: str) -> Optional[int]:
+        """Return the prompt token budget for a feature, if it has one"""
+        return LLM_TOKEN_BUDGETS.get(feature)
+    
+    def _check_token_budget(self, messages: List[Dict[str, str]], feature: str) -> Optional[str]:
+        """
+        Reject a request locally when its prompt exceeds the feature's token budget
+        
+        Returns:
+            Error message for the user, or None if the request fits
+        """
+        budget = self._token_budget(feature)
+        if not budget:
+            return None
+        
+        tokens = get_token_counter().count_messages(messages)
+        if tokens <= budget:
+            return None
+        
+        return f"⚠️ This request is too long (about {tokens:,} tokens; the limit is {budget:,}). Please shorten it and try again."
+    
+    def _text_token_budget(self, messages: List[Dict[str, str]], feature: str) -> Optional[int]:
+        """
+        Return how many tokens of document text fit in a feature's budget
+        
+        Args:
+            messages: The request's messages with the document text left out
+            feature: Calling feature
             
-            print(f"Making request to Groq API...")  # Debug
-            print(f"API Key (first 10 chars): {self.api_key[:10]}...")  # Debug
+        Returns:
+            Tokens available for the text, or None if the feature has no budget
+        """
+        budget = self._token_budget(feature)
+        if not budget:
+            return None
+        return max(1, budget - get_token_counter().count_messages(messages))
+    
+    @staticmethod
+    def _new_call(backend: LLMBackend, feature: str, max_tokens: int, stream: bool = False) -> Dict[str, Any]:
+        """Create the call details dict that is filled in during a request and recorded afterwards"""
+        return {
+            "feature": feature,
+            "backend": backend.name,
+            "model": backend.model,
+            "max_tokens": max_tokens,
+            "timeout_s": None,
+            "stream": stream,
+            "retries": 0,
+            "status": None,
+            "ttft_s": None,
+            "headers_s": None,
+            "usage": None,
+            "prompt_estimate": None,
+            "error": None
+        }
+    
+    def _request_backend(
+        self,
+        backend: LLMBackend,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        feature: str,
+        response_format: Optional[Dict[str, str]] = None,
+        compression: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Make a non-streaming request to one backend and record its telemetry
+        
+        Returns:
+            Tuple of (response text or error message, call details)
+        """
+        telemetry = get_telemetry()
+        max_tokens = self._size_max_tokens(messages, max_tokens, feature)
+        timeout = compute_timeouts(max_tokens, telemetry.tokens_per_second(backend.model))
+        
+        payload = {
+            "model": backend.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "top_p": 1,
+            "stream": False
+        }
+        if response_format:
+            payload["response_format"] = response_format
+        
+        call = self._new_call(backend, feature, max_tokens)
+        call["timeout_s"] = timeout[1]
+        if compression:
+            call["prompt_tokens_saved"] = compression["tokens_before"] - compression["tokens_after"]
+        call["prompt_estimate"] = raw_message_tokens(messages)
+        
+        start = time.perf_counter()
+        try:
+            return self._send_groq_request(backend, payload, call, timeout), call
+        finally:
+            call["latency_s"] = time.perf_counter() - start
+            self._calibrate_token_counter(call)
+            telemetry.record(call)
+    
+    def _stream_backend(
+        self,
+        backend: LLMBackend,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        call: Dict[str, Any]
+    ) -> Iterator[str]:
+        """
+        Stream a request from one backend and record its telemetry when the stream ends
+        
+        Yields:
+            Chunks of AI response text or a user-facing error message
+        """
+        telemetry = get_telemetry()
+        max_tokens = self._size_max_tokens(messages, max_tokens, call["feature"])
+        timeout, deadline = compute_stream_timeouts(max_tokens, telemetry.tokens_per_second(backend.model))
+        
+        payload = {
+            "model": backend.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "top_p": 1,
+            "stream": True,
+            "stream_options": {"include_usage": True}
+        }
+        call["max_tokens"] = max_tokens
+        call["timeout_s"] = deadline
+        call["prompt_estimate"] = raw_message_tokens(messages)
+        
+        start = time.perf_counter()
+        try:
+            yield from self._stream_groq_response(backend, payload, call, timeout, start, start + deadline)
+        finally:
+            call["latency_s"] = time.perf_counter() - start
+            self._calibrate_token_counter(call)
+            telemetry.record(call)
+    
+    @staticmethod
+    def _calibrate_token_counter(call: Dict[str, Any]):
+        """Correct the local token estimate with the prompt size the API reported"""
+        usage = call.get("usage") or {}
+        if usage.get("prompt_tokens") and call.get("prompt_estimate"):
+            get_token_counter().calibrate(call["model"], call["prompt_estimate"], int(usage["prompt_tokens"]))
+    
+    def _size_max_tokens(self, messages: List[Dict[str, str]], max_tokens: int, feature: str) -> int:
+        """Size max_tokens from the prompt length and the feature's output history"""
+        if not LLM_ADAPTIVE_MAX_TOKENS:
+            return max_tokens
+        
+        return size_max_tokens(
+            feature,
+            get_token_counter().count_messages(messages),
+            max_tokens,
+            get_telemetry().output_tokens_percentile(feature, 95)
+        )
+    
+    def _post_with_retries(
+        self,
+        backend: LLMBackend,
+        payload: Dict[str, Any],
+        call: Dict[str, Any],
+        timeout: Tuple[float, float],
+        stream: bool = False
+    ) -> requests.Response:
+        """
+        POST the payload, retrying rate-limited and server-error responses with backoff
+        
+        Args:
+            backend: Backend to send the request to
+            payload: Request body
+            call: Call details; the retry count is updated in place
+            timeout: (connect, read) timeouts in seconds
+            stream: Whether to stream the response body
             
-            response = requests.post(
-                self.api_url,
+        Returns:
+            The final response
+        """
+        while True:
+            # Pooled connections are reused across requests and sessions
+            response = get_http_session().post(
+                backend.url,
                 json=payload,
-                headers=headers,
-                timeout=60  # Increased timeout for longer responses
+                headers=backend.headers(),
+                timeout=timeout,
+                stream=stream
             )
             
-            print(f"Response status code: {response.status_code}")  # Debug
+            retryable = response.status_code == 429 or response.status_code >= 500
+            if not retryable or call["retries"] >= self.max_retries:
+                return response
+            
+            # Honour Retry-After when the server sends one, otherwise back off exponentially
+            response.close()
+            call["retries"] += 1
+            try:
+                delay = float(response.headers.get("Retry-After", ""))
+            except ValueError:
+                delay = self.retry_backoff * (2 ** (call["retries"] - 1))
+            time.sleep(min(delay, 30))
+    
+    @staticmethod
+    def _status_error_message(status_code: int, call: Dict[str, Any]) -> Optional[str]:
+        """Return the user-facing message for an error status, recording the error on the call"""
+        if status_code == 401:
+            call["error"] = "authentication_failed"
+            return "⚠️ Authentication failed. Please check your Groq API key in the .env file. Visit https://console.groq.com to get a valid API key."
+        elif status_code == 429:
+            call["error"] = "rate_limited"
+            return "⚠️ Rate limit exceeded. Please wait a moment and try again."
+        elif status_code >= 500:
+            call["error"] = "server_error"
+            return "⚠️ Groq API server error. Please try again in a few moments."
+        return None
+    
+    def _send_groq_request(self, backend: LLMBackend, payload: Dict[str, Any], call: Dict[str, Any], timeout: Tuple[float, float]) -> str:
+        """
+        Send a chat completions request and turn the outcome into response text
+        
+        Args:
+            backend: Backend to send the request to
+            payload: Request body
+            call: Call details; status, usage and error are filled in place
+            timeout: (connect, read) timeouts in seconds
+            
+        Returns:
+            AI response text or a user-facing error message
+        """
+        try:
+            response = self._post_with_retries(backend, payload, call, timeout)
+            call["status"] = response.status_code
+            # Time until the response headers arrived; TTFT is only measured for streamed calls
+            call["headers_s"] = response.elapsed.total_seconds()
             
             # Handle different error codes
-            if response.status_code == 401:
-                return "⚠️ Authentication failed. Please check your Groq API key in the .env file. Visit https://console.groq.com to get a valid API key."
-            elif response.status_code == 429:
-                return "⚠️ Rate limit exceeded. Please wait a moment and try again."
-            elif response.status_code >= 500:
-                return "⚠️ Groq API server error. Please try again in a few moments."
+            error_message = self._status_error_message(response.status_code, call)
+            if error_message:
+                return error_message
             
             response.raise_for_status()
             result = response.json()
+            call["usage"] = result.get("usage")
             
             if "choices" in result and len(result["choices"]) > 0:
                 return result["choices"][0]["message"]["content"]
             else:
+                call["error"] = "unexpected_format"
                 return "⚠️ Unexpected response format from API. Please try again."
         
         except requests.exceptions.Timeout:
+            call["status"] = "timeout"
+            call["error"] = "timeout"
             return "⚠️ Request timed out. The AI service is taking too long to respond. Please try again."
         except requests.exceptions.RequestException as e:
             print(f"Groq API error: {e}")
+            call["status"] = call["status"] or "connection_error"
+            call["error"] = classify_request_error(e)
             error_msg = str(e)
             if "401" in error_msg:
                 return "⚠️ Authentication failed. Your API key may be invalid or expired. Please check your Groq API key at https://console.groq.com"
             return f"⚠️ Connection error: {error_msg}. Please check your internet connection and try again."
         except Exception as e:
             print(f"Unexpected error: {e}")
+            call["status"] = call["status"] or "error"
+            call["error"] = type(e).__name__
             return f"⚠️ An unexpected error occurred: {str(e)}"
     
-    def summarize_text(self, text: str, max_length: int = 500) -> str:
+    def _stream_groq_response(
+        self,
+        backend: LLMBackend,
+        payload: Dict[str, Any],
+        call: Dict[str, Any],
+        timeout: Tuple[float, float],
+        start: float,
+        deadline: float
+    ) -> Iterator[str]:
         """
-        Summarize text using the Groq API
+        Send a streaming chat completions request and yield content as it arrives
         
         Args:
-            text: Text to summarize
-            max_length: Maximum summary length
+            backend: Backend to send the request to
+            payload: Request body
+            call: Call details; status, usage, time to first token and error are filled in place
+            timeout: (connect, idle) timeouts in seconds; the idle timeout bounds the gap between chunks
+            start: perf_counter value when the call started
+            deadline: perf_counter value after which the stream is cut short
             
-        Returns:
-            Summarized text
+        Yields:
+            Chunks of AI response text or a user-facing error message
         """
-        messages = [
+        try:
+            response = self._post_with_retries(backend, payload, call, timeout, stream=True)
+            call["status"] = response.status_code
+            
+            error_message = self._status_error_message(response.status_code, call)
+            if error_message:
+                response.close()
+                yield error_message
+                return
+            
+            response.raise_for_status()
+            
+            with response:
+                for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                    if time.perf_counter() > deadline:
+                        call["status"] = "timeout"
+                        call["error"] = "deadline_exceeded"
+                        yield "\n\n⚠️ The response took too long and was cut short."
+                        return
+                    
+                    # Server-sent events: only 'data:' lines carry chunks
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    
+                    chunk = json.loads(data)
+                    usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+                    if usage:
+                        call["usage"] = usage
+                    
+                    for choice in chunk.get("choices") or []:
+                        content = (choice.get("delta") or {}).get("content")
+                        if content:
+                            if call["ttft_s"] is None:
+                                call["ttft_s"] = time.perf_counter() - start
+                            yield content
+        
+        except requests.exceptions.RequestException as e:
+            # Keep any partial answer readable by separating the error from it
+            separator = "\n\n" if call["ttft_s"] is not None else ""
+            
+            # Idle timeouts mid-stream surface as connection errors wrapping a read timeout
+            if isinstance(e, requests.exceptions.Timeout) or "timed out" in str(e).lower():
+                call["status"] = "timeout"
+                call["error"] = "timeout"
+                yield f"{separator}⚠️ Request timed out. The AI service stopped responding. Please try again."
+            else:
+                print(f"Groq API error: {e}")
+                call["status"] = call["status"] or "connection_error"
+                call["error"] = classify_request_error(e)
+                yield f"{separator}⚠️ Connection error: {str(e)}. Please check your internet connection and try again."
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            call["status"] = call["status"] or "error"
+            call["error"] = type(e).__name__
+            yield f"⚠️ An unexpected error occurred: {str(e)}"
+    
+    @staticmethod
+    def _summary_messages(text: str, max_length: int) -> List[Dict[str, str]]:
+        """Build the message list for summarizing text"""
+        return [
             {
                 "role": "system",
                 "content": """You are a legal document summarization expert specializing in Indian legal documents. Provide clear, concise summaries that highlight key clauses, obligations, parties involved, and important terms. 
@@ -116,42 +710,115 @@ When analyzing documents, consider Indian legal context, Indian contract law pri
                 "content": f"Please summarize the following legal document in approximately {max_length} words. Focus on Indian legal context if applicable:\n\n{text}"
             }
         ]
+    
+    @staticmethod
+    def _simplify_messages(text: str) -> List[Dict[str, str]]:
+        """Build the message list for simplifying text"""
+        return [
+            {
+                "role": "system",
+                "content": "You are a legal language simplification expert. Convert complex legal jargon into simple, easy-to-understand English that anyone can comprehend."
+            },
+            {
+                "role": "user",
+                "content": f"Please simplify the following legal text into plain English:\n\n{text}"
+            }
+        ]
+    
+    def _map_chunks(self, text: str, max_tokens: int, request) -> List[str]:
+        """
+        Split text into chunks that fit a token budget and run a request on each concurrently
         
-        return self._make_groq_request(messages, temperature=0.3)
+        Args:
+            text: Text to split
+            max_tokens: Token limit per chunk
+            request: Callable taking a chunk and returning response text
+            
+        Returns:
+            Responses in document order
+        """
+        chunks = get_token_counter().split(text, max_tokens)
+        with ThreadPoolExecutor(max_workers=max(1, min(LLM_CHUNK_WORKERS, len(chunks)))) as executor:
+            return list(executor.map(request, chunks))
+    
+    def summarize_text(self, text: str, max_length: int = 500) -> str:
+        """
+        Summarize text using the Groq API
+        
+        Documents over the summary token budget are summarized in chunks and the partial
+        summaries are then summarized together.
+        
+        Args:
+            text: Text to summarize
+            max_length: Maximum summary length
+            
+        Returns:
+            Summarized text
+        """
+        compression = compress_prompt_text(text) if PROMPT_COMPRESSION_ENABLED else None
+        if compression:
+            text = compression["text"]
+        
+        text_budget = self._text_token_budget(self._summary_messages("", max_length), "summary")
+        if text_budget and get_token_counter().count(text) > text_budget:
+            partials = self._map_chunks(
+                text,
+                text_budget,
+                lambda chunk: self._make_groq_request(
+                    self._summary_messages(chunk, max(100, max_length // 2)),
+                    temperature=0.3,
+                    feature="summary"
+                )
+            )
+            for partial in partials:
+                if partial.startswith("⚠️"):
+                    return partial
+            return self.summarize_text("\n\n".join(partials), max_length)
+        
+        messages = self._summary_messages(text, max_length)
+        return self._make_groq_request(messages, temperature=0.3, feature="summary", compression=compression)
     
     def simplify_text(self, text: str) -> str:
         """
         Simplify legal jargon to plain English
         
+        Text over the simplify token budget is simplified in chunks that are joined in order.
+        
         Args:
             text: Legal text to simplify
             
         Returns:
             Simplified text
         """
-        messages = [
-            {
-                "role": "system",
-                "content": "You are a legal language simplification expert. Convert complex legal jargon into simple, easy-to-understand English that anyone can comprehend."
-            },
-            {
-                "role": "user",
-                "content": f"Please simplify the following legal text into plain English:\n\n{text}"
-            }
-        ]
+        compression = compress_prompt_text(text) if PROMPT_COMPRESSION_ENABLED else None
+        if compression:
+            text = compression["text"]
         
-        return self._make_groq_request(messages, temperature=0.3)
+        text_budget = self._text_token_budget(self._simplify_messages(""), "simplify")
+        if text_budget and get_token_counter().count(text) > text_budget:
+            parts = self._map_chunks(
+                text,
+                text_budget,
+                lambda chunk: self._make_groq_request(self._simplify_messages(chunk), temperature=0.3, feature="simplify")
+            )
+            for part in parts:
+                if part.startswith("⚠️"):
+                    return part
+            return "\n\n".join(part.strip() for part in parts)
+        
+        messages = self._simplify_messages(text)
+        return self._make_groq_request(messages, temperature=0.3, feature="simplify", compression=compression)
     
-    def chat_query(self, query: str, chat_history: Optional[List[Dict[str, str]]] = None) -> str:
+    def _build_chat_messages(self, query: str, chat_history: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, str]]:
         """
-        Get a response to a chat query about legal topics
+        Build the message list for a chat query
         
         Args:
             query: User's query
             chat_history: Previous chat history
             
         Returns:
-            Response to the query
+            List of chat messages
         """
         messages = [
             {
@@ -188,26 +855,66 @@ Important guidelines:
             "content": query
         })
         
-        return self._make_groq_request(messages, temperature=0.7)
+        # Drop the oldest history, then shorten the query, until the prompt fits the chat budget
+        budget = self._token_budget("chat")
+        counter = get_token_counter()
+        if budget:
+            while len(messages) > 2 and counter.count_messages(messages) > budget:
+                del messages[1]
+            if counter.count_messages(messages) > budget:
+                query_budget = budget - counter.count_messages(messages[:-1] + [{"role": "user", "content": ""}])
+                messages[-1]["content"] = counter.truncate(query, query_budget)
+        
+        return messages
+    
+    def chat_query(self, query: str, chat_history: Optional[List[Dict[str, str]]] = None) -> str:
+        """
+        Get a response to a chat query about legal topics
+        
+        Args:
+            query: User's query
+            chat_history: Previous chat history
+            
+        Returns:
+            Response to the query
+        """
+        messages = self._build_chat_messages(query, chat_history)
+        return self._make_groq_request(messages, temperature=0.7, feature="chat")
+    
+    def chat_query_stream(self, query: str, chat_history: Optional[List[Dict[str, str]]] = None) -> Iterator[str]:
+        """
+        Stream a response to a chat query about legal topics
+        
+        Args:
+            query: User's query
+            chat_history: Previous chat history
+            
+        Yields:
+            Chunks of the response as they are generated
+        """
+        messages = self._build_chat_messages(query, chat_history)
+        yield from self._make_groq_stream_request(messages, temperature=0.7, feature="chat")
     
-    def generate_legal_guide(self, topic: str) -> str:
+    def generate_legal_guide(self, topic: str, parallel: bool = False) -> str:
         """
         Generate a comprehensive legal guide on a specified topic
         
         Args:
             topic: Legal topic
+            parallel: Request the guide sections concurrently instead of in one long call
             
         Returns:
             Generated guide content in markdown format
         """
+        topic = get_token_counter().truncate(topic, MAX_GUIDE_TOPIC_TOKENS)
+        if parallel:
+            sections = {index: content for index, _, content in self.iter_legal_guide_sections(topic)}
+            return self.merge_legal_guide_sections(sections)
+        
         messages = [
             {
                 "role": "system",
-                "content": """You are a legal education expert specializing in Indian law. Create EXTREMELY DETAILED, comprehensive, well-structured guides on legal topics based on the Indian legal system, Indian Constitution, and Indian regulations.
-
-CRITICAL: Always provide information in the context of Indian law unless explicitly asked about another jurisdiction.
-
-Your guides must be COMPREHENSIVE and DETAILED - include every single step, every document, every fee, every timeline. Make it so detailed that someone with NO legal knowledge can follow it successfully."""
+                "content": LEGAL_GUIDE_SYSTEM_PROMPT
             },
             {
                 "role": "user",
@@ -369,4 +1076,226 @@ Make it EXTREMELY DETAILED - this should be a complete manual that someone can f
             }
         ]
         
-        return self._make_groq_request(messages, temperature=0.4, max_tokens=8000)  # Much higher limit for detailed guides
\ No newline at end of file
+        return self._make_groq_request(messages, temperature=0.4, max_tokens=8000, feature="guide")  # Much higher limit for detailed guides
+    
+    def _generate_legal_guide_section(self, topic: str, section: Dict[str, Any]) -> str:
+        """
+        Generate a single section of a legal guide
+        
+        Args:
+            topic: Legal topic
+            section: Entry from LEGAL_GUIDE_SECTIONS
+            
+        Returns:
+            Section content in markdown format
+        """
+        messages = [
+            {
+                "role": "system",
+                "content": LEGAL_GUIDE_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": f"""You are writing one part of an EXTREMELY DETAILED legal guide about '{topic}' specifically for India. Other parts of the guide are written separately, so write ONLY the sections below - no title, introduction or closing remarks.
+
+{section["instructions"].format(topic=topic)}
+
+Format everything in clear markdown with the exact ### headings above, #### sub-headings, bullet points, numbered lists for sequential steps, bold for emphasis and tables where helpful."""
+            }
+        ]
+        
+        return self._make_groq_request(messages, temperature=0.4, max_tokens=section["max_tokens"], feature="guide_section")
+    
+    def iter_legal_guide_sections(self, topic: str, max_workers: Optional[int] = None):
+        """
+        Generate the guide sections concurrently, yielding each one as soon as it completes
+        
+        Args:
+            topic: Legal topic
+            max_workers: Maximum concurrent requests (defaults to config value)
+            
+        Yields:
+            Tuples of (section index, section title, section content) in completion order
+        """
+        topic = get_token_counter().truncate(topic, MAX_GUIDE_TOPIC_TOKENS)
+        workers = max(1, min(max_workers or GUIDE_PARALLEL_WORKERS, len(LEGAL_GUIDE_SECTIONS)))
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._generate_legal_guide_section, topic, section): index
+                for index, section in enumerate(LEGAL_GUIDE_SECTIONS)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                yield index, LEGAL_GUIDE_SECTIONS[index]["title"], future.result()
+    
+    @staticmethod
+    def merge_legal_guide_sections(sections: Dict[int, str]) -> str:
+        """
+        Merge generated guide sections back into document order
+        
+        Args:
+            sections: Mapping of section index to section content
+            
+        Returns:
+            Complete guide in markdown format
+        """
+        return "\n\n".join(sections[index].strip() for index in sorted(sections))
+    
+    def explain_risky_clauses(self, clauses: List[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Explain a batch of risky clauses in plain language with a single JSON-mode request
+        
+        Args:
+            clauses: List of dicts with 'id', 'risk_type' and 'text'
+            
+        Returns:
+            Dict mapping clause id to explanation, or a dict with an 'error' key
+        """
+        clause_list = "\n\n".join(
+            f"[{clause['id']}] ({clause['risk_type'].replace('_', ' ')}) {clause['text']}"
+            for clause in clauses
+        )
+        
+        messages = [
+            {
+                "role": "system",
+                "content": """You are a legal language simplification expert specializing in Indian contracts. For each risky clause you are given, explain in one or two plain-English sentences what it means for the person signing and why it is risky.
+
+Return a JSON object of the form {"explanations": [{"id": "<clause id>", "explanation": "<text>"}]} with one entry for every clause id."""
+            },
+            {
+                "role": "user",
+                "content": f"Explain these risky clauses:\n\n{clause_list}"
+            }
+        ]
+        
+        content = self._make_groq_request(
+            messages,
+            temperature=0.3,
+            max_tokens=min(4096, 100 + 80 * len(clauses)),
+            feature="risk_explanations",
+            response_format={"type": "json_object"}
+        )
+        
+        if content.startswith("⚠️"):
+            return {"error": content}
+        
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return {"error": "⚠️ The AI service returned invalid JSON. Please try again."}
+        
+        explanations = {}
+        entries = data.get("explanations", []) if isinstance(data, dict) else []
+        for entry in entries if isinstance(entries, list) else []:
+            if isinstance(entry, dict) and entry.get("id") is not None and isinstance(entry.get("explanation"), str):
+                explanations[str(entry["id"])] = entry["explanation"].strip()
+        
+        return explanations
+    
+    def analyze_document(self, text: str, summary_words: int = 300) -> Dict[str, Any]:
+        """
+        Summarize, annotate risks and simplify a document in a single JSON-mode request
+        
+        Args:
+            text: Document text
+            summary_words: Approximate summary length in words
+            
+        Returns:
+            Dict with 'summary', 'risks' and 'simplified_text', or a dict with an 'error' key
+        """
+        # A single structured analysis cannot be chunked, so over-long documents are truncated
+        text_budget = self._text_token_budget(
+            [{"role": "system", "content": DOCUMENT_ANALYSIS_SYSTEM_PROMPT}, {"role": "user", "content": f"Analyse the following legal document. Keep the summary to about {summary_words} words.\n\n[Document truncated]"}],
+            "analysis"
+        )
+        
+        # The response rewrites the whole document, so the text must also fit in the completion cap
+        output_ratio = INPUT_PROPORTIONAL_FEATURES["analysis"]
+        completion_text_budget = max(1, int((LLM_MAX_COMPLETION_TOKENS - ANALYSIS_RESERVED_TOKENS) / output_ratio))
+        text_budget = min(text_budget, completion_text_budget) if text_budget else completion_text_budget
+        
+        counter = get_token_counter()
+        truncated = counter.truncate(text, text_budget)
+        if truncated != text:
+            text = f"{truncated}\n\n[Document truncated]"
+        max_tokens = min(LLM_MAX_COMPLETION_TOKENS, int(counter.count(text) * output_ratio) + ANALYSIS_RESERVED_TOKENS)
+        
+        messages = [
+            {
+                "role": "system",
+                "content": DOCUMENT_ANALYSIS_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": f"Analyse the following legal document. Keep the summary to about {summary_words} words.\n\n{text}"
+            }
+        ]
+        
+        content = self._make_groq_request(
+            messages,
+            temperature=0.2,
+            max_tokens=max_tokens,
+            feature="analysis",
+            response_format={"type": "json_object"}
+        )
+        
+        if content.startswith("⚠️"):
+            return {"error": content}
+        
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return {"error": "⚠️ The AI service returned invalid JSON. Please try again."}
+        
+        return validate_document_analysis(data)
+
+def validate_document_analysis(data: Any) -> Dict[str, Any]:
+    """
+    Validate and normalize a structured document analysis response
+    
+    Values are returned as plain text from the model (clauses are quoted from the uploaded
+    document), so they must be escaped before being rendered as HTML.
+    
+    Args:
+        data: Parsed JSON response
+        
+    Returns:
+        Normalized analysis dict, or a dict with an 'error' key describing the first problem
+    """
+    if not isinstance(data, dict):
+        return {"error": "⚠️ Analysis response is not a JSON object."}
+    
+    summary = data.get("summary")
+    simplified_text = data.get("simplified_text")
+    risks = data.get("risks", [])
+    
+    if not isinstance(summary, str) or not summary.strip():
+        return {"error": "⚠️ Analysis response is missing the summary."}
+    if not isinstance(simplified_text, str):
+        return {"error": "⚠️ Analysis response is missing the simplified text."}
+    if not isinstance(risks, list):
+        return {"error": "⚠️ Analysis response has an invalid risks list."}
+    
+    normalized_risks = []
+    for risk in risks:
+        if not isinstance(risk, dict) or not isinstance(risk.get("clause"), str) or not risk["clause"].strip():
+            continue
+        
+        # Be lenient with enum values rather than rejecting the whole response
+        risk_type = str(risk.get("risk_type", "other")).strip().lower().replace(" ", "_")
+        severity = str(risk.get("severity", "medium")).strip().lower()
+        
+        normalized_risks.append({
+            "clause": risk["clause"].strip(),
+            "risk_type": risk_type if risk_type in RISK_WEIGHTS else "other",
+            "severity": severity if severity in SEVERITY_LEVELS else "medium",
+            "explanation": str(risk.get("explanation", "")).strip()
+        })
+    
+    return {
+        "summary": summary.strip(),
+        "risks": normalized_risks,
+        "simplified_text": simplified_text.strip()
+    }
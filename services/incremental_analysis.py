@@ -0,0 +1,116 @@
+"""
+Incremental analysis that reuses per-chunk results across document versions
+"""
+from typing import Any, Callable, Dict, List, Tuple
+
+from models.clause_set import ClauseSet
+from services.shared_resources import get_jargon_simplifier, get_risk_matcher
+from utils.document_utils import paragraph_hash, split_into_chunk_spans, split_into_paragraph_spans
+
+def _chunk_results(
+    kind: str,
+    chunks: List[str],
+    version: tuple,
+    compute: Callable[[List[str]], List[Any]]
+) -> List[Any]:
+    """
+    Return a result per chunk, computing only chunks not seen before
+
+    Args:
+        kind: Analysis name used as the cache namespace
+        chunks: Chunk texts
+        version: Dictionaries version the results depend on
+        compute: Computes the results for a list of uncached chunks
+
+    Returns:
+        Results in chunk order
+    """
+    from services.document_store import get_document_store
+
+    store = get_document_store()
+    hashes = [paragraph_hash(chunk) for chunk in chunks]
+    cached = store.get_paragraph_results(kind, set(hashes), version)
+
+    missing = {}
+    for chunk_key, chunk in zip(hashes, chunks):
+        if chunk_key not in cached and chunk_key not in missing:
+            missing[chunk_key] = chunk
+
+    if missing:
+        computed = dict(zip(missing.keys(), compute(list(missing.values()))))
+        store.put_paragraph_results(kind, computed, version)
+        cached.update(computed)
+
+    return [cached[chunk_key] for chunk_key in hashes]
+
+def _paragraph_chunks(text: str, chunkable: bool = True) -> List[Tuple[Tuple[int, int], List[str]]]:
+    """Return each paragraph's span with the texts of its chunks (the whole paragraph if not chunkable)"""
+    paragraphs = []
+    for start, end in split_into_paragraph_spans(text):
+        spans = split_into_chunk_spans(text, start, end) if chunkable else [(start, end)]
+        paragraphs.append(((start, end), [text[chunk_start:chunk_end] for chunk_start, chunk_end in spans]))
+    return paragraphs
+
+def join_paragraphs(text: str, spans: List[Tuple[int, int]], paragraphs: List[str]) -> str:
+    """Join processed paragraphs with the separators between their spans in the original text"""
+    parts = []
+    for index, ((start, _), paragraph) in enumerate(zip(spans, paragraphs)):
+        if index:
+            parts.append(text[spans[index - 1][1]:start])
+        parts.append(paragraph)
+    return "".join(parts)
+
+def detect_risky_clauses_incremental(text: str, version: tuple) -> ClauseSet:
+    """
+    Detect risky clauses like detect_risky_clauses, reusing results for unchanged paragraphs
+
+    Keyword counts are cached per chunk of each paragraph and added up per paragraph, so the
+    clauses and confidences are the same as detect_risky_clauses returns.
+
+    Args:
+        text: Document text
+        version: Dictionaries version (see services.document_record.dictionaries_version)
+
+    Returns:
+        ClauseSet of detected risky clauses
+    """
+    risk_matcher = get_risk_matcher()
+    paragraphs = _paragraph_chunks(text, risk_matcher.chunkable)
+
+    def compute(new_chunks: List[str]) -> List[Any]:
+        return [risk_matcher.keyword_counts(chunk) for chunk in new_chunks]
+
+    chunk_counts = iter(_chunk_results("risk_counts", [chunk for _, chunks in paragraphs for chunk in chunks], version, compute))
+
+    risky_clauses = ClauseSet(text)
+    for (start_index, end_index), chunks in paragraphs:
+        counts = {}
+        for _ in chunks:
+            for type_index, keyword_index, count in next(chunk_counts):
+                counts[(type_index, keyword_index)] = counts.get((type_index, keyword_index), 0) + count
+        risk = risk_matcher.detect_from_counts(counts)
+        if risk is not None:
+            risk_type, confidence = risk
+            risky_clauses.append(risk_type, start_index, end_index, confidence)
+    return risky_clauses
+
+def simplify_text_incremental(text: str, version: tuple) -> str:
+    """
+    Simplify a document chunk by chunk, reusing results for unchanged chunks
+
+    Args:
+        text: Document text
+        version: Dictionaries version (see services.document_record.dictionaries_version)
+
+    Returns:
+        Simplified text, keeping the breaks between paragraphs
+    """
+    paragraphs = _paragraph_chunks(text)
+
+    def compute(new_chunks: List[str]) -> List[Any]:
+        simplifier = get_jargon_simplifier()
+        return [simplifier.simplify(chunk) for chunk in new_chunks]
+
+    simplified_chunks = iter(_chunk_results("simplified", [chunk for _, chunks in paragraphs for chunk in chunks], version, compute))
+    simplified = [" ".join(next(simplified_chunks) for _ in chunks) for _, chunks in paragraphs]
+    return join_paragraphs(text, [span for span, _ in paragraphs], simplified)
@@ -0,0 +1,293 @@
+"""
+Incrementally maintained Insights dashboard aggregates for the Legal AI Platform
+"""
+import datetime
+import itertools
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from models.clause_set import as_clause_set
+from utils.document_utils import paragraph_hash
+
+# Workspaces (owners) whose aggregates are kept in memory
+MAX_WORKSPACES = 256
+
+# Characters of clause text used to group similar clauses across documents
+CLAUSE_KEY_CHARS = 100
+
+# Columns of the clause table: one row per risky clause of every document in the workspace
+CLAUSE_COLUMNS = ["doc_id", "risk_type", "confidence", "start_index", "end_index", "text_hash"]
+
+# Versions are unique across workspaces, so a version alone identifies one state of one workspace
+_versions = itertools.count(1)
+
+def document_date(doc: Dict[str, Any]) -> Optional[datetime.datetime]:
+    """Return when the workspace owner uploaded a document, or None if no upload was recorded"""
+    if doc.get("uploaded_at"):
+        return datetime.datetime.fromtimestamp(doc["uploaded_at"])
+    return None
+
+def summarize_document(doc_id: str, doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a document to the fields the dashboard aggregates
+
+    Args:
+        doc_id: Document ID
+        doc: Document record
+
+    Returns:
+        Summary with the record's score, level, type and metadata counts, plus its
+        clauses as columns of the clause table and the text of each clause hash
+    """
+    clause_set = as_clause_set(doc.get("risky_clauses"))
+    metadata = doc.get("metadata", {}) or {}
+
+    # Clauses are grouped across documents by a hash of their first characters
+    clauses = clause_set.to_columns()
+    clauses["text_hash"] = []
+    clause_texts = {}
+    for text in clause_set.texts():
+        text_hash = paragraph_hash(text[:CLAUSE_KEY_CHARS]) if text else None
+        clauses["text_hash"].append(text_hash)
+        if text_hash is not None:
+            clause_texts.setdefault(text_hash, text)
+
+    return {
+        "doc_id": doc_id,
+        "filename": doc.get("filename", "Unknown"),
+        "file_type": doc.get("file_type", ""),
+        "date": document_date(doc),
+        "risk_score": doc.get("risk_score", 0),
+        "risk_level": doc.get("risk_level", "low"),
+        "metadata": {
+            "length": metadata.get("length", 0),
+            "num_sentences": metadata.get("num_sentences", 0),
+            "num_clauses": metadata.get("num_clauses", 0)
+        },
+        "num_risky_clauses": len(clause_set),
+        "clauses": clauses,
+        "clause_texts": clause_texts
+    }
+
+class WorkspaceAggregates:
+    """
+    Dashboard aggregates of one workspace's documents, updated as documents are added or removed
+
+    Document-level figures are running counters. Clause-level figures are vectorized pandas
+    operations on a columnar clause table, which gains rows only for newly added documents.
+    Every change assigns a new version; values derived with memo() are rebuilt only when it
+    changed, and cached figures are keyed on it.
+    """
+
+    def __init__(self, owner: Optional[str]):
+        self.owner = owner
+        self.lock = threading.RLock()
+        self.version = next(_versions)
+        self.summaries: Dict[str, Dict[str, Any]] = {}
+        self.risk_score_sum = 0.0
+        self.risk_levels = Counter()
+        self.doc_types = Counter()
+        # Text hash -> clause text shown for the group
+        self.clause_texts: Dict[str, str] = {}
+        self.table = None
+        # Changes not yet applied to the clause table
+        self.pending_added: Dict[str, Dict[str, Any]] = {}
+        self.pending_removed = set()
+        self.memos: Dict[str, tuple] = {}
+        self.memos_version = 0
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.summaries)
+
+    @property
+    def average_risk(self) -> float:
+        return self.risk_score_sum / len(self.summaries) if self.summaries else 0.0
+
+    def add(self, summary: Dict[str, Any]):
+        """Add a document summary (see summarize_document) to the aggregates"""
+        with self.lock:
+            doc_id = summary["doc_id"]
+            if doc_id in self.summaries:
+                self.remove(doc_id)
+            # Clause rows move into the clause table; the summary keeps document-level fields
+            summary = dict(summary)
+            clauses = summary.pop("clauses")
+            clause_texts = summary.pop("clause_texts")
+            self.summaries[doc_id] = summary
+            self.risk_score_sum += summary["risk_score"]
+            self.risk_levels[summary["risk_level"]] += 1
+            self.doc_types[summary["file_type"].upper()[1:]] += 1
+            for text_hash, text in clause_texts.items():
+                self.clause_texts.setdefault(text_hash, text)
+            self.pending_added[doc_id] = clauses
+            self.version = next(_versions)
+
+    def remove(self, doc_id: str):
+        """Subtract a document from the aggregates"""
+        with self.lock:
+            summary = self.summaries.pop(doc_id, None)
+            if summary is None:
+                return
+            self.risk_score_sum -= summary["risk_score"]
+            self.risk_levels[summary["risk_level"]] -= 1
+            self.doc_types[summary["file_type"].upper()[1:]] -= 1
+            # Drop counters that reached zero so they are not shown
+            for counter in (self.risk_levels, self.doc_types):
+                for key in [key for key, count in counter.items() if count <= 0]:
+                    del counter[key]
+            if self.pending_added.pop(doc_id, None) is None:
+                self.pending_removed.add(doc_id)
+            if not self.summaries:
+                self.risk_score_sum = 0.0
+            self.version = next(_versions)
+
+    def sync(self, doc_ids: List[str]):
+        """
+        Bring the aggregates in line with the workspace's document IDs
+
+        Only documents added since the last sync are loaded from the document store.
+
+        Args:
+            doc_ids: IDs of the documents currently in the workspace
+        """
+        with self.lock:
+            wanted = set(doc_ids)
+            for doc_id in [doc_id for doc_id in self.summaries if doc_id not in wanted]:
+                self.remove(doc_id)
+
+            added = [doc_id for doc_id in doc_ids if doc_id not in self.summaries]
+            if added:
+                from services.document_store import get_document_store
+
+                for doc_id, doc in get_document_store().get_many(added, owner=self.owner).items():
+                    self.add(summarize_document(doc_id, doc))
+
+    def clause_table(self):
+        """
+        Return the clause table, applying documents added or removed since it was last built
+
+        Returns:
+            DataFrame with CLAUSE_COLUMNS, one row per risky clause
+        """
+        import pandas as pd
+
+        with self.lock:
+            if self.table is None:
+                self.table = pd.DataFrame({column: [] for column in CLAUSE_COLUMNS})
+
+            if self.pending_removed:
+                self.table = self.table[~self.table["doc_id"].isin(self.pending_removed)]
+                self.pending_removed = set()
+                # Forget the texts of clause groups that no longer occur
+                remaining = set(self.table["text_hash"].dropna())
+                remaining.update(text_hash for clauses in self.pending_added.values() for text_hash in clauses["text_hash"])
+                self.clause_texts = {text_hash: text for text_hash, text in self.clause_texts.items() if text_hash in remaining}
+
+            if self.pending_added:
+                # All new documents' rows are built as one frame, so the table is copied once per sync
+                columns = {column: [] for column in CLAUSE_COLUMNS}
+                for doc_id, clauses in self.pending_added.items():
+                    columns["doc_id"].extend([doc_id] * len(clauses["risk_type"]))
+                    for column in CLAUSE_COLUMNS[1:]:
+                        columns[column].extend(clauses[column])
+                added = pd.DataFrame(columns)
+                self.table = added if self.table.empty else pd.concat([self.table, added], ignore_index=True)
+                self.pending_added = {}
+
+            return self.table
+
+    def memo(self, name: str, build: Callable[[], Any]) -> Any:
+        """Return build()'s value, cached until the aggregates change"""
+        with self.lock:
+            # Values from earlier versions are never used again
+            if self.memos_version != self.version:
+                self.memos = {}
+                self.memos_version = self.version
+            cached = self.memos.get(name)
+            if cached is not None and cached[0] == self.version:
+                return cached[1]
+            value = build()
+            self.memos[name] = (self.version, value)
+            return value
+
+    def risk_counts(self) -> Dict[str, int]:
+        """Return the number of risky clauses per risk type, most frequent first"""
+        return self.memo("risk_counts", lambda: self.clause_table()["risk_type"].value_counts().to_dict())
+
+    def risk_counts_by_document(self, doc_ids: List[str]):
+        """
+        Count risky clauses per risk type in each of the given documents
+
+        Returns:
+            DataFrame indexed by risk type with a column of counts per document ID
+        """
+
+        def build():
+            table = self.clause_table()
+            counts = table[table["doc_id"].isin(doc_ids)].groupby(["risk_type", "doc_id"]).size()
+            return counts.unstack(fill_value=0).reindex(columns=doc_ids, fill_value=0).sort_index()
+
+        return self.memo(f"risk_counts_by_document:{','.join(doc_ids)}", build)
+
+    def common_clauses(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return the clause groups found most often, with their document count and up to three file names each"""
+
+        def build():
+            table = self.clause_table().dropna(subset=["text_hash"])
+            groups = table.groupby("text_hash", sort=False).agg(
+                count=("doc_id", "size"),
+                doc_count=("doc_id", "nunique"),
+                risk_type=("risk_type", "first")
+            ).nlargest(limit, "count", keep="first")
+
+            # File names of the documents in the top groups, in order of appearance
+            top_rows = table[table["text_hash"].isin(groups.index)].drop_duplicates(["text_hash", "doc_id"])
+            filenames = top_rows["doc_id"].map(lambda doc_id: self.summaries[doc_id]["filename"])
+            docs_by_group = filenames.groupby(top_rows["text_hash"], sort=False).agg(lambda names: list(dict.fromkeys(names)))
+
+            clause_list = []
+            for text_hash, group in groups.iterrows():
+                docs = docs_by_group.get(text_hash, [])
+                clause_list.append({
+                    "text": self.clause_texts.get(text_hash, ""),
+                    "count": int(group["count"]),
+                    "doc_count": int(group["doc_count"]),
+                    "risk_type": group["risk_type"],
+                    "docs": ", ".join(docs[:3]) + (f" and {len(docs) - 3} more" if len(docs) > 3 else "")
+                })
+            return clause_list
+
+        return self.memo(f"common_clauses:{limit}", build)
+
+_workspaces = OrderedDict()
+_workspaces_lock = threading.Lock()
+
+def get_workspace_aggregates(owner: Optional[str], doc_ids: List[str]) -> WorkspaceAggregates:
+    """
+    Return the aggregates of a workspace, synced with its current documents
+
+    Args:
+        owner: Session ID owning the documents
+        doc_ids: IDs of the documents in the workspace
+
+    Returns:
+        WorkspaceAggregates shared by reruns of the workspace
+    """
+    with _workspaces_lock:
+        aggregates = _workspaces.get(owner)
+        if aggregates is None:
+            aggregates = _workspaces[owner] = WorkspaceAggregates(owner)
+        _workspaces.move_to_end(owner)
+        while len(_workspaces) > MAX_WORKSPACES:
+            _workspaces.popitem(last=False)
+    aggregates.sync(doc_ids)
+    return aggregates
+
+def invalidate_document(doc_id: str):
+    """Drop a document from every workspace so the next sync reloads it (e.g. after it was re-scored)"""
+    with _workspaces_lock:
+        workspaces = list(_workspaces.values())
+    for aggregates in workspaces:
+        aggregates.remove(doc_id)
@@ -0,0 +1,235 @@
+"""
+Process-wide background job queue for long-running document processing
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional
+
+from config.config import JOB_QUEUE_WORKERS, JOB_RETENTION_SECONDS
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATUSES = {JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED}
+
+class JobCancelled(Exception):
+    """Raised inside a job when it has been cancelled"""
+
+class Job:
+    """A unit of background work with stage-by-stage progress"""
+
+    def __init__(self, label: str, stages: List[str], owner: Optional[str] = None):
+        """
+        Initialize the job
+
+        Args:
+            label: Display name, e.g. the uploaded file name
+            stages: Names of the stages the job runs through, in order
+            owner: Session that submitted the job
+        """
+        self.id = str(uuid.uuid4())
+        self.label = label
+        self.stages = list(stages)
+        self.owner = owner
+        self.status = JOB_QUEUED
+        self.current_stage = None
+        self.stage_index = -1
+        self.stage_progress = 0.0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        self.lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def progress(self) -> float:
+        """Overall progress between 0 and 1"""
+        if self.status == JOB_COMPLETED:
+            return 1.0
+        if not self.stages or self.stage_index < 0:
+            return 0.0
+        return min(1.0, (self.stage_index + self.stage_progress) / len(self.stages))
+
+    def check_cancelled(self):
+        """Raise JobCancelled if cancellation was requested"""
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def stage(self, name: str):
+        """
+        Mark the start of a stage
+
+        Args:
+            name: Stage name (should be one of the job's stages)
+        """
+        self.check_cancelled()
+        with self.lock:
+            self.current_stage = name
+            self.stage_index = self.stages.index(name) if name in self.stages else self.stage_index + 1
+            self.stage_progress = 0.0
+
+    def set_stage_progress(self, fraction: float):
+        """
+        Report progress within the current stage
+
+        Args:
+            fraction: Completed fraction of the stage between 0 and 1
+        """
+        self.check_cancelled()
+        with self.lock:
+            self.stage_progress = min(1.0, max(0.0, fraction))
+
+    def status_dict(self) -> Dict[str, Any]:
+        """Return a snapshot of the job for display"""
+        with self.lock:
+            return {
+                "id": self.id,
+                "label": self.label,
+                "status": self.status,
+                "stage": self.current_stage,
+                "progress": self.progress,
+                "error": self.error,
+                "elapsed_s": (self.finished_at or time.time()) - (self.started_at or self.created_at)
+            }
+
+class JobQueue:
+    """Runs jobs on a bounded worker pool and keeps their status for polling"""
+
+    def __init__(self, max_workers: int = JOB_QUEUE_WORKERS, retention_seconds: float = JOB_RETENTION_SECONDS):
+        """
+        Initialize the queue
+
+        Args:
+            max_workers: Jobs run concurrently; the rest wait in the queue
+            retention_seconds: How long finished jobs are kept for their owners to collect
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="legal-ai-job")
+        self.retention_seconds = retention_seconds
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args,
+        label: str = "",
+        stages: Optional[List[str]] = None,
+        owner: Optional[str] = None,
+        **kwargs
+    ) -> Job:
+        """
+        Queue a job
+
+        Args:
+            func: Callable run as func(job, *args, **kwargs); its return value becomes the result
+            label: Display name
+            stages: Stage names used for progress reporting
+            owner: Session that submitted the job
+
+        Returns:
+            The queued job
+        """
+        job = Job(label, stages or [], owner)
+        with self.lock:
+            self._prune()
+            self.jobs[job.id] = job
+        job.future = self.executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job: Job, func: Callable[..., Any], args, kwargs):
+        """Run a job on a worker thread and record its outcome"""
+        if job.cancel_event.is_set():
+            self._finish(job, JOB_CANCELLED)
+            return
+
+        with job.lock:
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+
+        try:
+            result = func(job, *args, **kwargs)
+        except JobCancelled:
+            self._finish(job, JOB_CANCELLED)
+        except Exception as e:
+            # Cancellation raised inside library code may come back wrapped in another exception
+            if job.cancel_event.is_set():
+                self._finish(job, JOB_CANCELLED)
+                return
+            print(f"Job {job.label or job.id} failed: {e}")
+            self._finish(job, JOB_FAILED, error=str(e))
+        else:
+            self._finish(job, JOB_COMPLETED, result=result)
+
+    @staticmethod
+    def _finish(job: Job, status: str, result: Any = None, error: Optional[str] = None):
+        with job.lock:
+            job.status = status
+            job.result = result
+            job.error = error
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by ID"""
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Request cancellation of a job
+
+        Queued jobs never start; running jobs stop at their next stage or progress report.
+
+        Returns:
+            True if the job existed and had not finished
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, JOB_CANCELLED)
+        return True
+
+    def jobs_for(self, owner: str) -> List[Job]:
+        """Return the jobs submitted by an owner, oldest first"""
+        with self.lock:
+            return sorted(
+                (job for job in self.jobs.values() if job.owner == owner),
+                key=lambda job: job.created_at
+            )
+
+    def remove(self, job_id: str):
+        """Forget a job once its owner has collected the result"""
+        with self.lock:
+            self.jobs.pop(job_id, None)
+
+    def _prune(self):
+        """Drop finished jobs older than the retention period (caller holds the lock)"""
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue shared by all sessions"""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue()
+    return _job_queue
@@ -0,0 +1,217 @@
+"""
+LLM backends speaking the chat completions protocol, with per-feature routing and failover
+"""
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+import requests
+
+from config.config import (
+    LLM_BACKENDS,
+    LLM_ROUTES,
+    LLM_BACKEND_RECHECK_INTERVAL,
+    LLM_CONNECT_TIMEOUT
+)
+from services.shared_resources import get_http_session
+
+# Call errors after which the next backend in the route is tried
+FAILOVER_ERRORS = {"timeout", "rate_limited", "server_error", "connection_error", "deadline_exceeded"}
+
+def classify_request_error(error: Exception) -> str:
+    """
+    Return the call error recorded for a failed request
+
+    Args:
+        error: Exception raised by requests
+
+    Returns:
+        "timeout", "connection_error" for network failures (refused connections, TLS and proxy
+        errors, truncated responses), or the exception's class name
+    """
+    if isinstance(error, requests.exceptions.Timeout):
+        return "timeout"
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError)):
+        return "connection_error"
+    return type(error).__name__
+
+class LLMBackend:
+    """A chat completions endpoint and the model to use on it"""
+
+    def __init__(self, name: str, url: str, model: str, api_key: str = "", requires_api_key: bool = True):
+        """
+        Initialize the backend
+
+        Args:
+            name: Backend name used in routes and telemetry
+            url: Chat completions endpoint
+            model: Model name sent with every request
+            api_key: Bearer token (may be empty for local servers)
+            requires_api_key: Whether the backend is unusable without an API key
+        """
+        self.name = name
+        self.url = url
+        self.model = model
+        self.api_key = api_key
+        self.requires_api_key = requires_api_key
+        self.healthy = True
+        self.last_failure = 0.0
+        self.last_error = None
+        self.lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        """Whether the backend has everything it needs to be called"""
+        return bool(self.url) and (bool(self.api_key) or not self.requires_api_key)
+
+    @property
+    def models_url(self) -> str:
+        """OpenAI-compatible model listing endpoint used for health checks"""
+        base = self.url.rstrip("/")
+        if base.endswith("/chat/completions"):
+            base = base[:-len("/chat/completions")]
+        return f"{base}/models"
+
+    def headers(self) -> Dict[str, str]:
+        """HTTP headers for requests to this backend"""
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def check_health(self) -> bool:
+        """
+        Probe the backend's model listing endpoint
+
+        Returns:
+            True if the backend answered successfully
+        """
+        try:
+            response = get_http_session().get(self.models_url, headers=self.headers(), timeout=(LLM_CONNECT_TIMEOUT, LLM_CONNECT_TIMEOUT))
+            if response.status_code == 200:
+                self.mark_success()
+                return True
+            self.mark_failure(f"health check returned {response.status_code}")
+        except requests.exceptions.RequestException as e:
+            self.mark_failure(classify_request_error(e))
+        return False
+
+    def mark_success(self):
+        with self.lock:
+            self.healthy = True
+            self.last_error = None
+
+    def mark_failure(self, error: Optional[str]):
+        with self.lock:
+            self.healthy = False
+            self.last_failure = time.time()
+            self.last_error = error
+
+    def status(self) -> Dict[str, Any]:
+        """Return a summary of the backend for display"""
+        return {
+            "name": self.name,
+            "url": self.url,
+            "model": self.model,
+            "configured": self.configured,
+            "healthy": self.healthy,
+            "last_error": self.last_error
+        }
+
+class BackendRouter:
+    """Chooses backends for each feature and tracks their health"""
+
+    def __init__(self, backends: Dict[str, LLMBackend], routes: Dict[str, List[str]]):
+        """
+        Initialize the router
+
+        Args:
+            backends: Backends by name
+            routes: Feature name to backend names in failover order; "default" covers other features
+        """
+        self.backends = backends
+        self.routes = routes
+
+    def route(self, feature: str) -> List[str]:
+        """Return the backend names configured for a feature"""
+        return self.routes.get(feature) or self.routes.get("default") or list(self.backends)
+
+    def candidates(self, feature: str) -> List[LLMBackend]:
+        """
+        Return the backends to try for a feature, in order
+
+        Healthy backends keep their configured order; unhealthy ones are re-probed once the
+        recheck interval has passed and otherwise moved to the end as a last resort.
+
+        Args:
+            feature: Calling feature
+
+        Returns:
+            Usable backends in the order they should be tried
+        """
+        healthy = []
+        unhealthy = []
+
+        for name in self.route(feature):
+            backend = self.backends.get(name)
+            if backend is None or not backend.configured:
+                continue
+
+            if not backend.healthy and time.time() - backend.last_failure >= LLM_BACKEND_RECHECK_INTERVAL:
+                backend.check_health()
+
+            (healthy if backend.healthy else unhealthy).append(backend)
+
+        return healthy + unhealthy
+
+    def check_all(self) -> Dict[str, bool]:
+        """Run a health check on every configured backend"""
+        return {
+            name: backend.check_health()
+            for name, backend in self.backends.items()
+            if backend.configured
+        }
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Return the status of every backend"""
+        return [backend.status() for backend in self.backends.values()]
+
+def build_router(backend_configs: Dict[str, Dict[str, Any]], routes: Dict[str, List[str]]) -> BackendRouter:
+    """
+    Build a router from backend configuration dicts
+
+    Args:
+        backend_configs: {"name": {"url": ..., "model": ..., "api_key": ..., "requires_api_key": bool}}
+        routes: Feature name to backend names in failover order
+
+    Returns:
+        BackendRouter
+    """
+    backends = {
+        name: LLMBackend(
+            name,
+            config.get("url", ""),
+            config.get("model", ""),
+            api_key=config.get("api_key", ""),
+            requires_api_key=config.get("requires_api_key", True)
+        )
+        for name, config in backend_configs.items()
+    }
+    return BackendRouter(backends, routes)
+
+def single_backend_router(url: str, model: str, api_key: str = "", requires_api_key: bool = True) -> BackendRouter:
+    """Build a router with one backend used for every feature"""
+    backend = LLMBackend("default", url, model, api_key=api_key, requires_api_key=requires_api_key)
+    return BackendRouter({"default": backend}, {"default": ["default"]})
+
+_router = None
+_router_lock = threading.Lock()
+
+def get_backend_router() -> BackendRouter:
+    """Return the process-wide router built from config, so backend health is shared"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = build_router(LLM_BACKENDS, LLM_ROUTES)
+    return _router
@@ -0,0 +1,337 @@
+"""
+Per-request telemetry for LLM calls: latency, tokens, retries and cost
+"""
+import bisect
+import datetime
+import json
+import logging
+import os
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Any, Optional
+
+from config.config import (
+    LLM_PRICING,
+    LLM_TELEMETRY_ENABLED,
+    LLM_TELEMETRY_LOG,
+    LLM_TELEMETRY_MAX_BYTES,
+    LLM_TELEMETRY_BACKUP_COUNT
+)
+
+# Weight of the newest sample in the tokens-per-second moving average
+THROUGHPUT_EWMA_ALPHA = 0.2
+
+# Minimum successful calls before a feature's output length history is trusted
+MIN_OUTPUT_SAMPLES = 5
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120]
+TOKEN_BUCKETS = [64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768]
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimate the cost of a call in USD
+
+    Args:
+        model: Model name
+        prompt_tokens: Input tokens
+        completion_tokens: Output tokens
+
+    Returns:
+        Cost in USD (0.0 for models without a known price)
+    """
+    input_price, output_price = LLM_PRICING.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+class Histogram:
+    """Fixed-bucket histogram with approximate percentiles"""
+
+    def __init__(self, bounds: List[float]):
+        """
+        Initialize the histogram
+
+        Args:
+            bounds: Sorted bucket upper bounds; values above the last bound go to an overflow bucket
+        """
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Add a value to the histogram"""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct: float) -> float:
+        """
+        Approximate percentile, reported as the upper bound of the bucket containing it
+
+        Args:
+            pct: Percentile between 0 and 100
+
+        Returns:
+            Approximate percentile value
+        """
+        if not self.count:
+            return 0.0
+        target = pct / 100.0 * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return bucket labels and counts"""
+        labels = [f"<={bound:g}" for bound in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return dict(zip(labels, self.counts))
+
+class FeatureStats:
+    """Aggregated telemetry for a single calling feature"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.prompt_tokens_saved = 0
+        self.cost_usd = 0.0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.ttft = Histogram(LATENCY_BUCKETS)
+        self.tokens = Histogram(TOKEN_BUCKETS)
+        self.output_tokens = Histogram(TOKEN_BUCKETS)
+
+    def add(self, record: Dict[str, Any]):
+        """Fold one call record into the aggregates"""
+        self.calls += 1
+        if record.get("status") != 200:
+            self.errors += 1
+        self.retries += record.get("retries", 0)
+        self.prompt_tokens += record.get("prompt_tokens", 0)
+        self.completion_tokens += record.get("completion_tokens", 0)
+        self.prompt_tokens_saved += record.get("prompt_tokens_saved") or 0
+        self.cost_usd += record.get("cost_usd", 0.0)
+        self.latency.observe(record.get("latency_s", 0.0))
+        if record.get("ttft_s") is not None:
+            self.ttft.observe(record["ttft_s"])
+        if record.get("total_tokens"):
+            self.tokens.observe(record["total_tokens"])
+        if record.get("status") == 200 and record.get("completion_tokens"):
+            self.output_tokens.observe(record["completion_tokens"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+            "prompt_tokens_saved": self.prompt_tokens_saved,
+            "cost_usd": self.cost_usd,
+            "latency_mean_s": self.latency.mean,
+            "latency_p50_s": self.latency.percentile(50),
+            "latency_p95_s": self.latency.percentile(95),
+            "latency_p99_s": self.latency.percentile(99),
+            "ttft_p50_s": self.ttft.percentile(50),
+            "ttft_p95_s": self.ttft.percentile(95)
+        }
+
+class LLMTelemetry:
+    """Collects LLM call records into a rotating JSONL file and in-process histograms"""
+
+    def __init__(
+        self,
+        log_path: Optional[str] = LLM_TELEMETRY_LOG,
+        max_bytes: int = LLM_TELEMETRY_MAX_BYTES,
+        backup_count: int = LLM_TELEMETRY_BACKUP_COUNT,
+        recent_size: int = 500
+    ):
+        """
+        Initialize the telemetry collector
+
+        Args:
+            log_path: JSONL file to append records to (None disables the file)
+            max_bytes: Size at which the log file is rotated
+            backup_count: Number of rotated files to keep
+            recent_size: Number of recent records kept in memory
+        """
+        self.log_path = log_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.lock = threading.Lock()
+        self.features = {}
+        self.model_throughput = {}
+        self.recent = deque(maxlen=recent_size)
+        self._logger = None
+
+    def _get_logger(self) -> Optional[logging.Logger]:
+        """Create the rotating JSONL logger on first use"""
+        if self._logger is None and self.log_path:
+            try:
+                os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+                handler = RotatingFileHandler(
+                    self.log_path,
+                    maxBytes=self.max_bytes,
+                    backupCount=self.backup_count,
+                    encoding="utf-8"
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+
+                logger = logging.getLogger(f"legal_ai.llm_telemetry.{id(self)}")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(handler)
+                self._logger = logger
+            except OSError as e:
+                print(f"Error opening LLM telemetry log: {e}")
+                self.log_path = None
+        return self._logger
+
+    def record(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Record a completed LLM call
+
+        Args:
+            call: Call details (feature, model, status, latency_s, ttft_s for streamed calls,
+                headers_s for plain calls, usage, retries, ...)
+
+        Returns:
+            The normalized record that was stored
+        """
+        usage = call.get("usage") or {}
+        prompt_tokens = int(usage.get("prompt_tokens", 0) or 0)
+        completion_tokens = int(usage.get("completion_tokens", 0) or 0)
+        model = call.get("model", "")
+
+        record = {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "feature": call.get("feature", "other"),
+            "backend": call.get("backend"),
+            "model": model,
+            "status": call.get("status"),
+            "latency_s": round(call.get("latency_s", 0.0), 4),
+            "ttft_s": round(call["ttft_s"], 4) if call.get("ttft_s") is not None else None,
+            "headers_s": round(call["headers_s"], 4) if call.get("headers_s") is not None else None,
+            "stream": bool(call.get("stream")),
+            "timeout_s": call.get("timeout_s"),
+            "prompt_tokens": prompt_tokens,
+            "prompt_tokens_estimated": call.get("prompt_estimate"),
+            "completion_tokens": completion_tokens,
+            "total_tokens": int(usage.get("total_tokens", prompt_tokens + completion_tokens) or 0),
+            "max_tokens": call.get("max_tokens"),
+            "prompt_tokens_saved": call.get("prompt_tokens_saved"),
+            "retries": call.get("retries", 0),
+            "cost_usd": estimate_cost(model, prompt_tokens, completion_tokens),
+            "error": call.get("error")
+        }
+
+        with self.lock:
+            self.features.setdefault(record["feature"], FeatureStats()).add(record)
+            self._update_throughput(record)
+            self.recent.append(record)
+            logger = self._get_logger()
+
+        if logger:
+            logger.info(json.dumps(record))
+
+        return record
+
+    def _update_throughput(self, record: Dict[str, Any]):
+        """Fold a successful call into the per-model tokens-per-second average"""
+        if record["status"] != 200 or not record["completion_tokens"]:
+            return
+
+        # Streamed calls measure generation only; plain calls include queueing, which errs on the safe side
+        generation_time = record["latency_s"]
+        if record["stream"] and record["ttft_s"] is not None:
+            generation_time -= record["ttft_s"]
+        if generation_time <= 0:
+            return
+
+        sample = record["completion_tokens"] / generation_time
+        previous = self.model_throughput.get(record["model"])
+        if previous is None:
+            self.model_throughput[record["model"]] = sample
+        else:
+            self.model_throughput[record["model"]] = (1 - THROUGHPUT_EWMA_ALPHA) * previous + THROUGHPUT_EWMA_ALPHA * sample
+
+    def tokens_per_second(self, model: str) -> Optional[float]:
+        """Return the recent average generation speed for a model, if measured"""
+        with self.lock:
+            return self.model_throughput.get(model)
+
+    def output_tokens_percentile(self, feature: str, pct: float) -> Optional[int]:
+        """
+        Return a percentile of historical completion lengths for a feature
+
+        Args:
+            feature: Calling feature
+            pct: Percentile between 0 and 100
+
+        Returns:
+            Completion tokens, or None when there is not enough history
+        """
+        with self.lock:
+            stats = self.features.get(feature)
+            if not stats or stats.output_tokens.count < MIN_OUTPUT_SAMPLES:
+                return None
+            return int(stats.output_tokens.percentile(pct))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Return aggregated statistics per feature"""
+        with self.lock:
+            return {feature: stats.to_dict() for feature, stats in self.features.items()}
+
+    def histograms(self, feature: str) -> Dict[str, Dict[str, int]]:
+        """Return the latency, time-to-first-token and token histograms for a feature"""
+        with self.lock:
+            stats = self.features.get(feature)
+            if not stats:
+                return {}
+            return {
+                "latency_s": stats.latency.to_dict(),
+                "ttft_s": stats.ttft.to_dict(),
+                "total_tokens": stats.tokens.to_dict()
+            }
+
+    def recent_records(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Return the most recent call records, newest first"""
+        with self.lock:
+            return list(self.recent)[-limit:][::-1]
+
+    def reset(self):
+        """Clear in-process aggregates (the JSONL file is kept)"""
+        with self.lock:
+            self.features = {}
+            self.model_throughput = {}
+            self.recent.clear()
+
+class _NullTelemetry(LLMTelemetry):
+    """Telemetry sink used when telemetry is disabled"""
+
+    def record(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        return {}
+
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+def get_telemetry() -> LLMTelemetry:
+    """Return the process-wide telemetry collector"""
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = LLMTelemetry() if LLM_TELEMETRY_ENABLED else _NullTelemetry(log_path=None)
+    return _telemetry
@@ -0,0 +1,84 @@
+"""
+Adaptive timeouts and max_tokens sizing for LLM requests
+"""
+from typing import Optional, Tuple
+
+from config.config import (
+    LLM_CONNECT_TIMEOUT,
+    LLM_READ_TIMEOUT_MIN,
+    LLM_READ_TIMEOUT_MAX,
+    LLM_STREAM_IDLE_TIMEOUT,
+    LLM_DEFAULT_TOKENS_PER_SECOND,
+    LLM_TIMEOUT_SAFETY_FACTOR,
+    LLM_MAX_COMPLETION_TOKENS,
+    LLM_MIN_COMPLETION_TOKENS
+)
+
+# Features whose output length follows the input length (output tokens per prompt token)
+INPUT_PROPORTIONAL_FEATURES = {
+    "simplify": 1.2,
+    "analysis": 1.5
+}
+
+# Headroom over the historical p95 output length before capping max_tokens
+HISTORY_HEADROOM = 1.5
+
+# Fixed allowance for queueing and prompt processing in the read timeout
+READ_TIMEOUT_BASE = 5.0
+
+def compute_timeouts(max_tokens: int, tokens_per_second: Optional[float] = None) -> Tuple[float, float]:
+    """
+    Derive (connect, read) timeouts for a non-streaming request
+
+    Args:
+        max_tokens: Requested completion length
+        tokens_per_second: Recently measured generation speed (defaults to config value)
+
+    Returns:
+        Tuple of (connect timeout, read timeout) in seconds
+    """
+    speed = tokens_per_second if tokens_per_second and tokens_per_second > 0 else LLM_DEFAULT_TOKENS_PER_SECOND
+    read_timeout = READ_TIMEOUT_BASE + LLM_TIMEOUT_SAFETY_FACTOR * max_tokens / speed
+    read_timeout = min(LLM_READ_TIMEOUT_MAX, max(LLM_READ_TIMEOUT_MIN, read_timeout))
+    return LLM_CONNECT_TIMEOUT, read_timeout
+
+def compute_stream_timeouts(max_tokens: int, tokens_per_second: Optional[float] = None) -> Tuple[Tuple[float, float], float]:
+    """
+    Derive timeouts for a streaming request
+
+    Args:
+        max_tokens: Requested completion length
+        tokens_per_second: Recently measured generation speed (defaults to config value)
+
+    Returns:
+        Tuple of ((connect timeout, idle timeout), overall deadline) in seconds. The idle
+        timeout bounds the gap between chunks; the deadline bounds the whole stream.
+    """
+    _, deadline = compute_timeouts(max_tokens, tokens_per_second)
+    return (LLM_CONNECT_TIMEOUT, LLM_STREAM_IDLE_TIMEOUT), deadline
+
+def size_max_tokens(feature: str, prompt_tokens: int, requested: int, history_p95: Optional[int] = None) -> int:
+    """
+    Size max_tokens for a request from its input length and the feature's output history
+
+    Args:
+        feature: Calling feature
+        prompt_tokens: Estimated prompt tokens
+        requested: max_tokens asked for by the caller
+        history_p95: 95th percentile of the feature's past completion lengths, if known
+
+    Returns:
+        max_tokens to send
+    """
+    ratio = INPUT_PROPORTIONAL_FEATURES.get(feature)
+
+    if ratio:
+        # Rewrites need room proportional to the input, even beyond the caller's default
+        target = max(requested, int(prompt_tokens * ratio))
+    elif history_p95:
+        # Past outputs show how much the feature really uses; leave headroom for long answers
+        target = min(requested, int(history_p95 * HISTORY_HEADROOM))
+    else:
+        target = requested
+
+    return int(min(LLM_MAX_COMPLETION_TOKENS, max(LLM_MIN_COMPLETION_TOKENS, target)))
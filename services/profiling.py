@@ -0,0 +1,332 @@
+"""
+Opt-in per-stage profiling of document processing and Streamlit reruns
+"""
+import cProfile
+import functools
+import importlib.machinery
+import inspect
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from types import FunctionType, ModuleType
+from typing import Any, Dict, List, Optional
+
+from config.config import (
+    PROFILING_ENABLED,
+    PROFILING_CPROFILE,
+    PROFILING_TRACEMALLOC,
+    PROFILING_HISTORY
+)
+from services.llm_telemetry import Histogram, LATENCY_BUCKETS
+
+# Modules whose functions are timed
+INSTRUMENTED_PREFIXES = ("utils.document_utils", "models.", "services.")
+
+# Modules left alone: the profiler itself and per-call bookkeeping that would only add noise
+EXCLUDED_MODULES = {"services.profiling", "services.llm_telemetry"}
+
+# Lines of cProfile output and allocation sites kept per document
+CPROFILE_LINES = 40
+TRACEMALLOC_TOP = 15
+
+class DocumentProfile:
+    """Timings collected while one document was processed"""
+
+    def __init__(self, doc_id: str, filename: str):
+        self.doc_id = doc_id
+        self.filename = filename
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.duration_s = None
+        self.stages: List[Dict[str, Any]] = []
+        self.functions: Dict[str, Dict[str, float]] = {}
+        self.cprofile_text = None
+        self.allocations: List[Dict[str, Any]] = []
+        self.peak_memory_bytes = None
+
+    def stage(self, name: str):
+        """Close the current pipeline stage and start the next one"""
+        now = time.perf_counter()
+        if self.stages and self.stages[-1]["duration_s"] is None:
+            self.stages[-1]["duration_s"] = now - self.stages[-1]["start"]
+        if name is not None:
+            self.stages.append({"stage": name, "start": now, "duration_s": None})
+
+    def record(self, name: str, elapsed: float, self_time: float, allocated: int):
+        stats = self.functions.get(name)
+        if stats is None:
+            stats = self.functions[name] = {"calls": 0, "total_s": 0.0, "self_s": 0.0, "allocated_bytes": 0}
+        stats["calls"] += 1
+        stats["total_s"] += elapsed
+        stats["self_s"] += self_time
+        stats["allocated_bytes"] += allocated
+
+    def finish(self):
+        self.stage(None)
+        self.duration_s = time.perf_counter() - self.started
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "doc_id": self.doc_id,
+            "filename": self.filename,
+            "started_at": self.started_at,
+            "duration_s": self.duration_s,
+            "stages": [{"stage": stage["stage"], "duration_s": stage["duration_s"] or 0.0} for stage in self.stages],
+            "functions": {name: dict(stats) for name, stats in self.functions.items()},
+            "cprofile": self.cprofile_text,
+            "allocations": list(self.allocations),
+            "peak_memory_bytes": self.peak_memory_bytes
+        }
+
+class Profiler:
+    """Collects function timings, per-document profiles and rerun durations"""
+
+    def __init__(self, history: int = PROFILING_HISTORY):
+        self.lock = threading.Lock()
+        # Only one cProfile profiler can be active per process and tracemalloc snapshots cover
+        # every thread, so documents are captured one at a time
+        self.capture_lock = threading.Lock()
+        self.local = threading.local()
+        self.documents = deque(maxlen=history)
+        self.functions: Dict[str, Dict[str, float]] = {}
+        self.reruns = deque(maxlen=history * 10)
+        self.rerun_histograms: Dict[str, Histogram] = {}
+
+    def _stack(self) -> List[List[float]]:
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def wrap(self, func, name: str):
+        """Return func wrapped to record its inclusive and self time"""
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            stack = self._stack()
+            frame = [0.0]
+            stack.append(frame)
+            tracing = tracemalloc.is_tracing()
+            memory_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                allocated = max(0, tracemalloc.get_traced_memory()[0] - memory_before) if tracing else 0
+                stack.pop()
+                if stack:
+                    stack[-1][0] += elapsed
+                self._record(name, elapsed, elapsed - frame[0], allocated)
+
+        timed.__profiled__ = True
+        return timed
+
+    def _record(self, name: str, elapsed: float, self_time: float, allocated: int):
+        profile = getattr(self.local, "profile", None)
+        if profile is not None:
+            profile.record(name, elapsed, self_time, allocated)
+        with self.lock:
+            stats = self.functions.get(name)
+            if stats is None:
+                stats = self.functions[name] = {"calls": 0, "total_s": 0.0, "self_s": 0.0, "max_s": 0.0}
+            stats["calls"] += 1
+            stats["total_s"] += elapsed
+            stats["self_s"] += self_time
+            stats["max_s"] = max(stats["max_s"], elapsed)
+
+    @contextmanager
+    def document(self, doc_id: str, filename: str):
+        """
+        Collect a profile of the document processed inside the block on this thread
+
+        With cProfile or tracemalloc capture enabled, the block waits until no other
+        document is being captured, so concurrent jobs are processed one at a time.
+        """
+        capturing = PROFILING_CPROFILE or PROFILING_TRACEMALLOC
+        if capturing:
+            self.capture_lock.acquire()
+
+        profile = DocumentProfile(doc_id, filename)
+        self.local.profile = profile
+
+        profiler = None
+        snapshot = None
+        try:
+            if PROFILING_CPROFILE:
+                profiler = cProfile.Profile()
+                profiler.enable()
+            if PROFILING_TRACEMALLOC:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+                snapshot = tracemalloc.take_snapshot()
+        except Exception:
+            self.local.profile = None
+            if capturing:
+                self.capture_lock.release()
+            raise
+
+        try:
+            yield profile
+        finally:
+            self.local.profile = None
+            profile.finish()
+
+            try:
+                if profiler is not None:
+                    profiler.disable()
+                    output = io.StringIO()
+                    pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(CPROFILE_LINES)
+                    profile.cprofile_text = output.getvalue()
+                if snapshot is not None:
+                    profile.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+                    diff = tracemalloc.take_snapshot().compare_to(snapshot, "lineno")
+                    profile.allocations = [
+                        {"location": str(stat.traceback), "size_bytes": stat.size_diff, "count": stat.count_diff}
+                        for stat in diff[:TRACEMALLOC_TOP]
+                    ]
+            finally:
+                if capturing:
+                    self.capture_lock.release()
+
+            with self.lock:
+                self.documents.appendleft(profile.to_dict())
+
+    def stage(self, name: str):
+        """Mark the start of a pipeline stage of the document being profiled on this thread"""
+        profile = getattr(self.local, "profile", None)
+        if profile is not None:
+            profile.stage(name)
+
+    def record_rerun(self, page: str, duration_s: float):
+        with self.lock:
+            self.reruns.appendleft({"page": page, "duration_s": duration_s, "time": time.time()})
+            histogram = self.rerun_histograms.get(page)
+            if histogram is None:
+                histogram = self.rerun_histograms[page] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(duration_s)
+
+    def recent_documents(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            return list(self.documents)
+
+    def function_stats(self) -> Dict[str, Dict[str, float]]:
+        with self.lock:
+            return {name: dict(stats) for name, stats in self.functions.items()}
+
+    def rerun_stats(self) -> Dict[str, Dict[str, float]]:
+        """Rerun duration statistics per page"""
+        with self.lock:
+            return {
+                page: {
+                    "reruns": histogram.count,
+                    "mean_s": histogram.total / histogram.count if histogram.count else 0.0,
+                    "p95_s": histogram.percentile(95),
+                    "max_s": histogram.max
+                }
+                for page, histogram in self.rerun_histograms.items()
+            }
+
+    def recent_reruns(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            return list(self.reruns)
+
+_profiler = Profiler()
+
+def get_profiler() -> Profiler:
+    """Return the process-wide profiler"""
+    return _profiler
+
+def _should_instrument(module_name: str) -> bool:
+    if module_name in EXCLUDED_MODULES:
+        return False
+    return any(module_name == prefix or module_name.startswith(prefix) for prefix in INSTRUMENTED_PREFIXES)
+
+def instrument_module(module: ModuleType):
+    """Wrap the functions and methods defined in a module with timing"""
+    for attr_name, value in list(vars(module).items()):
+        if isinstance(value, FunctionType) and value.__module__ == module.__name__:
+            if not inspect.isgeneratorfunction(value) and not getattr(value, "__profiled__", False):
+                setattr(module, attr_name, _profiler.wrap(value, f"{module.__name__}.{value.__qualname__}"))
+        elif isinstance(value, type) and value.__module__ == module.__name__:
+            _instrument_class(value, module.__name__)
+
+def _instrument_class(cls: type, module_name: str):
+    for attr_name, value in list(vars(cls).items()):
+        if attr_name.startswith("__"):
+            continue
+        func = value.__func__ if isinstance(value, (staticmethod, classmethod)) else value
+        if not isinstance(func, FunctionType) or inspect.isgeneratorfunction(func) or getattr(func, "__profiled__", False):
+            continue
+        wrapped = _profiler.wrap(func, f"{module_name}.{func.__qualname__}")
+        if isinstance(value, staticmethod):
+            wrapped = staticmethod(wrapped)
+        elif isinstance(value, classmethod):
+            wrapped = classmethod(wrapped)
+        setattr(cls, attr_name, wrapped)
+
+class _InstrumentingFinder:
+    """Import hook that instruments matching modules as they are loaded"""
+
+    def find_spec(self, fullname, path, target=None):
+        if not _should_instrument(fullname):
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path, target)
+        if spec is None or spec.loader is None or not hasattr(spec.loader, "exec_module"):
+            return spec
+
+        exec_module = spec.loader.exec_module
+
+        def exec_and_instrument(module):
+            exec_module(module)
+            instrument_module(module)
+
+        spec.loader.exec_module = exec_and_instrument
+        return spec
+
+def install_profiling():
+    """
+    Instrument the document pipeline modules if PROFILING_ENABLED is set
+
+    Must run before those modules are imported; modules already imported are instrumented
+    in place, but references other modules took to their functions stay untimed.
+    """
+    if not PROFILING_ENABLED or any(isinstance(finder, _InstrumentingFinder) for finder in sys.meta_path):
+        return
+
+    sys.meta_path.insert(0, _InstrumentingFinder())
+    for name, module in list(sys.modules.items()):
+        if module is not None and _should_instrument(name):
+            instrument_module(module)
+
+@contextmanager
+def profile_document(doc_id: str, filename: str):
+    """Profile the processing of one document when profiling is enabled"""
+    if not PROFILING_ENABLED:
+        yield None
+        return
+    with _profiler.document(doc_id, filename) as profile:
+        yield profile
+
+def mark_stage(name: str):
+    """Mark the start of a pipeline stage in the current document profile"""
+    if PROFILING_ENABLED:
+        _profiler.stage(name)
+
+@contextmanager
+def time_rerun(page: str):
+    """Record how long a Streamlit script run for a page takes"""
+    if not PROFILING_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _profiler.record_rerun(page, time.perf_counter() - start)
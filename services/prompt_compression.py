@@ -0,0 +1,127 @@
+"""
+Prompt compression for document text sent to the LLM
+"""
+import re
+from typing import Dict, List, Any
+
+from services.token_counter import count_tokens
+
+# Everything after the attestation line is signatures, witnesses and stamps
+SIGNATURE_BLOCK_START = re.compile(
+    r"^\s*(in witness where(?:of|as)|signed,? sealed and delivered|executed (?:by|on) the parties)",
+    re.IGNORECASE
+)
+
+# Schedules and annexures after the signatures carry terms again
+ANNEXURE_START = re.compile(r"^\s*(schedule|annexure|appendix|exhibit)\b", re.IGNORECASE)
+
+# Single lines that carry no terms: rules, blanks to fill in, page furniture. Signature
+# field labels ("Name:", "Date:") are only dropped with the signature block, since the
+# same words can be headings elsewhere.
+BOILERPLATE_LINE_PATTERNS = [
+    re.compile(r"^\s*[_.\-=*]{3,}\s*$"),
+    re.compile(r"^\s*page\s+\d+(\s+of\s+\d+)?\s*$", re.IGNORECASE),
+    re.compile(r"^\s*-?\s*\d+\s*-?\s*$")
+]
+
+# Notice clauses: where to send notices, not what the parties agreed
+NOTICE_CLAUSE = re.compile(r"^\s*(\d+(\.\d+)*[.)]?\s*)?notices?\s*[.:\-]", re.IGNORECASE)
+NOTICE_DETAILS = re.compile(r"\b(address|e-?mail|registered post|courier|attention|attn)\b", re.IGNORECASE)
+
+# Table-of-contents dot leaders. Clause numbers like "12.3.1" are kept, since the text
+# refers to clauses by number.
+TOC_LEADER = re.compile(r"\s*\.{4,}\s*\d*\s*$")
+LIST_MARKER = re.compile(r"^\s*(\(?[a-z0-9]{1,4}[.)]|[-*•])\s+", re.IGNORECASE)
+
+def _normalize_for_comparison(paragraph: str) -> str:
+    """Normalize a paragraph so repeated clauses compare equal regardless of numbering and spacing"""
+    lines = [LIST_MARKER.sub("", line) for line in paragraph.splitlines()]
+    return re.sub(r"\s+", " ", " ".join(lines)).strip().lower()
+
+def _clean_line(line: str) -> str:
+    """Collapse whitespace runs, including the spacing after clause numbers, and dot leaders on a single line"""
+    line = re.sub(r"[ \t\u00a0]+", " ", line).strip()
+    return TOC_LEADER.sub("", line)
+
+def compress_prompt_text(text: str) -> Dict[str, Any]:
+    """
+    Shrink document text before it is put into a prompt
+
+    Removes the signature block (up to any schedule or annexure), rules and page furniture
+    lines, notice clauses and repeated paragraphs, and collapses whitespace and dot leaders.
+    Clause wording, headings and clause numbers are left untouched.
+
+    Args:
+        text: Document text
+
+    Returns:
+        Dictionary with the compressed 'text', 'tokens_before', 'tokens_after',
+        'duplicates_removed' and 'boilerplate_removed'
+    """
+    if not text:
+        return {
+            "text": text,
+            "tokens_before": 0,
+            "tokens_after": 0,
+            "duplicates_removed": 0,
+            "boilerplate_removed": 0
+        }
+
+    boilerplate_removed = 0
+    kept_lines = []
+    in_signature_block = False
+
+    for line in text.splitlines():
+        if SIGNATURE_BLOCK_START.match(line):
+            in_signature_block = True
+        elif in_signature_block and ANNEXURE_START.match(line):
+            in_signature_block = False
+
+        if in_signature_block:
+            if line.strip():
+                boilerplate_removed += 1
+            continue
+
+        if any(pattern.match(line) for pattern in BOILERPLATE_LINE_PATTERNS):
+            boilerplate_removed += 1
+            continue
+
+        kept_lines.append(_clean_line(line))
+
+    # Paragraphs are separated by blank lines
+    paragraphs = []
+    current = []
+    for line in kept_lines:
+        if line:
+            current.append(line)
+        elif current:
+            paragraphs.append("\n".join(current))
+            current = []
+    if current:
+        paragraphs.append("\n".join(current))
+
+    seen = set()
+    compressed: List[str] = []
+    duplicates_removed = 0
+
+    for paragraph in paragraphs:
+        if NOTICE_CLAUSE.match(paragraph) and NOTICE_DETAILS.search(paragraph):
+            boilerplate_removed += 1
+            continue
+
+        key = _normalize_for_comparison(paragraph)
+        if key in seen:
+            duplicates_removed += 1
+            continue
+        seen.add(key)
+        compressed.append(paragraph)
+
+    compressed_text = "\n\n".join(compressed)
+
+    return {
+        "text": compressed_text,
+        "tokens_before": count_tokens(text),
+        "tokens_after": count_tokens(compressed_text),
+        "duplicates_removed": duplicates_removed,
+        "boilerplate_removed": boilerplate_removed
+    }
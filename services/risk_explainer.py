@@ -0,0 +1,135 @@
+"""
+Batched plain-language explanations for risky clauses
+"""
+import hashlib
+import re
+from typing import Dict, List, Any, Optional
+
+from config.config import RISK_EXPLAINER_BATCH_TOKENS, RISK_EXPLAINER_CACHE_SIZE, RISK_EXPLAINER_CLAUSE_TOKENS
+from services.token_counter import count_tokens, get_token_counter
+from utils.lru_cache import LRUCache
+
+# Tokens of clause id and risk type added to each clause in a request
+CLAUSE_OVERHEAD_TOKENS = 10
+
+def clause_hash(text: str, risk_type: str) -> str:
+    """
+    Stable hash of a clause, insensitive to case and whitespace differences
+
+    Args:
+        text: Clause text
+        risk_type: Detected risk type
+
+    Returns:
+        Hex digest identifying the clause
+    """
+    normalized = re.sub(r"\s+", " ", text).strip().lower()
+    return hashlib.sha1(f"{risk_type}\x00{normalized}".encode("utf-8")).hexdigest()
+
+# Clause hash -> explanation. Identical boilerplate clauses recur across contracts, so the
+# cache is process-wide.
+_explanation_cache = LRUCache(RISK_EXPLAINER_CACHE_SIZE)
+
+class RiskExplainer:
+    """Explains risky clauses by packing many of them into each LLM request"""
+
+    def __init__(
+        self,
+        service=None,
+        batch_token_budget: int = RISK_EXPLAINER_BATCH_TOKENS,
+        cache: Optional[LRUCache] = None,
+        clause_token_budget: int = RISK_EXPLAINER_CLAUSE_TOKENS
+    ):
+        """
+        Initialize the explainer
+
+        Args:
+            service: GroupQService used for the requests (defaults to the process-wide service)
+            batch_token_budget: Approximate prompt tokens allowed per request
+            cache: Explanation cache (defaults to the process-wide cache)
+            clause_token_budget: Tokens of clause text sent per clause; longer clauses are cut
+        """
+        if service is None:
+            from services.shared_resources import get_groupq_service
+            service = get_groupq_service()
+
+        self.service = service
+        self.batch_token_budget = batch_token_budget
+        # A clause always fits a batch of its own, so oversized clauses are still explained
+        self.clause_token_budget = max(1, min(clause_token_budget, batch_token_budget - CLAUSE_OVERHEAD_TOKENS))
+        self.cache = cache if cache is not None else _explanation_cache
+
+    def get_cached(self, clause: Dict[str, Any]) -> Optional[str]:
+        """Return the cached explanation for a clause, if any"""
+        return self.cache.get(clause_hash(clause.get("text", ""), clause.get("risk_type", "unknown")))
+
+    def _make_batches(self, pending: List[Dict[str, str]]) -> List[List[Dict[str, str]]]:
+        """Pack pending clauses into batches that fit the token budget"""
+        batches = []
+        current = []
+        current_tokens = 0
+
+        for item in pending:
+            item_tokens = count_tokens(item["text"]) + CLAUSE_OVERHEAD_TOKENS
+            if current and current_tokens + item_tokens > self.batch_token_budget:
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(item)
+            current_tokens += item_tokens
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def explain(self, clauses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Explain a list of risky clauses, reusing cached explanations
+
+        Args:
+            clauses: Risky clause dicts with 'text' and 'risk_type'
+
+        Returns:
+            Dict with 'explanations' (clause hash -> explanation), 'requests' made and 'errors'
+        """
+        explanations = {}
+        pending = {}
+        counter = get_token_counter()
+
+        for clause in clauses:
+            key = clause_hash(clause.get("text", ""), clause.get("risk_type", "unknown"))
+            cached = self.cache.get(key)
+            if cached is not None:
+                explanations[key] = cached
+            elif key not in pending:
+                pending[key] = {
+                    "id": f"c{len(pending) + 1}",
+                    "risk_type": clause.get("risk_type", "unknown"),
+                    # The cache key stays the hash of the full clause
+                    "text": counter.truncate(clause.get("text", ""), self.clause_token_budget)
+                }
+
+        # Map the short per-request ids back to clause hashes
+        id_to_key = {item["id"]: key for key, item in pending.items()}
+        requests_made = 0
+        errors = []
+
+        for batch in self._make_batches(list(pending.values())):
+            result = self.service.explain_risky_clauses(batch)
+            requests_made += 1
+
+            if "error" in result:
+                errors.append(result["error"])
+                continue
+
+            for clause_id, explanation in result.items():
+                key = id_to_key.get(clause_id)
+                if key and explanation:
+                    explanations[key] = explanation
+                    self.cache.put(key, explanation)
+
+        return {
+            "explanations": explanations,
+            "requests": requests_made,
+            "errors": errors
+        }
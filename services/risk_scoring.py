@@ -1,9 +1,10 @@
 """
 Risk scoring service for legal documents
 """
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Union
 import json
 import os
+from models.clause_set import ClauseSet, as_clause_set
 from config.config import (
     RISK_THRESHOLD_LOW,
     RISK_THRESHOLD_MEDIUM,
@@ -76,12 +77,12 @@ def load_risk_keywords():
         print(f"Error loading risk keywords: {e}")
         return {}
 
-def calculate_risk_score(risky_clauses: List[Dict[str, Any]]) -> Tuple[float, str]:
+def calculate_risk_score(risky_clauses: Union[ClauseSet, List[Dict[str, Any]]]) -> Tuple[float, str]:
     """
     Calculate risk score based on detected risky clauses
     
     Args:
-        risky_clauses: List of detected risky clauses
+        risky_clauses: ClauseSet or list of detected risky clauses
         
     Returns:
         Tuple of (risk_score, risk_level)
@@ -89,15 +90,9 @@ def calculate_risk_score(risky_clauses: List[Dict[str, Any]]) -> Tuple[float, st
     if not risky_clauses:
         return 0.0, "low"
     
-    total_risk_weight = 0.0
-    
     # Calculate weighted risk score
-    for clause in risky_clauses:
-        risk_type = clause.get("risk_type")
-        risk_weight = RISK_WEIGHTS.get(risk_type, 0.5)  # Default weight of 0.5
-        confidence = clause.get("confidence", 1.0)
-        
-        total_risk_weight += risk_weight * confidence
+    risky_clauses = as_clause_set(risky_clauses)
+    total_risk_weight = risky_clauses.weighted_confidence(RISK_WEIGHTS, 0.5)  # Default weight of 0.5
     
     # Normalize risk score (0.0 to 1.0)
     # We'll use a sigmoid-like function to ensure score is between 0 and 1
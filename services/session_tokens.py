@@ -0,0 +1,83 @@
+"""
+Signed, expiring session resume tokens for the Legal AI Platform
+"""
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from typing import Optional
+
+from config.config import SESSION_SECRET, SESSION_SECRET_PATH, SESSION_TOKEN_TTL_HOURS
+
+_secret = None
+_secret_lock = threading.Lock()
+
+def _load_secret() -> bytes:
+    """Return the signing key: SESSION_SECRET, or a random key generated once and kept on disk"""
+    global _secret
+    if _secret is None:
+        with _secret_lock:
+            if _secret is None:
+                if SESSION_SECRET:
+                    _secret = SESSION_SECRET.encode("utf-8")
+                else:
+                    _secret = _read_or_create_secret_file(SESSION_SECRET_PATH)
+    return _secret
+
+def _read_or_create_secret_file(path: str) -> bytes:
+    try:
+        # Readable by the server's user only; another process may create it first
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path, "rb") as f:
+            return f.read().strip()
+    secret = secrets.token_hex(32).encode("ascii")
+    with os.fdopen(fd, "wb") as f:
+        f.write(secret)
+    return secret
+
+def _sign(payload: str) -> str:
+    digest = hmac.new(_load_secret(), payload.encode("utf-8"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+def issue_session_token(session_id: str, now: Optional[float] = None) -> str:
+    """
+    Create a token that reopens a session until it expires
+
+    Args:
+        session_id: Session ID owning the documents
+        now: Current time (defaults to time.time())
+
+    Returns:
+        Token of the form "<session id>.<expiry>.<signature>"
+    """
+    expires = int((now if now is not None else time.time()) + SESSION_TOKEN_TTL_HOURS * 3600)
+    payload = f"{session_id}.{expires}"
+    return f"{payload}.{_sign(payload)}"
+
+def verify_session_token(token: Optional[str], now: Optional[float] = None) -> Optional[str]:
+    """
+    Return the session ID of a valid, unexpired token
+
+    Args:
+        token: Token from issue_session_token()
+        now: Current time (defaults to time.time())
+
+    Returns:
+        Session ID, or None if the token is missing, altered or expired
+    """
+    if not token:
+        return None
+    try:
+        session_id, expires, signature = token.rsplit(".", 2)
+        expires = int(expires)
+    except ValueError:
+        return None
+    if not hmac.compare_digest(signature, _sign(f"{session_id}.{expires}")):
+        return None
+    if expires < (now if now is not None else time.time()):
+        return None
+    return session_id
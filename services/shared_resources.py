@@ -0,0 +1,149 @@
+"""
+Process-wide shared resources for the Legal AI Platform
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from config.config import LLM_HTTP_POOL_SIZE
+
+class SharedResource:
+    """An expensive object built once per server process and shared by all sessions"""
+
+    def __init__(self, name: str, build: Callable[[], Any], version: Optional[Callable[[], Any]] = None):
+        """
+        Initialize the resource
+
+        Args:
+            name: Resource name shown in warm-up timings
+            build: Builds the object; called at most once per version
+            version: Returns a token that changes when the object must be rebuilt
+                (e.g. the dictionaries version); the object is built once if omitted
+        """
+        self.name = name
+        self.build = build
+        self.version = version
+        self.lock = threading.Lock()
+        self.value = None
+        self.built_version = None
+        self.built = False
+        self.build_seconds = None
+        self.builds = 0
+
+    def get(self) -> Any:
+        """Return the object, building it on first use or when its version changed"""
+        version = self.version() if self.version is not None else None
+        if not self.built or version != self.built_version:
+            with self.lock:
+                # Sessions that arrive while another one builds wait for it instead of building again
+                if not self.built or version != self.built_version:
+                    start = time.perf_counter()
+                    value = self.build()
+                    self.build_seconds = time.perf_counter() - start
+                    self.value = value
+                    self.built_version = version
+                    self.built = True
+                    self.builds += 1
+        return self.value
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "built": self.built, "builds": self.builds, "build_seconds": self.build_seconds}
+
+def _dictionaries_version() -> tuple:
+    from services.document_record import dictionaries_version
+
+    return dictionaries_version()
+
+def _build_http_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    # Keep-alive connections to the LLM backends, sized for parallel guide sections and chunks
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=LLM_HTTP_POOL_SIZE, pool_maxsize=LLM_HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _build_groupq_service():
+    from services.groupq_service import GroupQService
+
+    return GroupQService()
+
+def _build_risk_matcher():
+    from models.risk_detection import RiskMatcher
+    from services.risk_scoring import load_risk_keywords
+
+    return RiskMatcher(load_risk_keywords())
+
+def _build_jargon_simplifier():
+    from models.simplification import JargonSimplifier, load_legal_terms
+
+    return JargonSimplifier(load_legal_terms())
+
+def _build_sentence_tokenizer() -> bool:
+    from utils.document_utils import ensure_nltk_tokenizer, split_into_sentences
+
+    # The first call loads the tokenizer model, which NLTK then keeps in memory
+    available = ensure_nltk_tokenizer()
+    split_into_sentences("Warm up the tokenizer. It is loaded once.")
+    return available
+
+def _build_guide_cache():
+    from services.groupq_service import GuideCache
+
+    return GuideCache()
+
+_http_session = SharedResource("http_session", _build_http_session)
+_groupq_service = SharedResource("groupq_service", _build_groupq_service)
+_risk_matcher = SharedResource("risk_matcher", _build_risk_matcher, version=_dictionaries_version)
+_jargon_simplifier = SharedResource("jargon_simplifier", _build_jargon_simplifier, version=_dictionaries_version)
+_sentence_tokenizer = SharedResource("sentence_tokenizer", _build_sentence_tokenizer)
+_guide_cache = SharedResource("guide_cache", _build_guide_cache)
+
+# Built by warm_up(), in this order
+RESOURCES = [_http_session, _groupq_service, _risk_matcher, _jargon_simplifier, _sentence_tokenizer, _guide_cache]
+
+def get_http_session():
+    """Return the process-wide requests session whose connection pool all LLM calls share"""
+    return _http_session.get()
+
+def get_groupq_service():
+    """Return the process-wide GroupQService (it keeps no per-session state)"""
+    return _groupq_service.get()
+
+def get_risk_matcher():
+    """Return the risk keyword matcher for the current dictionaries"""
+    return _risk_matcher.get()
+
+def get_jargon_simplifier():
+    """Return the jargon simplifier for the current dictionaries"""
+    return _jargon_simplifier.get()
+
+def get_sentence_tokenizer_available() -> bool:
+    """Return whether NLTK's sentence tokenizer is loaded (otherwise a regular expression is used)"""
+    return _sentence_tokenizer.get()
+
+def get_guide_cache():
+    """Return the process-wide cache of generated legal guides"""
+    return _guide_cache.get()
+
+def warm_up() -> Dict[str, float]:
+    """
+    Build every shared resource that is not built yet
+
+    Returns:
+        Resource name -> seconds spent building it
+    """
+    timings = {}
+    for resource in RESOURCES:
+        try:
+            resource.get()
+            timings[resource.name] = resource.build_seconds or 0.0
+        except Exception as e:
+            print(f"Error warming up {resource.name}: {e}")
+    return timings
+
+def resource_stats() -> List[Dict[str, Any]]:
+    """Return build statistics for every shared resource"""
+    return [resource.stats() for resource in RESOURCES]
@@ -0,0 +1,176 @@
+"""
+Local token counting for LLM prompts, calibrated against the API's reported usage
+"""
+import math
+import re
+import threading
+from typing import Dict, List, Optional
+
+# Words, numbers and individual punctuation marks
+TOKEN_PIECE = re.compile(r"\w+|[^\w\s]")
+
+# Per-message overhead of the chat format (role markers) and the reply primer
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_OVERHEAD_TOKENS = 3
+
+# Weight of the newest sample in a model's calibration ratio, and the range it is kept in
+CALIBRATION_ALPHA = 0.2
+CALIBRATION_MIN = 0.5
+CALIBRATION_MAX = 2.0
+
+SENTENCE_END = re.compile(r"(?<=[.;:!?])\s+")
+
+def raw_token_count(text: str) -> int:
+    """
+    Uncalibrated token count approximating a BPE tokenizer
+
+    Each word or punctuation mark is one token; long words and non-Latin script are split
+    into several, as subword tokenizers do.
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Estimated number of tokens
+    """
+    count = 0
+    for piece in TOKEN_PIECE.findall(text):
+        if piece.isascii():
+            count += 1 + (len(piece) - 1) // 8
+        else:
+            count += 1 + len(piece) // 2
+    return count
+
+def raw_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Uncalibrated token count for a list of chat messages"""
+    return sum(
+        raw_token_count(str(message.get("content", ""))) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    ) + REPLY_OVERHEAD_TOKENS
+
+class TokenCounter:
+    """Token estimator whose per-model correction factor is learned from API usage figures"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ratios = {}
+
+    def ratio(self, model: Optional[str] = None) -> float:
+        """Return the correction factor for a model (the average of known models if unseen)"""
+        with self.lock:
+            if model in self.ratios:
+                return self.ratios[model]
+            if self.ratios:
+                return sum(self.ratios.values()) / len(self.ratios)
+            return 1.0
+
+    def calibrate(self, model: str, estimated: int, actual: int):
+        """
+        Fold a measured prompt size into the model's correction factor
+
+        Args:
+            model: Model that served the request
+            estimated: Uncalibrated estimate of the prompt (raw_message_tokens)
+            actual: prompt_tokens reported by the API
+        """
+        if not model or estimated <= 0 or actual <= 0:
+            return
+
+        sample = min(CALIBRATION_MAX, max(CALIBRATION_MIN, actual / estimated))
+        with self.lock:
+            previous = self.ratios.get(model)
+            if previous is None:
+                self.ratios[model] = sample
+            else:
+                self.ratios[model] = (1 - CALIBRATION_ALPHA) * previous + CALIBRATION_ALPHA * sample
+
+    def count(self, text: str, model: Optional[str] = None) -> int:
+        """Estimate the tokens in a text"""
+        return math.ceil(raw_token_count(text) * self.ratio(model))
+
+    def count_messages(self, messages: List[Dict[str, str]], model: Optional[str] = None) -> int:
+        """Estimate the prompt tokens of a list of chat messages"""
+        return math.ceil(raw_message_tokens(messages) * self.ratio(model))
+
+    def truncate(self, text: str, max_tokens: int, model: Optional[str] = None) -> str:
+        """
+        Cut a text down to at most max_tokens, at a word boundary
+
+        Args:
+            text: Text to truncate
+            max_tokens: Token limit
+            model: Model whose calibration to use
+
+        Returns:
+            The text, or its longest prefix that fits
+        """
+        tokens = self.count(text, model)
+        if tokens <= max_tokens:
+            return text
+        if max_tokens <= 0:
+            return ""
+
+        # Start from the proportional cut and shrink until it fits
+        end = int(len(text) * max_tokens / tokens)
+        while end > 0:
+            boundary = text.rfind(" ", 0, end)
+            candidate = text[:boundary if boundary > end // 2 else end].rstrip()
+            if self.count(candidate, model) <= max_tokens:
+                return candidate
+            end = int(end * 0.9)
+        return ""
+
+    def split(self, text: str, max_tokens: int, model: Optional[str] = None) -> List[str]:
+        """
+        Split a text into chunks of at most max_tokens, keeping paragraphs and sentences whole where possible
+
+        Args:
+            text: Text to split
+            max_tokens: Token limit per chunk
+            model: Model whose calibration to use
+
+        Returns:
+            List of chunks in document order
+        """
+        pieces = []
+        for paragraph in re.split(r"\n\s*\n", text):
+            if not paragraph.strip():
+                continue
+            if self.count(paragraph, model) <= max_tokens:
+                pieces.append(paragraph)
+                continue
+            for sentence in SENTENCE_END.split(paragraph):
+                while sentence:
+                    head = self.truncate(sentence, max_tokens, model) or sentence[:max(1, max_tokens)]
+                    pieces.append(head)
+                    sentence = sentence[len(head):].strip()
+
+        chunks = []
+        current = []
+        current_tokens = 0
+        for piece in pieces:
+            piece_tokens = self.count(piece, model)
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append("\n\n".join(current))
+                current = []
+                current_tokens = 0
+            current.append(piece)
+            current_tokens += piece_tokens
+
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
+
+_counter = TokenCounter()
+
+def get_token_counter() -> TokenCounter:
+    """Return the process-wide token counter, so calibration is shared"""
+    return _counter
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Estimate the tokens in a text with the process-wide counter"""
+    return _counter.count(text, model)
+
+def count_message_tokens(messages: List[Dict[str, str]], model: Optional[str] = None) -> int:
+    """Estimate the prompt tokens of chat messages with the process-wide counter"""
+    return _counter.count_messages(messages, model)
@@ -0,0 +1,31 @@
+"""
+Test configuration for the Legal AI Platform
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the tests' documents, cached results, LLM call logs and session key out of the app's files
+_test_dir = tempfile.mkdtemp(prefix="legal_ai_tests_")
+os.environ["DOCUMENT_STORE_PATH"] = os.path.join(_test_dir, "documents.db")
+os.environ["LLM_TELEMETRY_LOG"] = os.path.join(_test_dir, "llm_calls.jsonl")
+os.environ.setdefault("NLTK_DOWNLOAD_ENABLED", "false")
+os.environ["SESSION_SECRET"] = "test-session-secret"
+
+# Config is read on import, so services are imported after the environment is set
+from services.token_counter import get_token_counter
+
+@pytest.fixture(autouse=True)
+def reset_token_calibration():
+    """Calls against mock servers calibrate the shared token counter; start every test uncalibrated"""
+    counter = get_token_counter()
+    with counter.lock:
+        counter.ratios.clear()
+    yield
+    with counter.lock:
+        counter.ratios.clear()
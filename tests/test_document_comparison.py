@@ -0,0 +1,132 @@
+"""
+Tests for clause-level document comparison
+"""
+import random
+import time
+
+from benchmarks.synthetic_contracts import generate_contract
+from services.document_comparison import compare_texts, risk_delta
+from services.risk_scoring import load_risk_keywords
+
+RISK_KEYWORDS = {
+    "indemnity": ["indemnify"],
+    "termination": ["terminate"],
+    "liability": ["unlimited liability"]
+}
+
+def test_identical_clauses_align_despite_numbering_case_and_punctuation():
+    old = "1.1 The Tenant shall pay rent monthly; 1.2 The Landlord shall repair the roof."
+    new = "(a) the tenant shall pay rent, monthly; (b) THE LANDLORD SHALL REPAIR THE ROOF"
+
+    result = compare_texts(old, new, RISK_KEYWORDS)
+
+    assert result["unchanged"] == 2
+    assert result["added"] == result["removed"] == result["changed"] == []
+    assert result["similarity"] == 1.0
+
+def test_reordered_clauses_are_unchanged():
+    old = "The Tenant shall pay rent monthly; The Landlord shall repair the roof"
+    new = "The Landlord shall repair the roof; The Tenant shall pay rent monthly"
+
+    result = compare_texts(old, new, RISK_KEYWORDS)
+
+    assert result["unchanged"] == 2
+    assert result["changed"] == []
+
+def test_duplicate_clauses_match_one_occurrence_each():
+    clause = "The Tenant shall indemnify the Landlord"
+    other = "The Landlord shall repair the roof"
+
+    removed_copy = compare_texts(f"{clause}; {other}; {clause}", f"{clause}; {other}", RISK_KEYWORDS)
+    assert removed_copy["unchanged"] == 2
+    assert removed_copy["removed"] == [{"text": clause, "risk_type": "indemnity"}]
+    assert removed_copy["added"] == []
+
+    added_copies = compare_texts(f"{clause}; {other}", f"{clause}; {clause}; {other}; {clause}", RISK_KEYWORDS)
+    assert added_copies["unchanged"] == 2
+    assert added_copies["added"] == [{"text": clause, "risk_type": "indemnity"}] * 2
+    assert added_copies["removed"] == []
+
+def test_edited_clause_is_paired_with_its_word_changes():
+    old = "The Tenant shall pay rent of ten thousand rupees on the first day of every month"
+    new = "The Tenant shall pay rent of twelve thousand rupees on the first day of every month"
+
+    result = compare_texts(old, new, RISK_KEYWORDS)
+
+    assert result["unchanged"] == 0
+    assert result["added"] == result["removed"] == []
+    [changed] = result["changed"]
+    assert changed["old_text"] == old
+    assert changed["new_text"] == new
+    assert 0.6 <= changed["similarity"] < 1.0
+    assert changed["changes"] == [{"op": "replace", "old": "ten", "new": "twelve"}]
+
+def test_dissimilar_clauses_are_added_and_removed_not_changed():
+    old = "The Tenant shall pay rent of ten thousand rupees on the first day of every month"
+    new = "Either party may terminate this agreement with thirty days written notice"
+
+    result = compare_texts(old, new, RISK_KEYWORDS)
+
+    assert result["changed"] == []
+    assert result["removed"] == [{"text": old, "risk_type": None}]
+    assert result["added"] == [{"text": new, "risk_type": "termination"}]
+
+def test_edited_clause_is_paired_with_the_most_similar_old_clause():
+    close = "The Supplier shall deliver the goods to the Buyer within thirty days of the order date"
+    distant = "The Supplier shall deliver the invoices to the Buyer within ninety business days of the month end"
+    new = "The Supplier shall deliver the goods to the Buyer within forty days of the order date"
+
+    result = compare_texts(f"{distant}; {close}", new, RISK_KEYWORDS)
+
+    [changed] = result["changed"]
+    assert changed["old_text"] == close
+    assert result["removed"] == [{"text": distant, "risk_type": None}]
+
+def test_risk_delta_counts_risk_types_of_added_removed_and_changed_clauses():
+    comparison = {
+        "added": [{"text": "a", "risk_type": "indemnity"}, {"text": "b", "risk_type": None}],
+        "removed": [{"text": "c", "risk_type": "termination"}],
+        "changed": [
+            {"old_risk_type": None, "new_risk_type": "liability"},
+            {"old_risk_type": "indemnity", "new_risk_type": "indemnity"},
+            {"old_risk_type": "termination", "new_risk_type": None}
+        ]
+    }
+    old_doc = {"risk_score": 0.25, "risk_level": "low"}
+    new_doc = {"risk_score": 0.75, "risk_level": "high"}
+
+    delta = risk_delta(old_doc, new_doc, comparison)
+
+    assert delta["score"] == 0.5
+    assert (delta["old_level"], delta["new_level"]) == ("low", "high")
+    assert delta["by_type"] == {"indemnity": 1, "termination": -2, "liability": 1}
+
+def test_risk_delta_of_identical_documents_is_empty():
+    doc = {"risk_score": 0.4, "risk_level": "medium"}
+    comparison = compare_texts("The Tenant shall indemnify the Landlord", "The Tenant shall indemnify the Landlord", RISK_KEYWORDS)
+
+    delta = risk_delta(doc, doc, comparison)
+
+    assert delta["score"] == 0
+    assert delta["by_type"] == {}
+
+def test_hundred_page_drafts_compare_well_under_a_second():
+    # Two ~100-page drafts: the second rewords, drops and adds clauses
+    old_text = generate_contract(300000, seed=1)
+    rng = random.Random(0)
+    paragraphs = old_text.split("\n\n")
+    for i in rng.sample(range(len(paragraphs)), 40):
+        paragraphs[i] = paragraphs[i].replace(" shall ", " must ", 1)
+    for i in sorted(rng.sample(range(len(paragraphs)), 20), reverse=True):
+        del paragraphs[i]
+    paragraphs.insert(len(paragraphs) // 2, "The Licensee shall indemnify the Company against all third party claims.")
+    new_text = "\n\n".join(paragraphs)
+    risk_keywords = load_risk_keywords()
+
+    start = time.perf_counter()
+    result = compare_texts(old_text, new_text, risk_keywords)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.0
+    assert result["changed"]
+    assert result["unchanged"] > len(result["changed"])
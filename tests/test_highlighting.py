@@ -0,0 +1,81 @@
+"""
+Tests for risky clause highlighting and pagination
+"""
+from utils.visualization import highlight_risky_text, merge_risky_spans, paginate_text
+
+def clause(start, end, risk_type="indemnity", confidence=0.5):
+    return {"risk_type": risk_type, "start_index": start, "end_index": end, "confidence": confidence}
+
+def spans(risky_clauses, text_length=None):
+    return [(s["start"], s["end"], s["risk_level"], s["risk_types"]) for s in merge_risky_spans(risky_clauses, text_length)]
+
+def test_overlapping_spans_are_merged_with_the_highest_level():
+    clauses = [clause(10, 30, "indemnity", 0.5), clause(0, 15, "termination", 0.9), clause(40, 50, "liability", 0.3)]
+
+    assert spans(clauses) == [
+        (0, 30, "high", ["termination", "indemnity"]),
+        (40, 50, "low", ["liability"])
+    ]
+
+def test_nested_spans_merge_into_the_outer_span():
+    clauses = [clause(0, 100, "indemnity", 0.3), clause(20, 40, "termination", 0.6), clause(20, 40, "indemnity", 0.8)]
+
+    assert spans(clauses) == [(0, 100, "high", ["indemnity", "termination"])]
+
+def test_adjacent_spans_stay_separate():
+    assert spans([clause(0, 10), clause(10, 20)]) == [(0, 10, "medium", ["indemnity"]), (10, 20, "medium", ["indemnity"])]
+
+def test_spans_are_clipped_to_the_text_length():
+    clauses = [clause(5, 500), clause(200, 300), clause(-5, 3)]
+
+    assert spans(clauses, text_length=100) == [(0, 3, "medium", ["indemnity"]), (5, 100, "medium", ["indemnity"])]
+
+def test_inverted_and_empty_offsets_are_skipped():
+    assert spans([clause(30, 10), clause(5, 5), clause(40, 45)]) == [(40, 45, "medium", ["indemnity"])]
+
+def test_no_clauses_give_no_spans():
+    assert merge_risky_spans([], 100) == []
+
+def test_highlighting_escapes_text_and_risk_types():
+    text = "<b>Fees</b> & <script>alert(1)</script> are payable."
+    html = highlight_risky_text(text, [clause(14, 39, "a'b<c>")])
+
+    assert "<script>" not in html and "<b>" not in html
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in html
+    assert "&lt;b&gt;Fees&lt;/b&gt; &amp; " in html
+    assert "title='a&#x27;b&lt;c&gt;'" in html
+
+def test_highlighting_renders_only_the_window():
+    text = "aaaa bbbb cccc dddd"
+    html = highlight_risky_text(text, [clause(0, 9, confidence=0.9), clause(15, 19, confidence=0.9)], start=5, end=15)
+
+    assert html == (
+        "<div style='white-space: pre-wrap;'>"
+        "<span style='background-color: #FECACA; padding: 2px; border-radius: 3px;' title='indemnity'>bbbb</span>"
+        " cccc "
+        "</div>"
+    )
+
+def test_short_text_is_one_page():
+    assert paginate_text("Short text.", page_chars=100) == [(0, 11)]
+    assert paginate_text("", page_chars=100) == [(0, 0)]
+
+def test_pages_end_after_the_last_sentence_that_fits():
+    text = "One two. Three four. Five six seven eight nine ten."
+    pages = paginate_text(text, page_chars=25)
+
+    assert [text[start:end] for start, end in pages] == ["One two. Three four. ", "Five six seven eight ", "nine ten."]
+
+def test_pages_without_spaces_are_cut_at_the_limit():
+    text = "x" * 25
+
+    assert paginate_text(text, page_chars=10) == [(0, 10), (10, 20), (20, 25)]
+
+def test_pages_cover_the_text_exactly():
+    text = " ".join(f"Clause {i} binds the parties." for i in range(500))
+    pages = paginate_text(text, page_chars=1000)
+
+    assert pages[0][0] == 0 and pages[-1][1] == len(text)
+    assert all(prev_end == start for (_, prev_end), (start, _) in zip(pages, pages[1:]))
+    assert all(0 < end - start <= 1000 for start, end in pages)
+    assert "".join(text[start:end] for start, end in pages) == text
@@ -0,0 +1,83 @@
+"""
+Tests for incremental risk detection and simplification
+"""
+import re
+
+import pytest
+
+from benchmarks.synthetic_contracts import generate_contract
+from models.risk_detection import detect_risky_clauses
+from services.document_record import dictionaries_version
+from services.incremental_analysis import detect_risky_clauses_incremental, simplify_text_incremental
+from services.risk_scoring import calculate_risk_score, load_risk_keywords
+from utils.document_utils import preprocess_text
+
+def baseline_detect_risky_clauses(text):
+    """The original detector: every blank-line separated paragraph matched as a whole"""
+    risk_keywords = load_risk_keywords()
+    risky_clauses = []
+    seen_indices = set()
+    current_pos = 0
+    for paragraph in text.split("\n\n"):
+        if paragraph.strip():
+            for risk_type, keywords in risk_keywords.items():
+                for keyword in keywords:
+                    if keyword.lower() in paragraph.lower():
+                        matches = re.findall(re.escape(keyword.lower()), paragraph.lower())
+                        span = (current_pos, current_pos + len(paragraph))
+                        if span not in seen_indices:
+                            seen_indices.add(span)
+                            risky_clauses.append({
+                                "risk_type": risk_type,
+                                "start_index": span[0],
+                                "end_index": span[1],
+                                "confidence": min(0.9, 0.5 + 0.2 * len(matches))
+                            })
+                        break
+        current_pos += len(paragraph) + 2
+    return risky_clauses
+
+def clause_tuples(clauses):
+    return [(c["risk_type"], c["start_index"], c["end_index"], round(c["confidence"], 6)) for c in clauses]
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("preprocessed", [True, False])
+def test_detection_matches_baseline(seed, preprocessed):
+    text = generate_contract(50000, seed=seed)
+    if preprocessed:
+        text = preprocess_text(text)
+    expected = baseline_detect_risky_clauses(text)
+
+    detected = detect_risky_clauses(text)
+    # Run twice: once filling the chunk cache, once reading from it
+    incremental = [detect_risky_clauses_incremental(text, dictionaries_version()) for _ in range(2)]
+
+    for clauses in [detected] + incremental:
+        assert clause_tuples(clauses) == clause_tuples(expected)
+        assert calculate_risk_score(clauses) == calculate_risk_score(expected)
+
+def test_preprocessed_text_is_one_paragraph():
+    text = preprocess_text(generate_contract(50000))
+    clauses = detect_risky_clauses_incremental(text, dictionaries_version())
+    assert [(c["start_index"], c["end_index"]) for c in clauses] == [(0, len(text))]
+
+def test_edited_contract_matches_baseline():
+    text = preprocess_text(generate_contract(50000))
+    detect_risky_clauses_incremental(text, dictionaries_version())
+    edited = text.replace("shall deliver", "may deliver at its sole discretion", 1)
+
+    assert clause_tuples(detect_risky_clauses_incremental(edited, dictionaries_version())) == \
+        clause_tuples(baseline_detect_risky_clauses(edited))
+
+def test_simplification_keeps_paragraph_breaks():
+    text = (
+        "The Contractor shall indemnify the Company. Payment is due within thirty days.\n\n"
+        "This Agreement shall be governed by the laws of New York.\n\n\n\n"
+        "Either party may terminate this Agreement upon notice."
+    )
+    simplified = simplify_text_incremental(text, dictionaries_version())
+
+    paragraphs = simplified.split("\n\n")
+    assert len(paragraphs) == 4
+    assert paragraphs[2] == ""
+    assert all(paragraph.strip() for index, paragraph in enumerate(paragraphs) if index != 2)
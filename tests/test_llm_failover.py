@@ -0,0 +1,148 @@
+"""
+Tests for LLM backend failover against local mock servers
+"""
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from benchmarks.mock_groq_server import MockServerConfig, start_mock_server
+from services.groupq_service import GroupQService
+from services.llm_backends import FAILOVER_ERRORS, build_router, classify_request_error
+
+MESSAGES = [{"role": "user", "content": "Summarize the indemnity clause."}]
+
+def mock_config(**overrides) -> MockServerConfig:
+    options = dict(latency="fixed", latency_mean=0.0, token_latency=0.0, completion_tokens=20)
+    options.update(overrides)
+    return MockServerConfig(**options)
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(config: MockServerConfig):
+        server = start_mock_server(config)
+        started.append(server)
+        return server
+
+    yield start
+    for server in started:
+        server.shutdown()
+        server.server_close()
+
+def refused_url() -> str:
+    """URL of a local port with nothing listening on it"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}/openai/v1/chat/completions"
+
+def make_service(primary_url: str, secondary_url: str) -> GroupQService:
+    """A service routing every feature to the primary backend, then the secondary"""
+    service = GroupQService(api_url=secondary_url)
+    service.router = build_router(
+        {
+            "primary": {"url": primary_url, "model": "primary-model", "requires_api_key": False},
+            "secondary": {"url": secondary_url, "model": "secondary-model", "requires_api_key": False}
+        },
+        {"default": ["primary", "secondary"]}
+    )
+    service.max_retries = 0
+    return service
+
+def stats(server) -> dict:
+    return server.mock_stats.snapshot()
+
+def primary_url(servers, failure: str) -> tuple:
+    if failure == "refused":
+        return refused_url(), None
+    config = mock_config(error_5xx_rate=1.0) if failure == "5xx" else mock_config(error_429_rate=1.0)
+    server = servers(config)
+    return server.chat_url, server
+
+@pytest.mark.parametrize("failure", ["5xx", "429", "refused"])
+def test_plain_request_fails_over(servers, failure):
+    url, primary = primary_url(servers, failure)
+    secondary = servers(mock_config())
+    service = make_service(url, secondary.chat_url)
+
+    result = service._make_groq_request(MESSAGES, max_tokens=20, feature="chat")
+
+    assert not result.startswith("⚠️")
+    assert stats(secondary)["requests"] == 1
+    assert not service.router.backends["primary"].healthy
+    assert service.router.backends["primary"].last_error in FAILOVER_ERRORS
+    if primary is not None:
+        assert stats(primary)["requests"] == 1
+
+@pytest.mark.parametrize("failure", ["5xx", "429", "refused"])
+def test_streamed_request_fails_over_before_the_first_chunk(servers, failure):
+    url, primary = primary_url(servers, failure)
+    secondary = servers(mock_config())
+    service = make_service(url, secondary.chat_url)
+
+    result = "".join(service._make_groq_stream_request(MESSAGES, max_tokens=20, feature="chat"))
+
+    assert "⚠️" not in result
+    assert result.startswith("The parties agree")
+    assert stats(secondary)["streamed_requests"] == 1
+    assert not service.router.backends["primary"].healthy
+
+class DroppingStreamHandler(BaseHTTPRequestHandler):
+    """Streams one chunk and then closes the connection mid-response"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        event = json.dumps({"choices": [{"index": 0, "delta": {"content": "Partial"}}]})
+        body = f"data: {event}\n\n".encode("utf-8")
+        self.wfile.write(f"{len(body):X}\r\n".encode("ascii") + body + b"\r\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+def test_streamed_request_does_not_fail_over_after_the_first_chunk(servers):
+    dropping = ThreadingHTTPServer(("127.0.0.1", 0), DroppingStreamHandler)
+    threading.Thread(target=dropping.serve_forever, daemon=True).start()
+    secondary = servers(mock_config())
+    try:
+        host, port = dropping.server_address[:2]
+        service = make_service(f"http://{host}:{port}/openai/v1/chat/completions", secondary.chat_url)
+
+        chunks = list(service._make_groq_stream_request(MESSAGES, max_tokens=20, feature="chat"))
+    finally:
+        dropping.shutdown()
+        dropping.server_close()
+
+    assert chunks[0] == "Partial"
+    assert "⚠️ Connection error" in chunks[-1]
+    assert stats(secondary)["requests"] == 0
+    assert service.router.backends["primary"].last_error == "connection_error"
+
+@pytest.mark.parametrize("error", [
+    requests.exceptions.ConnectionError(),
+    requests.exceptions.SSLError(),
+    requests.exceptions.ProxyError(),
+    requests.exceptions.ChunkedEncodingError()
+])
+def test_network_errors_are_classified_as_connection_errors(error):
+    assert classify_request_error(error) == "connection_error"
+    assert classify_request_error(error) in FAILOVER_ERRORS
+
+def test_timeouts_and_other_errors_are_classified():
+    assert classify_request_error(requests.exceptions.ConnectTimeout()) == "timeout"
+    assert classify_request_error(requests.exceptions.ReadTimeout()) == "timeout"
+    assert classify_request_error(requests.exceptions.InvalidURL()) == "InvalidURL"
+    assert "InvalidURL" not in FAILOVER_ERRORS
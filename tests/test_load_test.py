@@ -0,0 +1,31 @@
+"""
+Tests for the load-test harness statistics
+"""
+import pytest
+
+from benchmarks.load_test import percentile
+
+VALUES = [float(value) for value in range(1, 11)]
+
+@pytest.mark.parametrize("pct, expected", [
+    (10, 1.0),
+    (50, 5.0),
+    (90, 9.0),
+    (100, 10.0)
+])
+def test_percentile_exact_integer_ranks(pct, expected):
+    assert percentile(VALUES, pct) == expected
+
+@pytest.mark.parametrize("pct, expected", [
+    (0, 1.0),
+    (1, 1.0),
+    (55, 6.0),
+    (95, 10.0),
+    (99, 10.0)
+])
+def test_percentile_fractional_ranks_round_up(pct, expected):
+    assert percentile(VALUES, pct) == expected
+
+def test_percentile_ignores_input_order_and_handles_empty_lists():
+    assert percentile(list(reversed(VALUES)), 50) == 5.0
+    assert percentile([], 95) == 0.0
@@ -0,0 +1,58 @@
+"""
+Tests for the shared LRU caches
+"""
+import threading
+
+from services.groupq_service import GuideCache
+from utils.lru_cache import LRUCache
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert len(cache) == 2
+
+def test_missing_keys_return_the_default():
+    cache = LRUCache(2)
+
+    assert cache.get("missing") is None
+    assert cache.get("missing", "fallback") == "fallback"
+
+def test_put_replaces_and_refreshes_an_entry():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 10)
+    cache.put("c", 3)
+
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+def test_concurrent_puts_keep_the_size_bound():
+    cache = LRUCache(50)
+
+    def fill(offset):
+        for i in range(1000):
+            cache.put((offset, i), i)
+            cache.get((offset, i - 1))
+
+    threads = [threading.Thread(target=fill, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(cache) == 50
+
+def test_guide_topics_match_regardless_of_case_and_spacing():
+    cache = GuideCache(max_size=2)
+    cache.put("Filing  a Consumer Complaint", "guide")
+
+    assert cache.get("filing a consumer complaint ") == "guide"
+    assert len(cache) == 1
@@ -0,0 +1,66 @@
+"""
+Tests for prompt compression of document text
+"""
+from services.prompt_compression import compress_prompt_text
+
+def test_repeated_paragraphs_are_removed_once():
+    text = (
+        "1. The Tenant shall pay rent monthly.\n\n"
+        "2. The Tenant   shall pay RENT monthly.\n\n"
+        "The Landlord shall maintain the premises.\n\n"
+        "the landlord shall  maintain the premises."
+    )
+
+    result = compress_prompt_text(text)
+
+    assert result["text"] == "1. The Tenant shall pay rent monthly.\n\nThe Landlord shall maintain the premises."
+    assert result["duplicates_removed"] == 2
+    assert result["tokens_after"] < result["tokens_before"]
+
+def test_signature_block_is_removed_up_to_the_schedule():
+    text = (
+        "5. This Agreement is governed by the laws of India.\n\n"
+        "IN WITNESS WHEREOF the parties have signed this Agreement.\n"
+        "Name: ____________\n"
+        "Title: Director\n"
+        "Date: ____________\n"
+        "Witnesses:\n\n"
+        "SCHEDULE A\n"
+        "Monthly rent: Rs. 25,000"
+    )
+
+    result = compress_prompt_text(text)
+
+    assert result["text"] == "5. This Agreement is governed by the laws of India.\n\nSCHEDULE A\nMonthly rent: Rs. 25,000"
+    assert result["boilerplate_removed"] == 5
+
+def test_label_lines_outside_the_signature_block_are_kept():
+    text = "Title\nThe Buyer acquires title on delivery.\n\nDate\nThe Effective Date is 1 April 2024."
+
+    assert compress_prompt_text(text)["text"] == text
+
+def test_clause_numbers_are_kept_with_normalized_spacing():
+    text = "12.3.1\t  The Supplier shall deliver the goods.\n12.3.2 Subject to clause 12.3.1, delivery is free."
+
+    result = compress_prompt_text(text)
+
+    assert result["text"] == (
+        "12.3.1 The Supplier shall deliver the goods.\n"
+        "12.3.2 Subject to clause 12.3.1, delivery is free."
+    )
+
+def test_page_furniture_and_dot_leaders_are_removed():
+    text = "1. Definitions ........ 3\n\nPage 2 of 10\n\n- 3 -\n\nThe Term means one year."
+
+    assert compress_prompt_text(text)["text"] == "1. Definitions\n\nThe Term means one year."
+
+def test_notice_clauses_are_removed():
+    text = (
+        "14. Notices. All notices shall be sent by registered post to the address above.\n\n"
+        "15. Termination. Either party may terminate on 30 days notice."
+    )
+
+    result = compress_prompt_text(text)
+
+    assert result["text"] == "15. Termination. Either party may terminate on 30 days notice."
+    assert result["boilerplate_removed"] == 1
@@ -0,0 +1,45 @@
+"""
+Tests for batched risk explanations
+"""
+import json
+
+import pytest
+
+from config.config import LLM_TOKEN_BUDGETS
+from benchmarks.mock_groq_server import MockServerConfig, start_mock_server
+from services.groupq_service import GroupQService
+from services.risk_explainer import RiskExplainer, clause_hash
+from services.token_counter import count_tokens
+from utils.lru_cache import LRUCache
+
+EXPLANATIONS = {"explanations": [{"id": "c1", "explanation": "You pay for the other side's losses."}]}
+
+@pytest.fixture
+def mock_server():
+    server = start_mock_server(MockServerConfig(latency="fixed", latency_mean=0.0, token_latency=0.0,
+                                                json_content=json.dumps(EXPLANATIONS)))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_oversized_clause_is_explained(mock_server):
+    # One detected clause spanning a whole ~40 KB contract
+    text = " ".join(
+        f"{i}. The Tenant shall indemnify and hold harmless the Landlord against all losses arising from clause {i}."
+        for i in range(500)
+    )
+    assert count_tokens(text) > 2 * LLM_TOKEN_BUDGETS["risk_explanations"]
+
+    explainer = RiskExplainer(GroupQService(api_url=mock_server.chat_url), cache=LRUCache(100))
+    result = explainer.explain([{"text": text, "risk_type": "indemnity"}])
+
+    assert result["errors"] == []
+    assert result["requests"] == 1
+    # Explanations stay keyed by the hash of the full clause
+    key = clause_hash(text, "indemnity")
+    assert result["explanations"] == {key: EXPLANATIONS["explanations"][0]["explanation"]}
+    assert explainer.get_cached({"text": text, "risk_type": "indemnity"}) == result["explanations"][key]
+
+def test_clauses_are_cut_below_the_batch_budget():
+    explainer = RiskExplainer(service=object(), batch_token_budget=300, clause_token_budget=1000, cache=LRUCache(100))
+    assert explainer.clause_token_budget < 300
@@ -0,0 +1,67 @@
+"""
+Tests for signed session resume tokens
+"""
+import os
+import stat
+
+import pytest
+
+from config.config import SESSION_TOKEN_TTL_HOURS
+from services.session_tokens import _read_or_create_secret_file, issue_session_token, verify_session_token
+
+SESSION_ID = "3f2b8c1e-5d4a-4e6b-9c7d-1a2b3c4d5e6f"
+NOW = 1_700_000_000.0
+TTL = SESSION_TOKEN_TTL_HOURS * 3600
+
+def test_round_trip():
+    token = issue_session_token(SESSION_ID, now=NOW)
+
+    assert verify_session_token(token, now=NOW) == SESSION_ID
+    assert verify_session_token(token, now=NOW + TTL - 1) == SESSION_ID
+
+def test_tampered_session_id_is_rejected():
+    _, expires, signature = issue_session_token(SESSION_ID, now=NOW).rsplit(".", 2)
+    other_id = "00000000-0000-0000-0000-000000000000"
+
+    assert verify_session_token(f"{other_id}.{expires}.{signature}", now=NOW) is None
+
+def test_tampered_expiry_is_rejected():
+    session_id, expires, signature = issue_session_token(SESSION_ID, now=NOW).rsplit(".", 2)
+    extended = int(expires) + 365 * 24 * 3600
+
+    assert verify_session_token(f"{session_id}.{extended}.{signature}", now=NOW + TTL + 1) is None
+
+def test_tampered_signature_is_rejected():
+    token = issue_session_token(SESSION_ID, now=NOW)
+    tampered = token[:-1] + ("A" if token[-1] != "A" else "B")
+
+    assert verify_session_token(tampered, now=NOW) is None
+
+def test_expired_token_is_rejected():
+    token = issue_session_token(SESSION_ID, now=NOW)
+
+    assert verify_session_token(token, now=NOW + TTL + 1) is None
+
+@pytest.mark.parametrize("token", [
+    "",
+    None,
+    "no-dots-at-all",
+    "only.one",
+    f"{SESSION_ID}.not-a-number.c2lnbmF0dXJl",
+    f"{SESSION_ID}..c2lnbmF0dXJl",
+    "..",
+])
+def test_malformed_tokens_are_rejected(token):
+    assert verify_session_token(token, now=NOW) is None
+
+def test_bare_session_id_is_rejected():
+    assert verify_session_token(SESSION_ID, now=NOW) is None
+
+def test_secret_file_is_created_private_and_reused(tmp_path):
+    path = str(tmp_path / "session_secret")
+
+    secret = _read_or_create_secret_file(path)
+
+    assert len(secret) == 64
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert _read_or_create_secret_file(path) == secret
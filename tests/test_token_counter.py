@@ -0,0 +1,134 @@
+"""
+Tests for local token counting, calibration and per-feature token budgets
+"""
+import pytest
+
+from benchmarks.mock_groq_server import MockServerConfig, start_mock_server
+from config.config import LLM_TOKEN_BUDGETS
+from services.groupq_service import GroupQService
+from services.token_counter import (
+    CALIBRATION_ALPHA,
+    CALIBRATION_MAX,
+    CALIBRATION_MIN,
+    MESSAGE_OVERHEAD_TOKENS,
+    REPLY_OVERHEAD_TOKENS,
+    TokenCounter,
+    raw_message_tokens,
+    raw_token_count
+)
+
+def words(count: int) -> str:
+    return " ".join(f"term{i % 10}" for i in range(count))
+
+def test_raw_count_splits_words_punctuation_and_long_words():
+    assert raw_token_count("") == 0
+    assert raw_token_count("The Tenant shall pay.") == 5
+    assert raw_token_count("indemnification") == 2
+    assert raw_token_count("合同条款") == 1 + len("合同条款") // 2
+
+def test_message_count_adds_chat_overhead():
+    messages = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "Hello"}]
+
+    assert raw_message_tokens(messages) == 3 + 1 + 2 * MESSAGE_OVERHEAD_TOKENS + REPLY_OVERHEAD_TOKENS
+
+def test_calibration_starts_from_the_first_sample_then_averages_exponentially():
+    counter = TokenCounter()
+    assert counter.ratio("model-a") == 1.0
+
+    counter.calibrate("model-a", estimated=100, actual=150)
+    assert counter.ratio("model-a") == pytest.approx(1.5)
+
+    counter.calibrate("model-a", estimated=100, actual=100)
+    assert counter.ratio("model-a") == pytest.approx((1 - CALIBRATION_ALPHA) * 1.5 + CALIBRATION_ALPHA * 1.0)
+    assert counter.count(words(100), "model-a") == 140
+
+def test_calibration_samples_are_clamped_and_invalid_ones_ignored():
+    counter = TokenCounter()
+    counter.calibrate("high", estimated=10, actual=1000)
+    counter.calibrate("low", estimated=1000, actual=10)
+    counter.calibrate("ignored", estimated=0, actual=100)
+    counter.calibrate("ignored", estimated=100, actual=0)
+    counter.calibrate("", estimated=100, actual=150)
+
+    assert counter.ratio("high") == CALIBRATION_MAX
+    assert counter.ratio("low") == CALIBRATION_MIN
+    assert set(counter.ratios) == {"high", "low"}
+
+def test_unseen_models_use_the_average_ratio():
+    counter = TokenCounter()
+    counter.calibrate("model-a", estimated=100, actual=120)
+    counter.calibrate("model-b", estimated=100, actual=80)
+
+    assert counter.ratio("model-c") == pytest.approx(1.0)
+    assert counter.ratio() == pytest.approx(1.0)
+
+def test_truncate_returns_the_longest_fitting_prefix_at_a_word_boundary():
+    counter = TokenCounter()
+    text = words(200)
+
+    truncated = counter.truncate(text, 50)
+
+    assert counter.count(truncated) <= 50
+    assert counter.count(truncated) >= 45
+    assert text.startswith(truncated)
+    assert text[len(truncated)] == " "
+
+def test_truncate_keeps_short_text_and_handles_zero_budgets():
+    counter = TokenCounter()
+
+    assert counter.truncate("Short clause.", 10) == "Short clause."
+    assert counter.truncate("Short clause.", 0) == ""
+
+def test_truncate_follows_calibration():
+    counter = TokenCounter()
+    counter.calibrate("model-a", estimated=100, actual=200)
+
+    assert counter.count(counter.truncate(words(200), 50, "model-a"), "model-a") <= 50
+    assert len(counter.truncate(words(200), 50, "model-a")) < len(TokenCounter().truncate(words(200), 50))
+
+def test_split_keeps_chunks_within_the_limit_and_paragraphs_whole():
+    counter = TokenCounter()
+    paragraphs = [f"{words(30)}." for _ in range(6)] + [". ".join(words(20) for _ in range(10)) + "."]
+    text = "\n\n".join(paragraphs)
+
+    chunks = counter.split(text, 70)
+
+    assert all(counter.count(chunk) <= 70 for chunk in chunks)
+    assert chunks[0] == "\n\n".join(paragraphs[:2])
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+
+@pytest.fixture
+def service():
+    server = start_mock_server(MockServerConfig(latency="fixed", latency_mean=0.0, token_latency=0.0))
+    yield GroupQService(api_url=server.chat_url), server
+    server.shutdown()
+    server.server_close()
+
+def test_budgets_are_enforced_per_feature(service):
+    groupq, _ = service
+    messages = [{"role": "user", "content": words(LLM_TOKEN_BUDGETS["guide_section"] + 100)}]
+
+    rejected = groupq._check_token_budget(messages, "guide_section")
+
+    assert rejected.startswith("⚠️ This request is too long")
+    assert f"the limit is {LLM_TOKEN_BUDGETS['guide_section']:,}" in rejected
+    assert groupq._check_token_budget(messages, "summary") is None
+    assert groupq._check_token_budget(messages, "feature_without_budget") is None
+
+def test_over_budget_requests_are_not_sent(service):
+    groupq, server = service
+    messages = [{"role": "user", "content": words(LLM_TOKEN_BUDGETS["chat"] + 100)}]
+
+    plain = groupq._make_groq_request(messages, feature="chat")
+    streamed = "".join(groupq._make_groq_stream_request(messages, feature="chat"))
+
+    assert plain.startswith("⚠️ This request is too long")
+    assert streamed == plain
+    assert server.mock_stats.snapshot()["requests"] == 0
+
+def test_text_budget_leaves_room_for_the_rest_of_the_prompt(service):
+    groupq, _ = service
+    messages = [{"role": "system", "content": words(100)}]
+
+    assert groupq._text_token_budget(messages, "simplify") == LLM_TOKEN_BUDGETS["simplify"] - raw_message_tokens(messages)
+    assert groupq._text_token_budget(messages, "feature_without_budget") is None
@@ -1,20 +1,64 @@
 """
 Utility functions for handling legal documents
 """
+import hashlib
 import os
 import re
 import tempfile
+import threading
+import zlib
 from pathlib import Path
-import PyPDF2
-import docx
-import nltk
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+from config.config import NLTK_DOWNLOAD_ENABLED
+
+# PyPDF2, python-docx and NLTK are imported by the functions that use them, so importing
+# this module stays cheap at app startup
+
+# NLTK tokenizer data (punkt_tab is used by NLTK 3.9+, punkt by older releases)
+NLTK_TOKENIZERS = ("punkt_tab", "punkt")
+
+# Fallback sentence boundary when the NLTK tokenizer data is unavailable
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'(?<=[.!?])\s+(?=["\'(\[]?[A-Z0-9])')
+
+_nltk_lock = threading.Lock()
+_nltk_available = None
+
+def ensure_nltk_tokenizer() -> bool:
+    """
+    Check once per process that NLTK's sentence tokenizer can load its data
+    
+    Missing data is downloaded when NLTK_DOWNLOAD_ENABLED is set; a failed download
+    (e.g. no network) is not retried.
+    
+    Returns:
+        True if nltk.sent_tokenize can be used
+    """
+    global _nltk_available
+    
+    with _nltk_lock:
+        if _nltk_available is None:
+            import nltk
+            
+            try:
+                nltk.sent_tokenize("Check. Check.")
+                _nltk_available = True
+            except LookupError:
+                _nltk_available = False
+                if NLTK_DOWNLOAD_ENABLED:
+                    for resource in NLTK_TOKENIZERS:
+                        try:
+                            nltk.download(resource, quiet=True, raise_on_error=True)
+                        except Exception as e:
+                            print(f"Error downloading NLTK data {resource}: {e}")
+                    try:
+                        nltk.sent_tokenize("Check. Check.")
+                        _nltk_available = True
+                    except LookupError:
+                        pass
+                if not _nltk_available:
+                    print("NLTK tokenizer data unavailable; splitting sentences with a regular expression")
+        return _nltk_available
 
 def save_uploaded_file(uploaded_file) -> str:
     """Save an uploaded file to a temporary location and return the path"""
@@ -27,21 +71,32 @@ def save_uploaded_file(uploaded_file) -> str:
     except Exception as e:
         raise Exception(f"Error saving uploaded file: {e}")
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text content from a PDF file"""
+def compute_content_hash(uploaded_file) -> str:
+    """Return the SHA-256 hex digest of an uploaded file's bytes, used as its document ID"""
+    return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+def extract_text_from_pdf(file_path: str, progress_callback: Optional[Callable[[float], None]] = None) -> str:
+    """Extract text content from a PDF file, reporting the fraction of pages done to progress_callback"""
     text = ""
+    import PyPDF2
+    
     try:
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(pdf_reader.pages)):
+            num_pages = len(pdf_reader.pages)
+            for page_num in range(num_pages):
                 page = pdf_reader.pages[page_num]
                 text += page.extract_text() + "\n"
+                if progress_callback:
+                    progress_callback((page_num + 1) / num_pages)
     except Exception as e:
         raise Exception(f"Error extracting text from PDF: {e}")
     return text
 
 def extract_text_from_docx(file_path: str) -> str:
     """Extract text content from a DOCX file"""
+    import docx
+    
     try:
         doc = docx.Document(file_path)
         text = ""
@@ -51,12 +106,12 @@ def extract_text_from_docx(file_path: str) -> str:
         raise Exception(f"Error extracting text from DOCX: {e}")
     return text
 
-def extract_text_from_document(file_path: str) -> str:
+def extract_text_from_document(file_path: str, progress_callback: Optional[Callable[[float], None]] = None) -> str:
     """Extract text from a document based on its file extension"""
     ext = os.path.splitext(file_path)[1].lower()
     
     if ext == '.pdf':
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(file_path, progress_callback)
     elif ext == '.docx':
         return extract_text_from_docx(file_path)
     else:
@@ -77,8 +132,12 @@ def preprocess_text(text: str) -> str:
     return text.strip()
 
 def split_into_sentences(text: str) -> List[str]:
-    """Split text into sentences using NLTK's sentence tokenizer"""
-    return nltk.sent_tokenize(text)
+    """Split text into sentences using NLTK's sentence tokenizer, or a regular expression without its data"""
+    if ensure_nltk_tokenizer():
+        import nltk
+        
+        return nltk.sent_tokenize(text)
+    return [sentence for sentence in SENTENCE_BOUNDARY_PATTERN.split(text.strip()) if sentence]
 
 def split_into_clauses(text: str) -> List[str]:
     """Split legal text into logical clauses"""
@@ -92,6 +151,65 @@ def split_into_clauses(text: str) -> List[str]:
     
     return clauses
 
+def split_into_paragraph_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Split text into paragraphs, returned as (start, end) offsets into the text
+    
+    Blank lines separate paragraphs; text without blank lines is a single paragraph.
+    Paragraphs containing only whitespace are skipped.
+    """
+    spans = []
+    current_pos = 0
+    for paragraph in text.split("\n\n"):
+        if paragraph.strip():
+            spans.append((current_pos, current_pos + len(paragraph)))
+        current_pos += len(paragraph) + 2
+    return spans
+
+# Whitespace after the end of a sentence (or a semicolon), where chunks may be cut
+SENTENCE_GAP_PATTERN = re.compile(r"(?<=[.!?;])\s+")
+
+# Paragraphs are cut into chunks of about this many sentences on average
+CHUNK_BOUNDARY_MODULUS = 8
+MAX_CHUNK_SENTENCES = 24
+
+def split_into_chunk_spans(text: str, start: int = 0, end: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Cut a paragraph into chunks of sentences, returned as (start, end) offsets into the text
+    
+    Chunks are the units per-paragraph results are cached for. A chunk ends after a sentence
+    whose content hash selects it as a boundary, so the cut points depend only on nearby
+    sentences and editing a clause changes only the chunk around it. The whitespace between
+    two chunks belongs to neither.
+    
+    Args:
+        text: Document text
+        start: Offset where the paragraph starts
+        end: Offset where the paragraph ends (defaults to the end of the text)
+    """
+    end = len(text) if end is None else end
+    spans = []
+    
+    chunk_start = start
+    sentence_start = start
+    sentences = 0
+    for match in SENTENCE_GAP_PATTERN.finditer(text, start, end):
+        sentences += 1
+        sentence = text[sentence_start:match.start()]
+        sentence_start = match.end()
+        if sentences >= MAX_CHUNK_SENTENCES or zlib.crc32(sentence.encode("utf-8")) % CHUNK_BOUNDARY_MODULUS == 0:
+            spans.append((chunk_start, match.start()))
+            chunk_start = match.end()
+            sentences = 0
+    
+    if text[chunk_start:end].strip():
+        spans.append((chunk_start, end))
+    return spans
+
+def paragraph_hash(paragraph: str) -> str:
+    """Return a short content hash identifying a paragraph"""
+    return hashlib.blake2b(paragraph.encode("utf-8"), digest_size=16).hexdigest()
+
 def extract_document_metadata(text: str) -> Dict[str, Any]:
     """Extract useful metadata from the document text"""
     metadata = {
@@ -0,0 +1,34 @@
+"""
+Thread-safe LRU cache for the Legal AI Platform
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class LRUCache:
+    """Thread-safe cache that evicts the least recently used entry once it holds max_size entries"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Optional[Any]:
+        """Return the value cached under key, marking it recently used, or default"""
+        with self.lock:
+            if key not in self.entries:
+                return default
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key: Hashable, value: Any):
+        """Cache a value, evicting the least recently used entries beyond max_size"""
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.entries)
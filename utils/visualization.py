@@ -1,14 +1,39 @@
 """
 Visualization utilities for the Legal AI Platform
 """
+import html
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 import streamlit as st
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable, Hashable, Optional, Tuple
+
+from config.config import FIGURE_CACHE_SIZE, HIGHLIGHT_PAGE_CHARS
+from models.clause_set import as_clause_set
+from utils.lru_cache import LRUCache
+
+# Serialized Plotly figures shared by all sessions
+_figure_cache = LRUCache(FIGURE_CACHE_SIZE)
+
+def cached_figure(key: Hashable, build: Callable[[], go.Figure]) -> go.Figure:
+    """
+    Return a figure from the figure cache, building and serializing it on a miss
+    
+    Figures are stored as JSON, so each caller gets its own copy to update.
+    
+    Args:
+        key: Data version plus every chart parameter the figure depends on
+        build: Builds the figure
+        
+    Returns:
+        Plotly figure object
+    """
+    figure_json = _figure_cache.get(key)
+    if figure_json is None:
+        figure_json = pio.to_json(build(), validate=False)
+        _figure_cache.put(key, figure_json)
+    return pio.from_json(figure_json, skip_invalid=True)
 
 def create_risk_meter(risk_score: float, risk_level: str):
     """
@@ -57,17 +82,21 @@ def create_risk_meter(risk_score: float, risk_level: str):
     
     return fig
 
-def create_risk_distribution(risky_clauses: List[Dict[str, Any]]):
+def create_risk_distribution(risky_clauses: List[Dict[str, Any]], risk_counts: Optional[Dict[str, int]] = None):
     """
     Create a risk distribution visualization
     
     Args:
-        risky_clauses: List of risky clause data
+        risky_clauses: ClauseSet or list of risky clause data
+        risk_counts: Clause counts per risk type, used instead of counting risky_clauses
         
     Returns:
         Plotly figure object
     """
-    if not risky_clauses:
+    if risk_counts is None:
+        risk_counts = as_clause_set(risky_clauses).risk_type_counts()
+    
+    if not risk_counts:
         # Create empty chart with message
         fig = go.Figure()
         fig.add_annotation(
@@ -79,12 +108,6 @@ def create_risk_distribution(risky_clauses: List[Dict[str, Any]]):
         )
         return fig
     
-    # Count risk types
-    risk_counts = {}
-    for clause in risky_clauses:
-        risk_type = clause.get("risk_type", "unknown")
-        risk_counts[risk_type] = risk_counts.get(risk_type, 0) + 1
-    
     # Create dataframe
     df = pd.DataFrame({
         "Risk Type": list(risk_counts.keys()),
@@ -148,12 +171,16 @@ def create_document_comparison_chart(docs_data: Dict[str, Dict[str, Any]]):
     
     fig = go.Figure()
     
+    # Maxima used to normalize each metric, computed once for all documents
+    max_length = max([d.get("metadata", {}).get("length", 1) for d in docs_data.values()])
+    max_clauses = max([d.get("metadata", {}).get("num_clauses", 1) for d in docs_data.values()])
+    max_reading_time = max_length / 250
+    
     for doc_id, doc_data in docs_data.items():
         # Calculate metrics (scaled from 0 to 1)
         risk_score = doc_data.get("risk_score", 0)
         
         # Text length (normalize by longest document)
-        max_length = max([d.get("metadata", {}).get("length", 1) for d in docs_data.values()])
         length_score = doc_data.get("metadata", {}).get("length", 0) / max_length
         
         # Complexity (based on sentence length)
@@ -161,12 +188,10 @@ def create_document_comparison_chart(docs_data: Dict[str, Dict[str, Any]]):
         complexity_score = min(1.0, avg_sentence_length / 50)  # Cap at 50 words per sentence
         
         # Number of clauses (normalize by maximum)
-        max_clauses = max([d.get("metadata", {}).get("num_clauses", 1) for d in docs_data.values()])
         clauses_score = doc_data.get("metadata", {}).get("num_clauses", 0) / max_clauses
         
         # Estimated reading time (normalize by maximum)
         reading_time = doc_data.get("metadata", {}).get("length", 0) / 250  # Words per minute
-        max_reading_time = max([d.get("metadata", {}).get("length", 1) / 250 for d in docs_data.values()])
         reading_time_score = reading_time / max_reading_time
         
         # Create radar chart values
@@ -253,62 +278,130 @@ def create_risk_trend_chart(risk_history: List[Dict[str, Any]]):
     
     return fig
 
-def highlight_risky_text(text: str, risky_clauses: List[Dict[str, Any]]) -> str:
+# Highlight colors for each risk level
+HIGHLIGHT_COLORS = {
+    "high": "#FECACA",  # Light red
+    "medium": "#FEF3C7",  # Light yellow
+    "low": "#DCFCE7"  # Light green
+}
+
+RISK_LEVEL_ORDER = {"low": 0, "medium": 1, "high": 2}
+
+def clause_risk_level(confidence: float) -> str:
+    """Return the highlight level of a clause from its confidence"""
+    if confidence > 0.7:
+        return "high"
+    elif confidence > 0.4:
+        return "medium"
+    return "low"
+
+def merge_risky_spans(risky_clauses: List[Dict[str, Any]], text_length: Optional[int] = None) -> List[Dict[str, Any]]:
     """
-    Highlight risky clauses in the document text
+    Merge overlapping risky clauses into disjoint spans with one sweep over their sorted offsets
     
     Args:
-        text: Document text
-        risky_clauses: List of risky clause data
+        risky_clauses: ClauseSet or list of risky clause data
+        text_length: Length of the document text; offsets are clipped to it
         
     Returns:
-        HTML with highlighted risky clauses
+        Spans sorted by start, each with the highest risk level and all risk types it covers
     """
-    if not risky_clauses:
-        return f"<div style='white-space: pre-wrap;'>{text}</div>"
-    
-    # Colors for different risk levels
-    colors = {
-        "high": "#FECACA",  # Light red
-        "medium": "#FEF3C7",  # Light yellow
-        "low": "#DCFCE7"  # Light green
-    }
+    clause_set = as_clause_set(risky_clauses)
+    limit = text_length if text_length is not None else max(clause_set.ends, default=0)
+    
+    spans = []
+    for index in sorted(range(len(clause_set)), key=lambda index: clause_set.starts[index]):
+        start = max(0, min(clause_set.starts[index], limit))
+        end = max(0, min(clause_set.ends[index], limit))
+        if end <= start:
+            continue
+        risk_type = clause_set.risk_types[clause_set.type_ids[index]]
+        risk_level = clause_risk_level(clause_set.confidences[index])
+        
+        if spans and start < spans[-1]["end"]:
+            # Overlaps the previous span: extend it instead of repeating the shared text
+            span = spans[-1]
+            span["end"] = max(span["end"], end)
+            if RISK_LEVEL_ORDER[risk_level] > RISK_LEVEL_ORDER[span["risk_level"]]:
+                span["risk_level"] = risk_level
+            if risk_type not in span["risk_types"]:
+                span["risk_types"].append(risk_type)
+        else:
+            spans.append({"start": start, "end": end, "risk_level": risk_level, "risk_types": [risk_type]})
     
-    # Sort clauses by start index to ensure proper highlighting
-    sorted_clauses = sorted(risky_clauses, key=lambda x: x.get("start_index", 0))
+    return spans
+
+def paginate_text(text: str, page_chars: int = HIGHLIGHT_PAGE_CHARS) -> List[Tuple[int, int]]:
+    """
+    Cut text into pages of at most page_chars characters
     
-    # Build HTML with highlights
-    html = "<div style='white-space: pre-wrap;'>"
-    last_end = 0
+    Pages end after the last sentence (or failing that, the last word) that fits.
     
-    for clause in sorted_clauses:
-        start = clause.get("start_index", 0)
-        end = clause.get("end_index", 0)
-        risk_type = clause.get("risk_type", "unknown")
-        confidence = clause.get("confidence", 1.0)
+    Args:
+        text: Document text
+        page_chars: Maximum characters per page
         
-        # Determine risk level based on confidence and risk type
-        if confidence > 0.7:
-            risk_level = "high"
-        elif confidence > 0.4:
-            risk_level = "medium"
+    Returns:
+        (start, end) offsets of each page
+    """
+    pages = []
+    start = 0
+    while len(text) - start > page_chars:
+        limit = start + page_chars
+        cut = text.rfind(". ", start, limit)
+        if cut != -1:
+            cut += 2
         else:
-            risk_level = "low"
-        
-        # Add text before this clause
-        html += text[last_end:start]
+            cut = text.rfind(" ", start, limit)
+            cut = cut + 1 if cut != -1 else limit
+        pages.append((start, cut))
+        start = cut
+    pages.append((start, len(text)))
+    return pages
+
+def highlight_risky_text(text: str, risky_clauses: List[Dict[str, Any]], start: int = 0, end: Optional[int] = None) -> str:
+    """
+    Highlight risky clauses in the document text
+    
+    Only the window between start and end is rendered, so a long document can be
+    shown one page (see paginate_text) at a time.
+    
+    Args:
+        text: Document text
+        risky_clauses: ClauseSet or list of risky clause data
+        start: Offset of the first character to render
+        end: Offset after the last character to render (defaults to the end of the text)
         
-        # Add highlighted clause
-        highlight_color = colors[risk_level]
-        html += f"<span style='background-color: {highlight_color}; padding: 2px; border-radius: 3px;' title='{risk_type}'>{text[start:end]}</span>"
+    Returns:
+        HTML with highlighted risky clauses
+    """
+    end = len(text) if end is None else min(end, len(text))
+    
+    parts = ["<div style='white-space: pre-wrap;'>"]
+    position = start
+    
+    for span in merge_risky_spans(risky_clauses, len(text)) if risky_clauses else []:
+        # Spans are sorted, so the ones outside the window are skipped or end the loop
+        if span["end"] <= start:
+            continue
+        if span["start"] >= end:
+            break
+        span_start = max(span["start"], start)
+        span_end = min(span["end"], end)
         
-        last_end = end
+        # Add text before this span, then the highlighted span
+        parts.append(html.escape(text[position:span_start], quote=False))
+        parts.append(
+            f"<span style='background-color: {HIGHLIGHT_COLORS[span['risk_level']]}; padding: 2px; border-radius: 3px;' "
+            f"title='{html.escape(', '.join(span['risk_types']))}'>{html.escape(text[span_start:span_end], quote=False)}</span>"
+        )
+        position = span_end
     
     # Add remaining text
-    html += text[last_end:]
-    html += "</div>"
+    parts.append(html.escape(text[position:end], quote=False))
+    parts.append("</div>")
     
-    return html
+    return "".join(parts)
 
 def create_side_by_side_comparison(original_text: str, simplified_text: str) -> str:
     """